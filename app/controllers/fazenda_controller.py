@@ -1,9 +1,11 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from math import ceil
-from app.repositories.fazenda_repository import FazendaRepository
-from app.schemas.fazenda_schema import FazendaResponse, PaginatedResponse
-from typing import List
+from app.core.cache import TTLCache
+from app.repositories.fazenda_repository import fazenda_repository
+from app.repositories.geo_repository_mixin import COORDINATE_DECIMALS, RADIUS_STEP_METERS
+from app.schemas.fazenda_schema import FazendaPage, FazendaResponse, PontoBuscaRequest, PontoFazendasResponse
+from typing import List, Optional, Tuple
 
 # Respostas de erro para documentação
 NOT_FOUND_RESPONSE = {
@@ -18,13 +20,95 @@ NOT_FOUND_RESPONSE = {
 }
 
 
+# Cache em memória das buscas por cod_imovel (código CAR praticamente imutável)
+# Chave: (cod_imovel, page, page_size, after_id)
+COD_IMOVEL_CACHE = TTLCache(maxsize=1024, ttl=600)
+# Cache negativo: cod_imovel inexistentes, com TTL menor (evita repetir a consulta ao banco)
+COD_IMOVEL_NOT_FOUND_CACHE = TTLCache(maxsize=1024, ttl=60)
+# Cache das buscas por ID (poucos IDs concentram a maior parte dos acessos)
+# Chave: fazenda_id. Endpoints de escrita devem invalidar com FAZENDA_BY_ID_CACHE.pop(fazenda_id)
+FAZENDA_BY_ID_CACHE = TTLCache(maxsize=10_000, ttl=300)
+# Cache das buscas por ponto e por raio, com a mesma validade do Cache-Control das rotas GET.
+# Chave: ("ponto", latitude, longitude, ...) ou ("raio", latitude, longitude, raio_km, ...) mais
+# a paginação, com coordenadas e raio já arredondados: buscas que só diferem a partir da
+# 6ª casa decimal (ou por menos de 10 m no raio) compartilham a mesma entrada
+SEARCH_CACHE = TTLCache(maxsize=4096, ttl=60)
+# Cache dos vector tiles (geometrias praticamente imutáveis; tiles vizinhos são pedidos juntos)
+# Chave: (z, x, y)
+TILE_CACHE = TTLCache(maxsize=512, ttl=600)
+
+# Níveis de zoom aceitos nos vector tiles: abaixo de TILE_MIN_ZOOM um tile cobre boa parte
+# do estado (dezenas de milhares de polígonos), caro demais para gerar sob demanda
+TILE_MIN_ZOOM = 10
+TILE_MAX_ZOOM = 22
+# Nome da camada dentro do tile
+TILE_LAYER = "fazendas"
+
+
 class FazendaController:
     """
     Controller responsável pela lógica de negócio relacionada a Fazendas
     """
     
     @staticmethod
-    def get_fazenda_by_cod_imovel(db: Session, cod_imovel: str, page: int = 1, page_size: int = 10) -> PaginatedResponse[FazendaResponse]:
+    def _get_next_cursor(items: List[FazendaResponse], has_next: bool) -> Optional[int]:
+        """
+        Retorna o cursor (after_id) da próxima página: o id do último item da página atual
+        
+        Args:
+            items: Itens da página atual (ordenados por id)
+            has_next: Se existe uma próxima página
+            
+        Returns:
+            Id do último item, ou None se não houver próxima página
+        """
+        return items[-1].id if has_next and items else None
+    
+    @staticmethod
+    def _get_total_pages(total: Optional[int], page_size: int) -> Optional[int]:
+        """
+        Calcula o total de páginas a partir do total de itens
+        
+        Args:
+            total: Total de itens encontrados (None se não foi calculado)
+            page_size: Tamanho da página
+            
+        Returns:
+            Total de páginas, ou None se o total não foi calculado
+        """
+        if total is None:
+            return None
+        return ceil(total / page_size) if total > 0 else 0
+    
+    @staticmethod
+    def _quantize_coordinates(latitude: float, longitude: float) -> Tuple[float, float]:
+        """
+        Arredonda as coordenadas para COORDINATE_DECIMALS casas decimais (~1 m)
+        
+        Args:
+            latitude: Latitude recebida na requisição
+            longitude: Longitude recebida na requisição
+            
+        Returns:
+            Tupla (latitude, longitude) arredondadas, usadas na chave de cache e na busca
+        """
+        return round(latitude, COORDINATE_DECIMALS), round(longitude, COORDINATE_DECIMALS)
+    
+    @staticmethod
+    def _quantize_radius_km(raio_km: float) -> float:
+        """
+        Arredonda o raio para o múltiplo de RADIUS_STEP_METERS mais próximo (mínimo de um passo)
+        
+        Args:
+            raio_km: Raio recebido na requisição, em quilômetros
+            
+        Returns:
+            Raio arredondado, em quilômetros (o mesmo que o repository usaria na busca)
+        """
+        return max(round(raio_km * 1000 / RADIUS_STEP_METERS), 1) * RADIUS_STEP_METERS / 1000
+    
+    @staticmethod
+    async def get_fazenda_by_cod_imovel(db: AsyncSession, cod_imovel: str, page: int = 1, page_size: int = 10, after_id: Optional[int] = None) -> FazendaPage:
         """
         Busca todas as fazendas pelo cod_imovel (pode retornar múltiplos resultados) com paginação
         
@@ -33,53 +117,54 @@ class FazendaController:
             cod_imovel: Código do imóvel da fazenda a ser buscada
             page: Número da página (padrão: 1)
             page_size: Tamanho da página (padrão: 10)
+            after_id: Cursor keyset - id da última fazenda da página anterior (opcional)
             
         Returns:
-            PaginatedResponse[FazendaResponse]: Resposta paginada com fazendas encontradas (pode estar vazia ou conter múltiplos itens)
+            FazendaPage: Resposta paginada com fazendas encontradas (pode estar vazia ou conter múltiplos itens)
             
         Raises:
-            HTTPException: 
-                - 404: Se nenhuma fazenda for encontrada
-                - 500: Em caso de erro interno do servidor
+            HTTPException: 404 se nenhuma fazenda for encontrada
         """
-        try:
-            # Busca as fazendas no repositório com paginação
-            fazendas, total = FazendaRepository.get_by_cod_imovel(db, cod_imovel, page, page_size)
-            
-            # Verifica se alguma fazenda foi encontrada
-            if total == 0:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Fazenda com código {cod_imovel} não encontrada"
-                )
-            
-            # Converte os models para os schemas de resposta
-            items = [FazendaResponse.model_validate(fazenda) for fazenda in fazendas]
-            
-            # Calcula o total de páginas
-            total_pages = ceil(total / page_size) if total > 0 else 0
-            
-            # Retorna a resposta paginada
-            return PaginatedResponse[FazendaResponse](
-                items=items,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=total_pages
+        # Respostas em cache (positiva ou negativa) evitam a ida ao banco
+        if COD_IMOVEL_NOT_FOUND_CACHE.get(cod_imovel):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Fazenda com código {cod_imovel} não encontrada"
             )
-            
-        except HTTPException:
-            # Re-lança HTTPException (404, etc) para que o FastAPI trate corretamente
-            raise
-        except Exception as e:
-            # Trata erros inesperados
+        cache_key = (cod_imovel, page, page_size, after_id)
+        cached = COD_IMOVEL_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Busca as fazendas no repositório com paginação
+        fazendas, total, has_next = await fazenda_repository.get_by_cod_imovel(db, cod_imovel, page, page_size, after_id)
+        
+        # Verifica se alguma fazenda foi encontrada
+        if total == 0:
+            COD_IMOVEL_NOT_FOUND_CACHE.set(cod_imovel, True)
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao buscar fazenda: {str(e)}"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Fazenda com código {cod_imovel} não encontrada"
             )
+        
+        # Converte as linhas (já no formato de FazendaResponse) sem revalidar campo a campo
+        items = [FazendaResponse.model_construct(**fazenda) for fazenda in fazendas]
+        
+        # Monta a resposta paginada (campos já tipados, sem revalidação) e guarda no cache
+        response = FazendaPage.model_construct(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=FazendaController._get_total_pages(total, page_size),
+            has_next=has_next,
+            next_cursor=FazendaController._get_next_cursor(items, has_next)
+        )
+        COD_IMOVEL_CACHE.set(cache_key, response)
+        return response
     
     @staticmethod
-    def get_fazenda_by_id(db: Session, fazenda_id: int) -> FazendaResponse:
+    async def get_fazenda_by_id(db: AsyncSession, fazenda_id: int) -> FazendaResponse:
         """
         Busca uma fazenda pelo ID
         DEPRECATED: Use get_fazenda_by_cod_imovel() em vez disso.
@@ -92,36 +177,48 @@ class FazendaController:
             FazendaResponse: Dados da fazenda encontrada
             
         Raises:
-            HTTPException: 
-                - 404: Se a fazenda não for encontrada
-                - 500: Em caso de erro interno do servidor
+            HTTPException: 404 se a fazenda não for encontrada
         """
-        try:
-            # Busca a fazenda no repositório
-            fazenda = FazendaRepository.get_by_id(db, fazenda_id)
-            
-            # Verifica se a fazenda foi encontrada
-            if not fazenda:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Fazenda com ID {fazenda_id} não encontrada"
-                )
-            
-            # Converte o model para o schema de resposta usando from_attributes
-            return FazendaResponse.model_validate(fazenda)
-            
-        except HTTPException:
-            # Re-lança HTTPException (404, etc) para que o FastAPI trate corretamente
-            raise
-        except Exception as e:
-            # Trata erros inesperados
+        # Resposta em cache evita a ida ao banco
+        cached = FAZENDA_BY_ID_CACHE.get(fazenda_id)
+        if cached is not None:
+            return cached
+        
+        # Busca a fazenda no repositório
+        fazenda = await fazenda_repository.get_by_id(db, fazenda_id)
+        
+        # Verifica se a fazenda foi encontrada
+        if not fazenda:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao buscar fazenda: {str(e)}"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Fazenda com ID {fazenda_id} não encontrada"
             )
+        
+        # Linha projetada (sem geometria) já no formato do schema de resposta
+        response = FazendaResponse.model_construct(**fazenda)
+        FAZENDA_BY_ID_CACHE.set(fazenda_id, response)
+        return response
     
     @staticmethod
-    def get_fazendas_by_point(db: Session, latitude: float, longitude: float, page: int = 1, page_size: int = 10) -> PaginatedResponse[FazendaResponse]:
+    async def get_fazendas_by_ids(db: AsyncSession, ids: List[int]) -> List[FazendaResponse]:
+        """
+        Busca várias fazendas pelos IDs em uma única consulta ao banco
+        
+        Args:
+            db: Sessão do banco de dados
+            ids: IDs das fazendas a serem buscadas
+            
+        Returns:
+            List[FazendaResponse]: Fazendas encontradas, ordenadas por id (IDs inexistentes são ignorados)
+        """
+        # Remove IDs repetidos antes de consultar o banco
+        fazendas = await fazenda_repository.get_by_ids(db, list(dict.fromkeys(ids)))
+        
+        # Converte as linhas (já no formato de FazendaResponse) sem revalidar campo a campo
+        return [FazendaResponse.model_construct(**fazenda) for fazenda in fazendas]
+    
+    @staticmethod
+    async def get_fazendas_by_point(db: AsyncSession, latitude: float, longitude: float, page: int = 1, page_size: int = 10, after_id: Optional[int] = None, include_total: bool = False, exact_total: bool = False) -> FazendaPage:
         """
         Busca fazendas que contêm um ponto específico (latitude/longitude) com paginação
         
@@ -131,42 +228,69 @@ class FazendaController:
             longitude: Longitude do ponto
             page: Número da página (padrão: 1)
             page_size: Tamanho da página (padrão: 10)
+            after_id: Cursor keyset - id da última fazenda da página anterior (opcional)
+            include_total: Se True, calcula também o total (padrão: False, sem contagem)
+            exact_total: Com include_total, conta o total exato em vez de estimá-lo (padrão: False)
             
         Returns:
-            PaginatedResponse[FazendaResponse]: Resposta paginada com fazendas que contêm o ponto
-            
-        Raises:
-            HTTPException: 
-                - 500: Em caso de erro interno do servidor
+            FazendaPage: Resposta paginada com fazendas que contêm o ponto
         """
-        try:
-            # Busca as fazendas no repositório com paginação
-            fazendas, total = FazendaRepository.get_by_point(db, latitude, longitude, page, page_size)
-            
-            # Converte os models para os schemas de resposta
-            items = [FazendaResponse.model_validate(fazenda) for fazenda in fazendas]
-            
-            # Calcula o total de páginas
-            total_pages = ceil(total / page_size) if total > 0 else 0
-            
-            # Retorna a resposta paginada
-            return PaginatedResponse[FazendaResponse](
-                items=items,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=total_pages
-            )
+        # Coordenadas arredondadas antes da consulta ao cache: pontos a menos de ~1 m
+        # compartilham a mesma resposta
+        latitude, longitude = FazendaController._quantize_coordinates(latitude, longitude)
+        cache_key = ("ponto", latitude, longitude, page, page_size, after_id, include_total, exact_total)
+        cached = SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Busca as fazendas no repositório com paginação
+        fazendas, total, has_next = await fazenda_repository.get_by_point(db, latitude, longitude, page, page_size, after_id, include_total=include_total, exact_total=exact_total)
+        
+        # Converte as linhas (já no formato de FazendaResponse) sem revalidar campo a campo
+        items = [FazendaResponse.model_construct(**fazenda) for fazenda in fazendas]
+        
+        # Monta a resposta paginada (total e total_pages nulos se include_total=False) e guarda no cache
+        response = FazendaPage.model_construct(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=FazendaController._get_total_pages(total, page_size),
+            has_next=has_next,
+            total_estimated=include_total and not exact_total,
+            next_cursor=FazendaController._get_next_cursor(items, has_next)
+        )
+        SEARCH_CACHE.set(cache_key, response)
+        return response
+    
+    @staticmethod
+    async def get_fazendas_by_points(db: AsyncSession, pontos: List[PontoBuscaRequest]) -> List[PontoFazendasResponse]:
+        """
+        Busca as fazendas que contêm cada um dos pontos informados, com uma única consulta ao banco
+        
+        Args:
+            db: Sessão do banco de dados
+            pontos: Pontos (latitude/longitude) a buscar
             
-        except Exception as e:
-            # Trata erros inesperados
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao buscar fazendas por ponto: {str(e)}"
-            )
+        Returns:
+            List[PontoFazendasResponse]: Um item por ponto, na ordem recebida, com as fazendas que o contêm
+        """
+        # Busca todas as fazendas de todos os pontos de uma vez
+        fazendas = await fazenda_repository.get_by_points(db, [(ponto.latitude, ponto.longitude) for ponto in pontos])
+        
+        # Agrupa as linhas pela posição do ponto (point_index começa em 1)
+        items_por_ponto: List[List[FazendaResponse]] = [[] for _ in pontos]
+        for fazenda in fazendas:
+            index = fazenda.pop("point_index")
+            items_por_ponto[index - 1].append(FazendaResponse.model_construct(**fazenda))
+        
+        return [
+            PontoFazendasResponse.model_construct(latitude=ponto.latitude, longitude=ponto.longitude, items=items)
+            for ponto, items in zip(pontos, items_por_ponto)
+        ]
     
     @staticmethod
-    def get_fazendas_by_radius(db: Session, latitude: float, longitude: float, raio_km: float, page: int = 1, page_size: int = 10) -> PaginatedResponse[FazendaResponse]:
+    async def get_fazendas_by_radius(db: AsyncSession, latitude: float, longitude: float, raio_km: float, page: int = 1, page_size: int = 10, after_id: Optional[int] = None, include_total: bool = False, exact_total: bool = False) -> FazendaPage:
         """
         Busca fazendas dentro de um raio específico a partir de um ponto central com paginação
         
@@ -177,37 +301,76 @@ class FazendaController:
             raio_km: Raio de busca em quilômetros
             page: Número da página (padrão: 1)
             page_size: Tamanho da página (padrão: 10)
+            after_id: Cursor keyset - id da última fazenda da página anterior (opcional)
+            include_total: Se True, calcula também o total (padrão: False, sem contagem)
+            exact_total: Com include_total, conta o total exato em vez de estimá-lo (padrão: False)
             
         Returns:
-            PaginatedResponse[FazendaResponse]: Resposta paginada com fazendas dentro do raio especificado
+            FazendaPage: Resposta paginada com fazendas dentro do raio especificado
             
-        Raises:
-            HTTPException: 
-                - 500: Em caso de erro interno do servidor
+        Note:
+            As coordenadas são arredondadas para 5 casas decimais (~1 m) e o raio para o
+            múltiplo de 10 m mais próximo antes da consulta ao SEARCH_CACHE, para que buscas
+            quase idênticas reaproveitem a mesma resposta
         """
-        try:
-            # Busca as fazendas no repositório com paginação
-            fazendas, total = FazendaRepository.get_by_radius(db, latitude, longitude, raio_km, page, page_size)
-            
-            # Converte os models para os schemas de resposta
-            items = [FazendaResponse.model_validate(fazenda) for fazenda in fazendas]
-            
-            # Calcula o total de páginas
-            total_pages = ceil(total / page_size) if total > 0 else 0
+        # Entradas arredondadas antes da consulta ao cache (o repository aplica o mesmo arredondamento)
+        latitude, longitude = FazendaController._quantize_coordinates(latitude, longitude)
+        raio_km = FazendaController._quantize_radius_km(raio_km)
+        cache_key = ("raio", latitude, longitude, raio_km, page, page_size, after_id, include_total, exact_total)
+        cached = SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Busca as fazendas no repositório com paginação
+        fazendas, total, has_next = await fazenda_repository.get_by_radius(db, latitude, longitude, raio_km, page, page_size, after_id, include_total=include_total, exact_total=exact_total)
+        
+        # Converte as linhas (já no formato de FazendaResponse) sem revalidar campo a campo
+        items = [FazendaResponse.model_construct(**fazenda) for fazenda in fazendas]
+        
+        # Monta a resposta paginada (total e total_pages nulos se include_total=False) e guarda no cache
+        response = FazendaPage.model_construct(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=FazendaController._get_total_pages(total, page_size),
+            has_next=has_next,
+            total_estimated=include_total and not exact_total,
+            next_cursor=FazendaController._get_next_cursor(items, has_next)
+        )
+        SEARCH_CACHE.set(cache_key, response)
+        return response
+    
+    @staticmethod
+    async def get_fazendas_tile(db: AsyncSession, z: int, x: int, y: int) -> bytes:
+        """
+        Gera o vector tile (MVT) das fazendas no tile z/x/y
+        
+        Args:
+            db: Sessão do banco de dados
+            z: Nível de zoom do tile
+            x: Coluna do tile
+            y: Linha do tile
             
-            # Retorna a resposta paginada
-            return PaginatedResponse[FazendaResponse](
-                items=items,
-                total=total,
-                page=page,
-                page_size=page_size,
-                total_pages=total_pages
-            )
+        Returns:
+            bytes: Tile no formato Mapbox Vector Tile, camada "fazendas" (vazio se não houver fazendas no tile)
             
-        except Exception as e:
-            # Trata erros inesperados
+        Raises:
+            HTTPException: 404 se x/y estiverem fora da grade do nível de zoom
+        """
+        # Um nível de zoom z tem 2^z colunas e 2^z linhas
+        if x >= 2 ** z or y >= 2 ** z:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Erro ao buscar fazendas por raio: {str(e)}"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Tile {z}/{x}/{y} fora da grade do nível de zoom {z}"
             )
-
+        
+        # Tile em cache evita gerar novamente as geometrias no banco
+        cache_key = (z, x, y)
+        cached = TILE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        tile = await fazenda_repository.get_tile(db, z, x, y, TILE_LAYER)
+        TILE_CACHE.set(cache_key, tile)
+        return tile
@@ -1,5 +1,11 @@
 from app.schemas.health_schema import HealthResponse
 
+# Resposta constante: construída uma única vez (o endpoint é chamado a cada liveness probe)
+HEALTH_RESPONSE = HealthResponse(
+    status="healthy",
+    message="API está funcionando corretamente"
+)
+
 
 class HealthController:
     """
@@ -14,7 +20,4 @@ class HealthController:
         Returns:
             HealthResponse: Objeto com status e mensagem da API
         """
-        return HealthResponse(
-            status="healthy",
-            message="API está funcionando corretamente"
-        )
+        return HEALTH_RESPONSE
@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Cache em memória (por processo) com expiração (TTL) e limite de tamanho (LRU).
+
+    Ao atingir maxsize, a entrada usada há mais tempo é descartada, evitando que
+    o cache cresça sem limite (ex.: muitos cod_imovel distintos consultados).
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Quantidade máxima de entradas mantidas no cache
+            ttl: Tempo de vida de cada entrada, em segundos
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Retorna o valor associado à chave, se existir e não estiver expirado
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Valor em cache, ou None se ausente/expirado
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            # Marca como usada recentemente (LRU)
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Armazena um valor no cache, descartando a entrada menos usada se necessário
+
+        Args:
+            key: Chave da entrada
+            value: Valor a ser armazenado
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """
+        Remove a entrada associada à chave (ex.: invalidação após uma escrita)
+
+        Args:
+            key: Chave da entrada
+
+        Returns:
+            Valor removido, ou None se a chave não estava no cache
+        """
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        """
+        Remove todas as entradas do cache
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,11 +8,27 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str
+    # True quando a conexão passa por PgBouncer em modo transaction (desliga prepared statements)
+    POSTGRES_PGBOUNCER: bool = False
+    # Ambiente da aplicação: "dev" e "test" ativam a detecção de lazy loads (N+1)
+    APP_ENV: str = "production"
 
     model_config = SettingsConfigDict(
         env_file=".env",
-        extra="ignore"  # Ignora campos extras no .env que não estão definidos aqui
+        extra="ignore",  # Ignora campos extras no .env que não estão definidos aqui
+        frozen=True      # Imutável (e hashable): pode ser usado como chave de outros caches
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Retorna as configurações da aplicação, lendo o ambiente/.env uma única vez
+    
+    Returns:
+        Settings: Instância única (e imutável) das configurações
+    """
+    return Settings()
+
+
+settings = get_settings()
@@ -1,17 +1,31 @@
 from fastapi import Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
+from app.core.middleware import logger
 
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError) -> JSONResponse:
+async def validation_exception_handler(request: Request, exc: RequestValidationError) -> ORJSONResponse:
     """
     Handler customizado para erros de validação do Pydantic/FastAPI
     Retorna mensagem de erro amigável em português
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "detail": "Entrada inválida"
         }
     )
 
+
+async def unhandled_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
+    """
+    Handler único para erros inesperados (substitui os try/except genéricos dos controllers)
+    Registra o erro com traceback no log e retorna 500 sem expor detalhes internos
+    """
+    logger.error("Erro não tratado em %s %s", request.method, request.url.path, exc_info=exc)
+    return ORJSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "detail": "Erro interno do servidor"
+        }
+    )
@@ -1,10 +1,12 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import time
 import sys
-from datetime import datetime
+from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Configurar logging para arquivo e console
 logger = logging.getLogger("middleware_logger")
@@ -15,14 +17,15 @@ if not logger.handlers:
     # Formato das mensagens
     formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     
-    # Criar nome do arquivo com data no padrão PostgreSQL (app-YYYY-MM-DD.log)
+    # Arquivo atual em logs/api/app.log; à meia-noite é renomeado para app.log.YYYY-MM-DD
+    # (rotação feita pelo próprio handler, na thread do QueueListener)
     log_dir = Path("logs/api")
     log_dir.mkdir(parents=True, exist_ok=True)
-    today = datetime.now().strftime("%Y-%m-%d")
-    log_filename = log_dir / f"app-{today}.log"
     
-    # Handler para arquivo com data no nome
-    file_handler = logging.FileHandler(log_filename, encoding="utf-8")
+    # Handler para arquivo com rotação diária (mantém 30 dias; abre o arquivo só no primeiro log)
+    file_handler = TimedRotatingFileHandler(
+        log_dir / "app.log", when="midnight", backupCount=30, encoding="utf-8", delay=True
+    )
     file_handler.setLevel(logging.INFO)
     file_handler.setFormatter(formatter)
     
@@ -31,75 +34,107 @@ if not logger.handlers:
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
     
-    # Adicionar handlers ao logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # O logger só enfileira os registros (rápido, sem I/O no caminho da requisição);
+    # a escrita em arquivo/console é feita por uma thread em segundo plano
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    log_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    log_listener.start()
+    # Esvazia a fila e encerra a thread ao finalizar o processo
+    atexit.register(log_listener.stop)
     
     # Evitar duplicação de logs
     logger.propagate = False
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+class LoggingMiddleware:
+    """
+    Middleware ASGI puro de logging das requisições.
+    
+    Não usa BaseHTTPMiddleware: a resposta não é bufferizada nem executada em uma
+    task group separada; apenas o status é capturado da mensagem http.response.start.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Apenas requisições HTTP são logadas (lifespan, websocket passam direto)
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         # Capturar detalhes da requisição
-        client_ip = request.client.host if request.client else "unknown"
-        method = request.method
-        url = request.url.path
-        query_params = str(request.query_params) if request.query_params else ""
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        method = scope["method"]
+        url = scope["path"]
+        query_params = scope.get("query_string", b"").decode("latin-1")
         full_url = f"{url}?{query_params}" if query_params else url
         
-        # Log da requisição
-        logger.info(f"Request: {method} {full_url} from {client_ip}")
+        # Log da requisição (formatação lazy: só ocorre se o nível estiver habilitado)
+        logger.info("Request: %s %s from %s", method, full_url, client_ip)
         
-        # Medir tempo de processamento
-        start_time = time.time()
+        # Status da resposta, capturado ao enviar o início da resposta (500 se a app falhar antes)
+        status_holder = [500]
         
-        # Processar a requisição
-        response = await call_next(request)
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
         
-        # Calcular tempo de processamento
-        process_time = time.time() - start_time
+        # Medir tempo de processamento (perf_counter: monotônico e mais barato que time.time)
+        start_time = time.perf_counter()
         
-        # Obter informações detalhadas da rota processada
-        route_info = {
-            "path": url,
-            "endpoint": "unknown",
-            "handler": "unknown"
-        }
+        try:
+            # Processar a requisição
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Calcular tempo de processamento
+            process_time = time.perf_counter() - start_time
+            self._log_response(scope, method, full_url, client_ip, status_holder[0], process_time)
+    
+    @staticmethod
+    def _log_response(scope: Scope, method: str, full_url: str, client_ip: str, status_code: int, process_time: float) -> None:
+        """
+        Loga a resposta com as informações da rota processada
         
-        if hasattr(request, 'scope'):
-            # Tentar obter informações da rota
-            route = request.scope.get('route')
-            if route:
-                route_info["path"] = getattr(route, 'path', url)
-                route_info["endpoint"] = getattr(route, 'name', 'unknown')
-                
-                # Tentar obter informações do handler
-                if 'endpoint' in request.scope:
-                    endpoint = request.scope['endpoint']
-                    if hasattr(endpoint, '__name__'):
-                        route_info["handler"] = endpoint.__name__
-                    elif hasattr(endpoint, '__qualname__'):
-                        route_info["handler"] = endpoint.__qualname__
-                    elif hasattr(endpoint, '__module__'):
-                        route_info["handler"] = f"{endpoint.__module__}.{getattr(endpoint, '__name__', 'unknown')}"
+        Args:
+            scope: Escopo ASGI (o roteador registra nele a rota e o endpoint atendidos)
+            method: Método HTTP
+            full_url: Caminho com query string
+            client_ip: IP do cliente
+            status_code: Status HTTP da resposta
+            process_time: Tempo de processamento em segundos
+        """
+        # Usar ERRO para códigos de erro (>= 400), INFO para sucesso
+        level = logging.ERROR if status_code >= 400 else logging.INFO
         
-        # Log da resposta com informações completas do que foi processado
-        status_code = response.status_code
+        # Nível desabilitado: não monta as informações da rota
+        if not logger.isEnabledFor(level):
+            return
         
-        # Usar ERRO para códigos de erro (>= 400), INFO para sucesso
-        log_message = (
-            f"Response: {method} {full_url} returned {status_code} to {client_ip} | "
-            f"Endpoint: {route_info['endpoint']} | "
-            f"Handler: {route_info['handler']} | "
-            f"Path: {route_info['path']} | "
-            f"ProcessTime: {process_time:.4f}s"
-        )
+        # Obter informações da rota processada
+        route_path = scope["path"]
+        route_endpoint = "unknown"
+        route_handler = "unknown"
         
-        if status_code >= 400:
-            logger.error(log_message)
-        else:
-            logger.info(log_message)
+        route = scope.get("route")
+        if route:
+            route_path = getattr(route, "path", route_path)
+            route_endpoint = getattr(route, "name", "unknown")
+            
+            # Obter informações do handler
+            endpoint = scope.get("endpoint")
+            if endpoint is not None:
+                route_handler = getattr(endpoint, "__name__", None) or getattr(endpoint, "__qualname__", "unknown")
         
-        return response
-
+        # Log da resposta com informações completas do que foi processado
+        logger.log(
+            level,
+            "Response: %s %s returned %s to %s | Endpoint: %s | Handler: %s | Path: %s | ProcessTime: %.4fs",
+            method, full_url, status_code, client_ip,
+            route_endpoint, route_handler, route_path, process_time
+        )
@@ -1,57 +1,126 @@
 # Importa as classes necessárias do SQLAlchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base, Session
-from typing import Generator
+from sqlalchemy import event
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, declarative_base, raiseload
+from typing import AsyncGenerator
+from uuid import uuid4
 
 # Importa as configurações do banco de dados
 from app.core.config import settings
 
+# Requer PostgreSQL com PostGIS >= 3.2 (ST_Point com SRID; índice SP-GiST na coluna geom, criado pelo script de carga)
+
 # Monta a URL de conexão com o banco de dados
-DATABASE_URL = (
-    f"postgresql://{settings.POSTGRES_USER}:"
-    f"{settings.POSTGRES_PASSWORD}@"
-    f"{settings.POSTGRES_HOST}:"
-    f"{settings.POSTGRES_PORT}/"
-    f"{settings.POSTGRES_DB}"
+# Usa o driver assíncrono asyncpg (as queries não bloqueiam o event loop do FastAPI);
+# URL.create escapa caracteres especiais do usuário/senha
+DATABASE_URL = URL.create(
+    drivername="postgresql+asyncpg",
+    username=settings.POSTGRES_USER,
+    password=settings.POSTGRES_PASSWORD,
+    host=settings.POSTGRES_HOST,
+    port=settings.POSTGRES_PORT,
+    database=settings.POSTGRES_DB
 )
 
-# Cria o engine do SQLAlchemy com verificação de conexão
-engine = create_engine(
+# Parâmetros do planner aplicados a cada conexão da API (sem precisar alterar o postgresql.conf):
+# - random_page_cost baixo: armazenamento SSD, favorece index scans nos índices GiST/SP-GiST
+# - effective_cache_size/work_mem: working set espacial cabe em memória
+# - jit desligado: a compilação JIT custa mais do que economiza nas queries PostGIS curtas
+# - plan_cache_mode=force_generic_plan: os selects são montados uma vez com parâmetros
+#   nomeados e o asyncpg os prepara no backend (statement_cache_size); com plano genérico
+#   o PostgreSQL planeja cada statement uma vez por conexão, em vez de replanejar a cada
+#   execução. Vale para as buscas cujo plano não muda com os parâmetros (ponto, igualdade
+#   em cod_imovel/id, raios pequenos); a busca por raio grande força um plano customizado
+#   na própria transação (LARGE_RADIUS_SETTINGS em geo_repository_mixin)
+PLANNER_SETTINGS = {
+    "random_page_cost": "1.1",
+    "effective_cache_size": "4GB",
+    "work_mem": "32MB",
+    "jit": "off",
+    "plan_cache_mode": "force_generic_plan",
+}
+
+# Os parâmetros vão no pacote de inicialização da conexão (server_settings do asyncpg),
+# sem round trip de SET extra. Em modo transaction, o PgBouncer troca o backend entre
+# transações: os prepared statements do asyncpg deixam de existir no servidor (desliga o
+# cache de statements e usa nomes únicos, evitando colisão de nomes entre clientes no mesmo
+# backend) e parâmetros de sessão não são preservados: os de PLANNER_SETTINGS ficam
+# persistidos no banco (init-scripts/02-planner-settings.sql, ALTER DATABASE ... SET).
+# O custo desse modo é perder o reuso de prepared statements (cada query é preparada de
+# novo), por isso no docker-compose o PgBouncer é opcional e a API conecta direto por padrão.
+# Com PgBouncer o pool local não cresce além de pool_size: quem limita e multiplexa as
+# conexões reais com o PostgreSQL é o próprio PgBouncer
+if settings.POSTGRES_PGBOUNCER:
+    CONNECT_ARGS = {
+        "statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+    MAX_OVERFLOW = 0
+else:
+    CONNECT_ARGS = {"server_settings": PLANNER_SETTINGS}
+    MAX_OVERFLOW = 40
+
+# Cria o engine assíncrono do SQLAlchemy com verificação de conexão
+engine = create_async_engine(
     DATABASE_URL,
-    pool_pre_ping=True  # Verifica se a conexão está ativa antes de usar
+    pool_pre_ping=True,     # Verifica se a conexão está ativa antes de usar
+    pool_size=20,           # Conexões mantidas abertas no pool
+    max_overflow=MAX_OVERFLOW,  # Conexões extras permitidas em picos de carga (0 com PgBouncer)
+    pool_recycle=1800,      # Renova conexões com mais de 30 minutos
+    pool_use_lifo=True,     # Reusa a conexão mais recente (backend com catálogo/planos já aquecidos)
+    query_cache_size=1200,  # Cache de SQL compilado do SQLAlchemy (padrão: 500)
+    connect_args=CONNECT_ARGS
 )
 
-# Cria a fábrica de sessões do banco de dados
-SessionLocal = sessionmaker(
-    autocommit=False,  # Não faz commit automático
-    autoflush=False,   # Não faz flush automático
-    bind=engine        # Vincula ao engine criado
+# Cria a fábrica de sessões assíncronas do banco de dados
+SessionLocal = async_sessionmaker(
+    bind=engine,             # Vincula ao engine criado
+    class_=AsyncSession,
+    autoflush=False,         # Não faz flush automático
+    expire_on_commit=False   # Mantém os objetos carregados após o commit (evita lazy loads)
 )
 
 # Base para criar os modelos do banco de dados
 Base = declarative_base()
 
+# Ambientes em que lazy loads (N+1) disparam erro em vez de consultas silenciosas
+N_PLUS_ONE_RAISE_ENVS = ("dev", "test")
+
+
+def _raiseload_all(orm_execute_state: ORMExecuteState) -> None:
+    """
+    Aplica raiseload("*") a todo SELECT ORM, fazendo qualquer acesso a
+    relacionamento não carregado explicitamente (selectinload/joinedload)
+    levantar InvalidRequestError em vez de gerar uma consulta extra por linha.
+    
+    Args:
+        orm_execute_state: Estado da execução ORM recebido do evento do Session
+    """
+    if orm_execute_state.is_select and not orm_execute_state.is_relationship_load:
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
+
+
+if settings.APP_ENV in N_PLUS_ONE_RAISE_ENVS:
+    # AsyncSession delega para um Session síncrono, então o evento vale para ambos
+    event.listen(Session, "do_orm_execute", _raiseload_all)
+
 
 # Função que retorna uma sessão do banco de dados
-def get_db() -> Generator[Session, None, None]:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
-    Dependência para obter uma sessão do banco de dados.
+    Dependência para obter uma sessão assíncrona do banco de dados.
     Usada como dependency no FastAPI.
     
     Yields:
-        Session: Sessão do banco de dados
+        AsyncSession: Sessão assíncrona do banco de dados
         
     Example:
         @router.get("/exemplo")
-        def exemplo(db: Session = Depends(get_db)):
-            # Use db para fazer queries
-            pass
+        async def exemplo(db: AsyncSession = Depends(get_db)):
+            result = await db.execute(select(*FAZENDA_COLUMNS).where(...))
+            rows = result.mappings().all()  # colunas projetadas, sem entidades ORM nem geometria
     """
-    # Cria uma nova sessão
-    db = SessionLocal()
-    try:
-        # Retorna a sessão para uso
+    # Cria uma nova sessão e sempre a fecha após o uso
+    async with SessionLocal() as db:
         yield db
-    finally:
-        # Sempre fecha a sessão após o uso
-        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Text
+from sqlalchemy import Column, Date, Index, Integer, Float, Text
 from geoalchemy2 import Geometry, Geography
 from app.infrastructure.database import Base
 
@@ -8,10 +8,18 @@ class Fazenda(Base):
     Modelo SQLAlchemy para a tabela fazendas
     """
     __tablename__ = "fazendas"
+    # Btree em (cod_imovel, id) (mesmo nome do índice criado pelo script de carga):
+    # a busca GET /fazendas/{cod_imovel} vira um index scan já na ordem da paginação
+    # keyset (id), sem sort e parando no LIMIT
+    __table_args__ = (
+        Index("idx_fazendas_cod_imovel_id", "cod_imovel", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    geom = Column('geom', Geometry('GEOMETRY', srid=4326), nullable=True)
-    geog = Column('geog', Geography('GEOMETRY', srid=4326), nullable=True)
+    # Índices espaciais criados pelo script de carga (scripts_carga/load_data.py):
+    # geom usa SP-GiST (GeoAlchemy2 só emite GIST, por isso spatial_index=False) e geog usa GIST
+    geom = Column('geom', Geometry('GEOMETRY', srid=4326, spatial_index=False), nullable=True)
+    geog = Column('geog', Geography('GEOMETRY', srid=4326, spatial_index=True), nullable=True)
     cod_tema = Column(Text, nullable=True)
     nom_tema = Column(Text, nullable=True)
     cod_imovel = Column(Text, nullable=True)
@@ -22,6 +30,7 @@ class Fazenda(Base):
     des_condic = Column(Text, nullable=True)
     municipio = Column(Text, nullable=True)
     cod_estado = Column(Text, nullable=True)
-    dat_criaca = Column(Text, nullable=True)
-    dat_atuali = Column(Text, nullable=True)
+    # DATE, como na tabela criada pelo script de carga (COLUMN_TYPE_MAPPING)
+    dat_criaca = Column(Date, nullable=True)
+    dat_atuali = Column(Date, nullable=True)
 
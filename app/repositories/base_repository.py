@@ -1,5 +1,6 @@
-from sqlalchemy.orm import Session
-from typing import Optional, TypeVar, Generic, Type
+from sqlalchemy import bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, Optional, Sequence, TypeVar, Generic, Type
 
 # Tipo genérico para os modelos
 ModelType = TypeVar("ModelType")
@@ -11,23 +12,36 @@ class BaseRepository(Generic[ModelType]):
     Implementa o padrão Generic Repository Pattern.
     """
     
-    def __init__(self, model: Type[ModelType]):
+    def __init__(self, model: Type[ModelType], columns: Optional[Sequence] = None):
         """
         Args:
             model: Classe do modelo SQLAlchemy
+            columns: Colunas (da tabela, SQLAlchemy Core) projetadas nas consultas de leitura
+                (padrão: todas as colunas da tabela)
         """
         self.model = model
+        # As leituras usam as colunas da tabela (Core), e não os atributos do model (ORM):
+        # os selects não passam pela compilação/execução ORM e retornam linhas simples
+        self.table = model.__table__
+        self.columns = list(columns) if columns is not None else list(self.table.columns)
+        
+        # Atributos resolvidos uma única vez (e não a cada consulta): campos geoespaciais
+        # usados pelo GeoRepositoryMixin (None se a tabela não os tiver) e o select por ID
+        self._geom = self.table.c.get("geom")
+        self._geog = self.table.c.get("geog")
+        self._get_by_id_statement = select(*self.columns).where(self.table.c.id == bindparam("entity_id"))
     
-    def get_by_id(self, db: Session, entity_id: int) -> Optional[ModelType]:
+    async def get_by_id(self, db: AsyncSession, entity_id: int) -> Optional[Dict[str, Any]]:
         """
-        Busca uma entidade pelo ID
+        Busca uma entidade pelo ID, projetando apenas as colunas de self.columns
         
         Args:
             db: Sessão do banco de dados
             entity_id: ID da entidade a ser buscada
             
         Returns:
-            Entidade se encontrada, None caso contrário
+            Dicionário com as colunas projetadas se encontrada, None caso contrário
         """
-        return db.query(self.model).filter(self.model.id == entity_id).first()
+        row = (await db.execute(self._get_by_id_statement, {"entity_id": entity_id})).mappings().first()
+        return dict(row) if row is not None else None
 
@@ -1,9 +1,33 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List, Tuple
+from sqlalchemy import Integer, Text, any_, bindparam, func, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
 from app.models.fazenda_model import Fazenda
 from app.repositories.base_repository import BaseRepository
 from app.repositories.geo_repository_mixin import GeoRepositoryMixin
 
+# Colunas da tabela fazendas (SQLAlchemy Core): as leituras não passam pelo ORM
+fazendas_table = Fazenda.__table__
+
+# Colunas retornadas nas buscas em lista (as mesmas de FazendaResponse).
+# Não inclui geom/geog, e as datas (DATE no banco) já vêm formatadas como texto ISO (YYYY-MM-DD)
+# por to_char, independente do DateStyle da sessão.
+FAZENDA_COLUMNS = (
+    fazendas_table.c.id,
+    fazendas_table.c.cod_tema,
+    fazendas_table.c.nom_tema,
+    fazendas_table.c.cod_imovel,
+    fazendas_table.c.mod_fiscal,
+    fazendas_table.c.num_area,
+    fazendas_table.c.ind_status,
+    fazendas_table.c.ind_tipo,
+    fazendas_table.c.des_condic,
+    fazendas_table.c.municipio,
+    fazendas_table.c.cod_estado,
+    func.to_char(fazendas_table.c.dat_criaca, "YYYY-MM-DD", type_=Text).label("dat_criaca"),
+    func.to_char(fazendas_table.c.dat_atuali, "YYYY-MM-DD", type_=Text).label("dat_atuali"),
+)
+
 
 class FazendaRepository(BaseRepository[Fazenda], GeoRepositoryMixin[Fazenda]):
     """
@@ -16,19 +40,18 @@ class FazendaRepository(BaseRepository[Fazenda], GeoRepositoryMixin[Fazenda]):
     
     def __init__(self):
         """
-        Inicializa o repository com o modelo Fazenda
+        Inicializa o repository com o modelo Fazenda e as colunas projetadas nas buscas
         """
-        BaseRepository.__init__(self, Fazenda)
+        BaseRepository.__init__(self, Fazenda, FAZENDA_COLUMNS)
     
     # Métodos disponíveis através das classes base:
-    # - get_by_id(db, fazenda_id) -> Optional[Fazenda] (de BaseRepository)
-    # - get_by_cod_imovel(db, cod_imovel, page=1, page_size=10) -> Tuple[List[Fazenda], int] (busca por cod_imovel com paginação, pode retornar múltiplos)
-    # - get_by_point(db, latitude, longitude, page=1, page_size=10) -> Tuple[List[Fazenda], int] (de GeoRepositoryMixin)
-    # - get_by_radius(db, latitude, longitude, raio_km, page=1, page_size=10) -> Tuple[List[Fazenda], int] (de GeoRepositoryMixin)
+    # - get_by_cod_imovel(db, cod_imovel, page=1, page_size=10, after_id=None) -> Tuple[List[Dict], int, bool] (definido abaixo)
+    # - get_by_id(db, fazenda_id) -> Optional[Dict] (de BaseRepository)
+    # - get_by_point(db, latitude, longitude, page=1, page_size=10, after_id=None, include_total=False) -> Tuple[List[Dict], Optional[int], bool] (de GeoRepositoryMixin)
+    # - get_by_points(db, coordinates) -> List[Dict] (várias buscas por ponto em uma única query, de GeoRepositoryMixin)
+    # - get_by_radius(db, latitude, longitude, radius_km, page=1, page_size=10, after_id=None, include_total=False) -> Tuple[List[Dict], Optional[int], bool] (de GeoRepositoryMixin)
     
-    # Métodos estáticos mantidos para compatibilidade com código existente
-    @staticmethod
-    def get_by_cod_imovel(db: Session, cod_imovel: str, page: int = 1, page_size: int = 10) -> Tuple[List[Fazenda], int]:
+    async def get_by_cod_imovel(self, db: AsyncSession, cod_imovel: str, page: int = 1, page_size: int = 10, after_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], int, bool]:
         """
         Busca todas as fazendas pelo cod_imovel (pode retornar múltiplos resultados) com paginação
         
@@ -37,74 +60,47 @@ class FazendaRepository(BaseRepository[Fazenda], GeoRepositoryMixin[Fazenda]):
             cod_imovel: Código do imóvel da fazenda a ser buscada
             page: Número da página (padrão: 1)
             page_size: Tamanho da página (padrão: 10)
+            after_id: Cursor keyset - id da última fazenda da página anterior (opcional)
             
         Returns:
-            Tupla contendo (lista de fazendas paginadas, total de fazendas encontradas)
-        """
-        query = db.query(Fazenda).filter(Fazenda.cod_imovel == cod_imovel)
-        
-        # Conta o total de registros
-        total = query.count()
-        
-        # Aplica paginação
-        offset = (page - 1) * page_size
-        fazendas = query.offset(offset).limit(page_size).all()
-        
-        return fazendas, total
-    
-    @staticmethod
-    def get_by_id(db: Session, fazenda_id: int) -> Optional[Fazenda]:
-        """
-        Busca uma fazenda pelo ID (método estático para compatibilidade)
-        DEPRECATED: Use get_by_cod_imovel() em vez disso.
-        
-        Args:
-            db: Sessão do banco de dados
-            fazenda_id: ID da fazenda a ser buscada
-            
-        Returns:
-            Fazenda se encontrada, None caso contrário
-        """
-        return db.query(Fazenda).filter(Fazenda.id == fazenda_id).first()
-    
-    @staticmethod
-    def get_by_point(db: Session, latitude: float, longitude: float, page: int = 1, page_size: int = 10) -> Tuple[List[Fazenda], int]:
-        """
-        Busca fazendas que contêm um ponto específico (latitude/longitude) com paginação
-        (método estático para compatibilidade)
-        
-        Args:
-            db: Sessão do banco de dados
-            latitude: Latitude do ponto
-            longitude: Longitude do ponto
-            page: Número da página (padrão: 1)
-            page_size: Tamanho da página (padrão: 10)
-            
-        Returns:
-            Tupla contendo (lista de fazendas paginadas, total de fazendas encontradas)
+            Tupla contendo (lista de fazendas paginadas como dicts, total de fazendas encontradas,
+            se existe próxima página)
         """
-        repository = FazendaRepository()
-        # Chama diretamente o método do mixin para evitar recursão
-        return GeoRepositoryMixin.get_by_point(repository, db, latitude, longitude, page, page_size)
+        # Filtro por igualdade resolvido pelo índice idx_fazendas_cod_imovel_id, que já
+        # entrega as linhas ordenadas por id (offset ou keyset sem sort); página e total
+        # vêm de uma única query (CTE + count), e um código inexistente retorna total 0
+        # sem consulta extra
+        stmt = self._get_statement(
+            "cod_imovel",
+            lambda: select(*self.columns).where(fazendas_table.c.cod_imovel == bindparam("cod_imovel", type_=Text))
+        )
+        # O total é sempre calculado: um total 0 identifica o código inexistente (404)
+        return await self._paginate(db, stmt, page, page_size, after_id, params={"cod_imovel": cod_imovel}, include_total=True)
     
-    @staticmethod
-    def get_by_radius(db: Session, latitude: float, longitude: float, raio_km: float, page: int = 1, page_size: int = 10) -> Tuple[List[Fazenda], int]:
+    async def get_by_ids(self, db: AsyncSession, ids: List[int]) -> List[Dict[str, Any]]:
         """
-        Busca fazendas dentro de um raio específico a partir de um ponto central com paginação
-        (método estático para compatibilidade)
+        Busca várias fazendas pelos IDs em uma única query (uma ida ao banco em vez de N)
         
         Args:
             db: Sessão do banco de dados
-            latitude: Latitude do ponto central
-            longitude: Longitude do ponto central
-            raio_km: Raio de busca em quilômetros
-            page: Número da página (padrão: 1)
-            page_size: Tamanho da página (padrão: 10)
+            ids: IDs das fazendas a serem buscadas
             
         Returns:
-            Tupla contendo (lista de fazendas paginadas, total de fazendas encontradas)
+            Lista de dicts com as colunas de FAZENDA_COLUMNS, ordenada por id
+            (IDs inexistentes são ignorados)
         """
-        repository = FazendaRepository()
-        # Chama diretamente o método do mixin para evitar recursão
-        return GeoRepositoryMixin.get_by_radius(repository, db, latitude, longitude, raio_km, page, page_size)
+        # id = ANY(:ids) com um único parâmetro array: o texto da query não muda com a
+        # quantidade de IDs (ao contrário de IN (...)), preservando o cache de statements
+        stmt = self._get_statement(
+            "ids",
+            lambda: select(*self.columns)
+            .where(fazendas_table.c.id == any_(bindparam("ids", type_=ARRAY(Integer))))
+            .order_by(fazendas_table.c.id)
+        )
+        result = await db.execute(stmt, {"ids": ids})
+        return [dict(row) for row in result.mappings()]
+
 
+# Instância única usada pelos controllers: mantém os selects já montados
+# (ver GeoRepositoryMixin._get_statement) entre as requisições
+fazenda_repository = FazendaRepository()
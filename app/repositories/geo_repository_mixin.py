@@ -1,11 +1,39 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from sqlalchemy.sql import and_, text
-from typing import List, TypeVar, Generic, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, Integer, LargeBinary, and_, func, cast, select, text, true
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import bindparam
+from geoalchemy2 import Geography
+from functools import lru_cache
+import json
+from math import cos, degrees, radians
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar, Generic, Tuple
 
 # Tipo genérico para os modelos
 ModelType = TypeVar("ModelType")
 
+# Precisão usada na busca por raio: coordenadas com 5 casas decimais (~1 m) e raio em
+# múltiplos de 10 m, de modo que buscas praticamente iguais reaproveitem o cache do envelope
+COORDINATE_DECIMALS = 5
+RADIUS_STEP_METERS = 10
+
+# Acima deste raio (km) o bounding box cobre boa parte da tabela e o planner tende a
+# preferir um seq scan; a busca desabilita seq scans na transação para manter os índices
+SEQSCAN_OFF_RADIUS_KM = 100
+
+# Ajustes da transação para raios grandes. plan_cache_mode=force_custom_plan é necessário
+# porque as conexões usam force_generic_plan (PLANNER_SETTINGS): o plano genérico já em
+# cache no statement preparado não é replanejado quando enable_seqscan muda, e a dica
+# seria ignorada. Um único SELECT set_config(..., true) aplica os dois até o fim da transação
+LARGE_RADIUS_SETTINGS = text(
+    "SELECT set_config('plan_cache_mode', 'force_custom_plan', true), "
+    "set_config('enable_seqscan', 'off', true)"
+)
+
+# Menor raio de curvatura meridional do elipsoide WGS84 (no equador), em metros:
+# converte distâncias em graus sem subestimar o bounding box em nenhuma latitude
+EARTH_MIN_RADIUS_METERS = 6_335_439
+
 
 class GeoRepositoryMixin(Generic[ModelType]):
     """
@@ -14,7 +42,15 @@ class GeoRepositoryMixin(Generic[ModelType]):
     
     Requisitos:
         - O model deve ter um atributo de geometria (padrão: 'geom')
+        - O repository deve definir self.table, self.columns, self._geom e self._geog
+          (ver BaseRepository)
         - O banco de dados deve ter suporte PostGIS
+    
+    As buscas retornam linhas como dicts com as colunas projetadas em self.columns,
+    sem hidratar entidades ORM.
+    
+    Os selects filtrados são montados uma única vez por instância, com parâmetros
+    nomeados (:lon, :lat, ...), e reutilizados: a cada requisição só os valores mudam.
     """
     
     def _validate_radius(self, radius_km: float):
@@ -24,37 +60,211 @@ class GeoRepositoryMixin(Generic[ModelType]):
         if radius_km > 20000:  # Aproximadamente metade da circunferência da Terra
             raise ValueError("Raio muito grande (máximo: 20000 km)")
     
-    def _get_paginated_total(self, query, page: int, page_size: int, entities: List[ModelType]) -> int:
+    def _get_statement(self, key: Hashable, build: Callable[[], Any]):
+        """
+        Retorna o select associado à chave, montando-o (build) apenas na primeira chamada
+        
+        Args:
+            key: Identificador do select (ex.: ("point", "geom"))
+            build: Função que monta o select com parâmetros nomeados
+            
+        Returns:
+            Select SQLAlchemy reutilizável (os valores são passados na execução)
+        """
+        statements = self.__dict__.setdefault("_statements", {})
+        if key not in statements:
+            statements[key] = build()
+        return statements[key]
+    
+    def _geom_field(self, geom_field_name: str):
+        """
+        Retorna a coluna de geometria da tabela, usando a coluna já resolvida no
+        __init__ (self._geom) para o campo padrão 'geom'
+        
+        Args:
+            geom_field_name: Nome do campo de geometria
+            
+        Returns:
+            Coluna de geometria da tabela
+        """
+        if geom_field_name == "geom" and self._geom is not None:
+            return self._geom
+        return self.table.c[geom_field_name]
+    
+    @staticmethod
+    def _make_point():
+        """
+        Cria o ponto PostGIS (SRID 4326 = WGS84) a partir dos parâmetros :lon e :lat.
+        
+        Usa ST_Point(lon, lat, srid) (PostGIS 3.2+), que dispensa o ST_SetSRID em volta
+        do ST_MakePoint. As coordenadas vão como parâmetros tipados, e não como literais,
+        mantendo o texto da query estável para o cache de prepared statements do asyncpg.
+        
+        Returns:
+            Expressão SQL do ponto (geometry), reutilizável em vários filtros da mesma query
+        """
+        return func.ST_Point(
+            bindparam("lon", type_=Float),
+            bindparam("lat", type_=Float),
+            4326
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _radius_envelope(longitude: float, latitude: float, radius_meters: float) -> Tuple[float, float, float, float]:
         """
-        Calcula o total de resultados de forma otimizada.
+        Calcula o retângulo (em graus) que contém o círculo de raio radius_meters em torno do ponto.
         
-        Otimização: se primeira página e menos resultados que page_size, 
-        usa len(entities) como total, evitando uma query count() adicional.
-        Caso contrário, faz count() para obter o total real.
+        Os deltas em graus usam o menor raio de curvatura da Terra, de modo que o
+        retângulo sempre cobre o círculo calculado pelo ST_DWithin (esfera ou esferoide). O delta de
+        longitude usa a latitude mais distante do equador dentro do retângulo; se o
+        círculo alcança um polo, o retângulo cobre todas as longitudes.
+        
+        O resultado fica em cache (LRU) por (longitude, latitude, raio): clientes que repetem
+        a mesma busca (dashboards, tiles) não recalculam o retângulo. As entradas não são
+        arredondadas, pois um centro aproximado poderia gerar um retângulo que não cobre o círculo.
         
         Args:
-            query: Query SQLAlchemy
-            page: Número da página
+            longitude: Longitude do ponto central
+            latitude: Latitude do ponto central
+            radius_meters: Raio em metros
+            
+        Returns:
+            Tupla (xmin, ymin, xmax, ymax), usada nos parâmetros do ST_MakeEnvelope
+        """
+        dlat = degrees(radius_meters / EARTH_MIN_RADIUS_METERS)
+        lat_min = max(latitude - dlat, -90.0)
+        lat_max = min(latitude + dlat, 90.0)
+        
+        max_abs_lat = max(abs(lat_min), abs(lat_max))
+        if max_abs_lat >= 90.0:
+            lon_min, lon_max = -180.0, 180.0
+        else:
+            dlon = dlat / cos(radians(max_abs_lat))
+            lon_min = max(longitude - dlon, -180.0)
+            lon_max = min(longitude + dlon, 180.0)
+        
+        return lon_min, lat_min, lon_max, lat_max
+    
+    @staticmethod
+    async def _estimate_count(db: AsyncSession, stmt, params: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Estima a quantidade de linhas de um select pelo planner (EXPLAIN, sem executá-lo)
+        
+        O EXPLAIN só planeja a query: o custo é o do planejamento, e não o de avaliar o
+        filtro espacial em todas as linhas, como em um count(*). A estimativa usa as
+        estatísticas da tabela (ANALYZE) e a seletividade dos operadores do PostGIS.
+        
+        Args:
+            db: Sessão assíncrona do banco de dados
+            stmt: Select SQLAlchemy já filtrado
+            params: Valores dos parâmetros nomeados de stmt (opcional)
+            
+        Returns:
+            Quantidade estimada de linhas (Plan Rows do nó raiz do plano)
+        """
+        # Os valores entram como literais (números já validados pelos schemas), pois o
+        # EXPLAIN precisa deles para estimar a seletividade do filtro
+        bound = stmt.params(params) if params else stmt
+        sql = bound.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        plan = (await db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    async def _paginate(self, db: AsyncSession, stmt, page: int, page_size: int, after_id: Optional[int] = None, params: Optional[Dict[str, Any]] = None, include_total: bool = False, exact_total: bool = True) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
+        """
+        Aplica a paginação ordenada por id e indica se existe uma próxima página.
+        
+        A página é buscada com LIMIT page_size + 1: a linha excedente só indica que há
+        próxima página (has_next) e é descartada, sem nenhuma query count().
+        Com include_total, o select filtrado vira uma CTE (WITH filtered AS (...)),
+        referenciada pela contagem e pela página, então o predicado espacial continua
+        sendo avaliado uma única vez. A contagem faz LEFT JOIN com a página, de modo que
+        sempre volta ao menos uma linha com o total, mesmo quando a página pedida está
+        além do fim. Com after_id usa paginação keyset (WHERE id > after_id); a contagem
+        é feita sobre a CTE inteira, antes do filtro do cursor. Não há duas queries a
+        sobrepor (ex.: count e página em paralelo com asyncio.gather): isso ocuparia duas
+        conexões do pool e avaliaria o filtro espacial duas vezes.
+        Com include_total e exact_total=False, o total é estimado pelo planner
+        (_estimate_count) em vez de contado, e a página é buscada sem a CTE.
+        
+        Args:
+            db: Sessão assíncrona do banco de dados
+            stmt: Select SQLAlchemy já filtrado (sem ordenação/paginação)
+            page: Número da página (ignorado quando after_id é informado)
             page_size: Tamanho da página
-            entities: Lista de entidades já paginadas
+            after_id: Id da última entidade da página anterior (cursor)
+            params: Valores dos parâmetros nomeados de stmt (opcional)
+            include_total: Se True, calcula também o total de entidades encontradas
+            exact_total: Se False, o total (com include_total) é uma estimativa do planner
             
         Returns:
-            Total de entidades encontradas
+            Tupla contendo (lista de linhas paginadas, total de entidades encontradas ou
+            None se include_total for False, se existe próxima página)
         """
-        if page == 1 and len(entities) < page_size:
-            return len(entities)
+        keys = stmt.selected_columns.keys()
+        entities = []
+        total = None
+        
+        if include_total and exact_total:
+            filtered = stmt.cte("filtered")
+            
+            total_query = select(func.count().label("total")).select_from(filtered).subquery("t")
+            
+            page_query = select(filtered).order_by(filtered.c.id).limit(page_size + 1)
+            if after_id is None:
+                page_query = page_query.offset((page - 1) * page_size)
+            else:
+                page_query = page_query.where(filtered.c.id > after_id)
+            page_query = page_query.subquery("p")
+            
+            page_stmt = (
+                select(total_query.c.total, *page_query.c)
+                .select_from(total_query.outerjoin(page_query, true()))
+                .order_by(page_query.c.id)
+            )
+            
+            result = await db.execute(page_stmt, params)
+            
+            # Percorre o resultado uma única vez (sem materializar a lista intermediária de
+            # .all()), separando a coluna total das colunas projetadas. Página vazia: uma
+            # única linha com o total e as demais colunas nulas
+            total = 0
+            for row in result.mappings():
+                total = row["total"]
+                if row["id"] is not None:
+                    entities.append({key: row[key] for key in keys})
         else:
-            return query.count()
+            id_column = stmt.selected_columns.id
+            page_stmt = stmt.order_by(id_column).limit(page_size + 1)
+            if after_id is None:
+                page_stmt = page_stmt.offset((page - 1) * page_size)
+            else:
+                page_stmt = page_stmt.where(id_column > after_id)
+            
+            result = await db.execute(page_stmt, params)
+            entities = [{key: row[key] for key in keys} for row in result.mappings()]
+            
+            if include_total:
+                total = await self._estimate_count(db, stmt, params)
+        
+        # A linha excedente (page_size + 1) só sinaliza a próxima página
+        has_next = len(entities) > page_size
+        return entities[:page_size], total, has_next
     
-    def get_by_point(
+    async def get_by_point(
         self, 
-        db: Session, 
+        db: AsyncSession, 
         latitude: float, 
         longitude: float,
         page: int = 1,
         page_size: int = 10,
-        geom_field_name: str = "geom"
-    ) -> Tuple[List[ModelType], int]:
+        after_id: Optional[int] = None,
+        geom_field_name: str = "geom",
+        include_total: bool = False,
+        exact_total: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
         """
         Busca entidades que contêm um ponto específico (latitude/longitude) com paginação
         
@@ -64,43 +274,119 @@ class GeoRepositoryMixin(Generic[ModelType]):
             longitude: Longitude do ponto
             page: Número da página (padrão: 1)
             page_size: Tamanho da página (padrão: 10)
+            after_id: Cursor keyset - id da última entidade da página anterior (opcional)
             geom_field_name: Nome do campo de geometria (padrão: 'geom')
+            include_total: Se True, calcula também o total (padrão: False, sem contagem)
+            exact_total: Se True, o total é contado; senão, estimado pelo planner (padrão: False)
             
         Returns:
-            Tupla contendo (lista de entidades paginadas, total de entidades encontradas)
+            Tupla contendo (lista de linhas paginadas, total de entidades encontradas ou None,
+            se existe próxima página)
         """
-        # Cria um ponto PostGIS a partir das coordenadas (SRID 4326 = WGS84)
-        ponto = func.ST_SetSRID(
-            func.ST_MakePoint(longitude, latitude),
-            4326
-        )
+        stmt = self._get_statement(("point", geom_field_name), lambda: self._build_point_statement(geom_field_name))
+        
+        # Aplica paginação (keyset quando after_id é informado); o total só é contado se pedido
+        params = {"lon": longitude, "lat": latitude}
+        return await self._paginate(db, stmt, page, page_size, after_id, params, include_total, exact_total)
+    
+    def _build_point_statement(self, geom_field_name: str):
+        """
+        Monta o select da busca por ponto (parâmetros :lon e :lat)
+        
+        Args:
+            geom_field_name: Nome do campo de geometria
+            
+        Returns:
+            Select filtrado, sem ordenação/paginação
+        """
+        # Cria o ponto uma única vez e reutiliza nos dois filtros
+        ponto = self._make_point()
         
         # Obtém o campo de geometria do modelo
-        geom_field = getattr(self.model, geom_field_name)
+        geom_field = self._geom_field(geom_field_name)
         
-        # Query base para buscar entidades onde a geometria contém o ponto
-        query = db.query(self.model).filter(
-            func.ST_Contains(geom_field, ponto)
+        # Query base para buscar entidades onde a geometria contém o ponto:
+        # 1. Operador && (bounding box) - resolvido pelo índice espacial
+        # 2. ST_Intersects - refinamento exato, equivalente a ST_Contains para um ponto
+        #    (inclui pontos na borda) e mais barato de avaliar
+        return select(*self.columns).where(
+            geom_field.op('&&')(ponto),
+            func.ST_Intersects(geom_field, ponto)
         )
+    
+    async def get_by_points(
+        self,
+        db: AsyncSession,
+        coordinates: List[Tuple[float, float]],
+        geom_field_name: str = "geom"
+    ) -> List[Dict[str, Any]]:
+        """
+        Busca, em uma única query, as entidades que contêm cada um dos pontos informados
         
-        # Aplica paginação
-        offset = (page - 1) * page_size
-        entities = query.offset(offset).limit(page_size).all()
+        Args:
+            db: Sessão do banco de dados
+            coordinates: Lista de pontos como tuplas (latitude, longitude)
+            geom_field_name: Nome do campo de geometria (padrão: 'geom')
+            
+        Returns:
+            Lista de linhas (dicts) ordenada por ponto e id; a coluna point_index indica a
+            posição (a partir de 1) do ponto em coordinates
+        """
+        stmt = self._get_statement(("points", geom_field_name), lambda: self._build_points_statement(geom_field_name))
         
-        # Calcula o total de forma otimizada
-        total = self._get_paginated_total(query, page, page_size, entities)
+        params = {
+            "lats": [latitude for latitude, _ in coordinates],
+            "lons": [longitude for _, longitude in coordinates],
+        }
+        result = await db.execute(stmt, params)
+        return [dict(row) for row in result.mappings()]
+    
+    def _build_points_statement(self, geom_field_name: str):
+        """
+        Monta o select da busca por vários pontos (parâmetros array :lats e :lons)
         
-        return entities, total
+        Args:
+            geom_field_name: Nome do campo de geometria
+            
+        Returns:
+            Select que junta os pontos (unnest) às entidades que os contêm
+        """
+        # unnest(:lats, :lons) WITH ORDINALITY: uma linha por ponto, com a posição (i) do
+        # ponto na requisição. Os dois arrays são parâmetros únicos, então o texto da query
+        # não muda com a quantidade de pontos
+        pontos = func.unnest(
+            bindparam("lats", type_=ARRAY(Float)),
+            bindparam("lons", type_=ARRAY(Float))
+        ).table_valued("lat", "lon", with_ordinality="i").render_derived(name="p")
+        ponto = func.ST_Point(pontos.c.lon, pontos.c.lat, 4326)
+        
+        # Obtém o campo de geometria do modelo
+        geom_field = self._geom_field(geom_field_name)
+        
+        # Mesmos filtros da busca por um ponto (&& + ST_Intersects), aplicados no join:
+        # o planner faz um nested loop com uma busca no índice espacial por ponto
+        return (
+            select(pontos.c.i.label("point_index"), *self.columns)
+            .join_from(pontos, self.table, and_(
+                geom_field.op('&&')(ponto),
+                func.ST_Intersects(geom_field, ponto)
+            ))
+            .order_by(pontos.c.i, self.table.c.id)
+        )
     
-    def get_by_radius(
+    async def get_by_radius(
         self,
-        db: Session,
+        db: AsyncSession,
         latitude: float,
         longitude: float,
         radius_km: float,
         page: int = 1,
-        page_size: int = 10
-    ) -> Tuple[List[ModelType], int]:
+        page_size: int = 10,
+        after_id: Optional[int] = None,
+        geom_field_name: str = "geom",
+        include_total: bool = False,
+        exact_total: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[int], bool]:
         """
         Busca entidades dentro de um raio especificado em quilômetros com paginação.
         Usa a coluna geog (geography) para otimizar consultas por distância.
@@ -112,56 +398,164 @@ class GeoRepositoryMixin(Generic[ModelType]):
             radius_km: Raio em quilômetros
             page: Número da página (padrão: 1)
             page_size: Tamanho da página (padrão: 10)
+            after_id: Cursor keyset - id da última entidade da página anterior (opcional)
+            geom_field_name: Nome do campo de geometria usado no bounding box (padrão: 'geom')
+            include_total: Se True, calcula também o total (padrão: False, sem contagem)
+            exact_total: Se True, o total é contado; senão, estimado pelo planner (padrão: False)
             
         Returns:
-            Tupla contendo (lista de entidades paginadas, total de entidades encontradas)
+            Tupla contendo (lista de linhas paginadas, total de entidades encontradas ou None,
+            se existe próxima página)
+            
+        Note:
+            Com radius_km acima de SEQSCAN_OFF_RADIUS_KM, executa antes LARGE_RADIUS_SETTINGS
+            (plano customizado e enable_seqscan = off) na transação da sessão
         """
         # Valida o raio antes de processar
         self._validate_radius(radius_km)
         
-        # Converte o raio de quilômetros para metros (PostGIS usa metros)
-        radius_meters = radius_km * 1000
+        # Converte o raio de quilômetros para metros (PostGIS usa metros), arredondando
+        # para o múltiplo de 10 m mais próximo (mínimo de 10 m), e arredonda as coordenadas:
+        # valores como 5.0000001 km viram a mesma busca que 5 km
+        radius_meters = max(round(radius_km * 1000 / RADIUS_STEP_METERS), 1) * RADIUS_STEP_METERS
+        latitude = round(latitude, COORDINATE_DECIMALS)
+        longitude = round(longitude, COORDINATE_DECIMALS)
+        
+        stmt = self._get_statement(("radius", geom_field_name), lambda: self._build_radius_statement(geom_field_name))
         
-        # Obtém o campo de geography do modelo (otimizado para consultas por distância)
-        geog_field = getattr(self.model, "geog")
+        # Bounding box do raio calculado em Python: o servidor não precisa de
+        # ST_Buffer/ST_Envelope sobre geography a cada query
+        xmin, ymin, xmax, ymax = self._radius_envelope(longitude, latitude, radius_meters)
         
-        # Obtém o nome da tabela para referenciar a coluna corretamente
-        table_name = self.model.__table__.name
+        # Raios grandes: os ajustes valem só até o fim da transação da sessão (seguro com
+        # o PgBouncer em modo transaction) e também se aplicam ao EXPLAIN da estimativa
+        if radius_km > SEQSCAN_OFF_RADIUS_KM:
+            await db.execute(LARGE_RADIUS_SETTINGS)
         
-        # Cria expressão SQL para o bounding box usando operador && (otimização rápida)
-        # Usa a coluna geog convertida para geometry para o operador &&
-        bbox_sql = text(
-            f"{table_name}.geog::geometry && "
-            f"ST_Envelope(ST_Buffer(ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography, :radius)::geometry)"
+        # Aplica paginação (keyset quando after_id é informado); o total só é contado se pedido
+        params = {
+            "lon": longitude,
+            "lat": latitude,
+            "radius": radius_meters,
+            "xmin": xmin,
+            "ymin": ymin,
+            "xmax": xmax,
+            "ymax": ymax,
+        }
+        return await self._paginate(db, stmt, page, page_size, after_id, params, include_total, exact_total)
+    
+    def _build_radius_statement(self, geom_field_name: str):
+        """
+        Monta o select da busca por raio (parâmetros :lon, :lat, :radius e o bounding box
+        :xmin, :ymin, :xmax, :ymax)
+        
+        Args:
+            geom_field_name: Nome do campo de geometria usado no bounding box
+            
+        Returns:
+            Select filtrado, sem ordenação/paginação
+        """
+        # Obtém os campos de geometria (bounding box, índice SP-GiST) e de geography
+        # (distância em metros) do modelo
+        geom_field = self._geom_field(geom_field_name)
+        geog_field = self._geog
+        
+        envelope = func.ST_MakeEnvelope(
+            bindparam("xmin", type_=Float),
+            bindparam("ymin", type_=Float),
+            bindparam("xmax", type_=Float),
+            bindparam("ymax", type_=Float),
+            4326
         )
         
-        # Converte o ponto para geography para usar com ST_DWithin
-        ponto_geog = text(
-            f"ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography"
-        ).bindparams(lon=longitude, lat=latitude)
+        # Converte o ponto para geography para usar com ST_DWithin (distância em metros, usa o índice de geog).
+        # O cast é aplicado só ao ponto (constante na query, avaliado uma vez); as colunas
+        # geom/geog são comparadas sem cast, preservando o uso dos índices
+        ponto_geog = cast(self._make_point(), Geography('POINT', srid=4326))
         
         # Query otimizada com dois filtros:
         # 1. Operador && (bounding box) - filtro rápido que usa índices espaciais
+        #    (sobre a extensão de cada polígono; uma célula S2 do centroide perderia
+        #    polígonos que cruzam o raio com o centroide fora dele)
         #    Performance: cost=24285.38..24285.39 rows=1 width=8 (COM &&)
-        # 2. ST_DWithin - filtro preciso com cálculo esferoidal usando geography
+        # 2. ST_DWithin - filtro preciso de distância usando geography, na esfera
+        #    (use_spheroid=False): fórmula fechada em vez do cálculo iterativo no esferoide,
+        #    com erro de até ~0,5% no raio
         #    Performance: cost=315962.09..315962.10 rows=1 width=8 (SEM &&)
-        query = db.query(self.model).filter(
-            and_(
-                bbox_sql.bindparams(lon=longitude, lat=latitude, radius=radius_meters),
-                func.ST_DWithin(
-                    geog_field,
-                    ponto_geog,
-                    radius_meters
-                    # Não passa use_spheroid quando usa geography (padrão é True)
-                )
+        return select(*self.columns).where(
+            geom_field.op('&&')(envelope),
+            func.ST_DWithin(
+                geog_field,
+                ponto_geog,
+                bindparam("radius", type_=Float),
+                False  # use_spheroid
             )
         )
+    
+    async def get_tile(
+        self,
+        db: AsyncSession,
+        z: int,
+        x: int,
+        y: int,
+        layer_name: str,
+        geom_field_name: str = "geom"
+    ) -> bytes:
+        """
+        Gera o vector tile (MVT) com as geometrias que cruzam o tile z/x/y
         
-        # Aplica paginação
-        offset = (page - 1) * page_size
-        entities = query.offset(offset).limit(page_size).all()
+        As geometrias saem do banco já recortadas ao tile e quantizadas em coordenadas
+        inteiras (ST_AsMVTGeom), em formato binário (ST_AsMVT): bem menores que arrays de
+        coordenadas GeoJSON em texto e sem gerar JSON no PostgreSQL.
         
-        # Calcula o total de forma otimizada
-        total = self._get_paginated_total(query, page, page_size, entities)
+        Args:
+            db: Sessão do banco de dados
+            z: Nível de zoom do tile
+            x: Coluna do tile
+            y: Linha do tile
+            layer_name: Nome da camada no tile
+            geom_field_name: Nome do campo de geometria (padrão: 'geom')
+            
+        Returns:
+            Bytes do tile no formato Mapbox Vector Tile (vazio se nenhuma geometria cruzar o tile)
+        """
+        stmt = self._get_statement(
+            ("tile", layer_name, geom_field_name),
+            lambda: self._build_tile_statement(layer_name, geom_field_name)
+        )
+        tile = (await db.execute(stmt, {"z": z, "x": x, "y": y})).scalar()
+        return bytes(tile) if tile else b""
+    
+    def _build_tile_statement(self, layer_name: str, geom_field_name: str):
+        """
+        Monta o select do vector tile (parâmetros :z, :x e :y)
         
-        return entities, total
\ No newline at end of file
+        Args:
+            layer_name: Nome da camada no tile
+            geom_field_name: Nome do campo de geometria
+            
+        Returns:
+            Select que retorna o tile (bytea) em uma única linha
+        """
+        geom_field = self._geom_field(geom_field_name)
+        
+        # Envelope do tile em Web Mercator (EPSG:3857); o filtro && usa o envelope convertido
+        # para 4326, resolvido pelo índice espacial de geom sem transformar as colunas
+        envelope = func.ST_TileEnvelope(
+            bindparam("z", type_=Integer),
+            bindparam("x", type_=Integer),
+            bindparam("y", type_=Integer)
+        )
+        
+        # Geometria recortada/quantizada para o tile + propriedades (self.columns)
+        feicoes = (
+            select(
+                func.ST_AsMVTGeom(func.ST_Transform(geom_field, 3857), envelope).label("geom"),
+                *self.columns
+            )
+            .where(geom_field.op('&&')(func.ST_Transform(envelope, 4326)))
+            .subquery("feicoes")
+        )
+        return select(
+            func.ST_AsMVT(feicoes.table_valued(), layer_name, type_=LargeBinary)
+        ).select_from(feicoes)
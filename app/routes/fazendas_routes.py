@@ -1,67 +1,72 @@
-from fastapi import APIRouter, Depends, status, Path, Query
-from sqlalchemy.orm import Session
-from app.controllers.fazenda_controller import FazendaController, NOT_FOUND_RESPONSE
-from app.schemas.fazenda_schema import FazendaResponse, PontoBuscaRequest, RaioBuscaRequest, PaginatedResponse
+from fastapi import APIRouter, Depends, Response, status, Path, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.controllers.fazenda_controller import FazendaController, NOT_FOUND_RESPONSE, TILE_MAX_ZOOM, TILE_MIN_ZOOM
+from app.schemas.fazenda_schema import FazendaBatchRequest, FazendaResponse, PontoBuscaRequest, PontoFazendasResponse, PontosBuscaRequest, RaioBuscaRequest, FazendaPage
 from app.infrastructure.database import get_db
-from typing import List
+from typing import Dict, List, Optional, Union
 
 router = APIRouter(
     prefix="/fazendas",
     tags=["fazendas"]
 )
 
+# GET por cod_imovel é uma leitura idempotente de dados praticamente imutáveis: navegadores,
+# proxies e CDNs podem reaproveitar a resposta por 30 s, absorvendo rajadas de requisições
+# repetidas antes que cheguem a qualquer worker (o cache em memória é por processo)
+CACHE_CONTROL_HEADERS = {"Cache-Control": "public, max-age=30"}
+# Buscas espaciais via GET: mesma resposta para os mesmos query params, reaproveitável por
+# 60 s (e servida enquanto revalida por mais 300 s), como num usuário que volta ao mesmo ponto
+SEARCH_CACHE_CONTROL_HEADERS = {"Cache-Control": "public, max-age=60, stale-while-revalidate=300"}
+# Vector tiles: geometrias praticamente imutáveis, reaproveitáveis por 1 hora
+TILE_CACHE_CONTROL_HEADERS = {"Cache-Control": "public, max-age=3600"}
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
 
 
-@router.get(
-    "/{cod_imovel}",
-    response_model=PaginatedResponse[FazendaResponse],
-    status_code=status.HTTP_200_OK,
-    summary="Buscar Fazendas por Código do Imóvel",
-    description="Retorna os dados de todas as fazendas com o código do imóvel especificado (cod_imovel). Pode retornar múltiplos resultados. "
-                "Parâmetros de paginação podem ser passados via query params: page e page_size.",
-    responses=NOT_FOUND_RESPONSE
-)
-async def get_fazenda_by_cod_imovel(
-    cod_imovel: str = Path(..., min_length=1, description="Código do imóvel da fazenda (cod_imovel)"),
-    page: int = Query(1, gt=0, description="Número da página (padrão: 1)"),
-    page_size: int = Query(10, gt=0, le=100, description="Quantidade de itens por página (padrão: 10, máximo: 100)"),
-    db: Session = Depends(get_db)
-) -> PaginatedResponse[FazendaResponse]:
+def _orjson_response(content: Union[BaseModel, List[BaseModel]], headers: Optional[Dict[str, str]] = None) -> ORJSONResponse:
     """
-    Endpoint para buscar fazendas pelo código do imóvel (cod_imovel) com paginação
+    Serializa o resultado do controller diretamente com orjson
+    
+    Os schemas já vêm montados pelo controller; devolver a Response pronta evita que o
+    FastAPI revalide o resultado contra o response_model (mantido só para a documentação
+    OpenAPI) antes de serializá-lo.
     
     Args:
-        cod_imovel: Código do imóvel da fazenda a ser buscada
-        page: Número da página (query param, padrão: 1)
-        page_size: Tamanho da página (query param, padrão: 10, máximo: 100)
-        db: Sessão do banco de dados (injetada automaticamente)
+        content: Schema (ou lista de schemas) retornado pelo controller
+        headers: Cabeçalhos HTTP extras da resposta (opcional)
         
     Returns:
-        PaginatedResponse[FazendaResponse]: Resposta paginada com fazendas encontradas (pode conter múltiplos itens)
-        
-    Raises:
-        HTTPException: 404 se nenhuma fazenda for encontrada
-        
-    Example:
-        GET /fazendas/SP-3500105-279714F410E746B0B440EFAD4B0933D4?page=1&page_size=10
+        ORJSONResponse: Resposta JSON com o conteúdo serializado
     """
-    return FazendaController.get_fazenda_by_cod_imovel(db, cod_imovel, page, page_size)
+    if isinstance(content, list):
+        return ORJSONResponse([item.model_dump() for item in content], headers=headers)
+    return ORJSONResponse(content.model_dump(), headers=headers)
+
 
 
 @router.post(
     "/busca-ponto",
-    response_model=PaginatedResponse[FazendaResponse],
+    response_model=FazendaPage,
     status_code=status.HTTP_200_OK,
-    summary="Buscar Fazendas por Ponto",
+    deprecated=True,
+    summary="Buscar Fazendas por Ponto (body)",
     description="Recebe coordenadas (latitude/longitude) no body e retorna a(s) fazenda(s) que contém aquele ponto. "
-                "Parâmetros de paginação podem ser passados via query params: page e page_size."
+                "Obsoleto: prefira GET /fazendas/busca-ponto, cacheável por navegadores, proxies e CDNs. "
+                "Parâmetros de paginação podem ser passados via query params: page e page_size, "
+                "ou after_id (paginação por cursor, usando o next_cursor da resposta anterior). "
+                "O total só é calculado com include_total=true (estimativa do planner; exato com exact_total=true); "
+                "por padrão a resposta informa apenas has_next."
 )
 async def buscar_fazendas_por_ponto(
     request: PontoBuscaRequest,
-    page: int = Query(1, gt=0, description="Número da página (padrão: 1)"),
+    page: int = Query(1, gt=0, deprecated=True, description="Número da página (padrão: 1). Prefira after_id: páginas profundas via OFFSET ficam mais lentas"),
     page_size: int = Query(10, gt=0, le=100, description="Quantidade de itens por página (padrão: 10, máximo: 100)"),
-    db: Session = Depends(get_db)
-) -> PaginatedResponse[FazendaResponse]:
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: id da última fazenda da página anterior (next_cursor). Quando informado, page é ignorado"),
+    include_total: bool = Query(False, description="Se true, calcula total e total_pages (contagem extra no banco). Padrão: false, use has_next para saber se há próxima página"),
+    exact_total: bool = Query(False, description="Com include_total, conta o total exato (mais lento). Padrão: false, total estimado pelo planner"),
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
     """
     Endpoint para buscar fazendas que contêm um ponto específico com paginação
     
@@ -69,39 +74,133 @@ async def buscar_fazendas_por_ponto(
         request: Objeto contendo latitude e longitude do ponto (no body)
         page: Número da página (query param, padrão: 1)
         page_size: Tamanho da página (query param, padrão: 10, máximo: 100)
+        after_id: Cursor keyset (query param, opcional) - valor de next_cursor da página anterior
+        include_total: Se True, calcula total e total_pages (query param, padrão: False)
+        exact_total: Com include_total, conta o total exato em vez de estimá-lo (query param, padrão: False)
         db: Sessão do banco de dados (injetada automaticamente)
         
     Returns:
-        PaginatedResponse[FazendaResponse]: Resposta paginada com fazendas que contêm o ponto especificado
+        ORJSONResponse com FazendaPage: Resposta paginada com fazendas que contêm o ponto especificado
         (pode retornar lista vazia se nenhuma fazenda contiver o ponto)
         
     Example:
         POST /fazendas/busca-ponto?page=1&page_size=10
+        POST /fazendas/busca-ponto?page_size=10&after_id=1234 (próxima página via cursor)
+        POST /fazendas/busca-ponto?page=1&page_size=10&include_total=true (com total estimado)
         Body: {"latitude": -23.5505, "longitude": -46.6333}
     """
-    return FazendaController.get_fazendas_by_point(
+    return _orjson_response(await FazendaController.get_fazendas_by_point(
         db, 
         request.latitude, 
         request.longitude,
         page,
-        page_size
+        page_size,
+        after_id,
+        include_total,
+        exact_total
+    ))
+
+
+@router.get(
+    "/busca-ponto",
+    response_model=FazendaPage,
+    status_code=status.HTTP_200_OK,
+    summary="Buscar Fazendas por Ponto",
+    description="Recebe coordenadas (latitude/longitude) via query params e retorna a(s) fazenda(s) que contém aquele ponto. "
+                "Parâmetros de paginação: page e page_size, ou after_id (paginação por cursor, usando o next_cursor da resposta anterior). "
+                "O total só é calculado com include_total=true (estimativa do planner; exato com exact_total=true); "
+                "por padrão a resposta informa apenas has_next. A resposta pode ser reaproveitada por 60 s (Cache-Control)."
+)
+async def buscar_fazendas_por_ponto_get(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude do ponto (entre -90 e 90)"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude do ponto (entre -180 e 180)"),
+    page: int = Query(1, gt=0, deprecated=True, description="Número da página (padrão: 1). Prefira after_id: páginas profundas via OFFSET ficam mais lentas"),
+    page_size: int = Query(10, gt=0, le=100, description="Quantidade de itens por página (padrão: 10, máximo: 100)"),
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: id da última fazenda da página anterior (next_cursor). Quando informado, page é ignorado"),
+    include_total: bool = Query(False, description="Se true, calcula total e total_pages (contagem extra no banco). Padrão: false, use has_next para saber se há próxima página"),
+    exact_total: bool = Query(False, description="Com include_total, conta o total exato (mais lento). Padrão: false, total estimado pelo planner"),
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Endpoint para buscar fazendas que contêm um ponto específico com paginação, via GET
+    
+    Mesma busca do POST /fazendas/busca-ponto, com as coordenadas na URL: a resposta leva
+    Cache-Control público e pode ser servida por navegadores, proxies e CDNs sem chegar à API.
+    
+    Args:
+        latitude: Latitude do ponto (query param)
+        longitude: Longitude do ponto (query param)
+        page: Número da página (query param, padrão: 1)
+        page_size: Tamanho da página (query param, padrão: 10, máximo: 100)
+        after_id: Cursor keyset (query param, opcional) - valor de next_cursor da página anterior
+        include_total: Se True, calcula total e total_pages (query param, padrão: False)
+        exact_total: Com include_total, conta o total exato em vez de estimá-lo (query param, padrão: False)
+        db: Sessão do banco de dados (injetada automaticamente)
+        
+    Returns:
+        ORJSONResponse com FazendaPage: Resposta paginada com fazendas que contêm o ponto especificado
+        
+    Example:
+        GET /fazendas/busca-ponto?latitude=-23.5505&longitude=-46.6333&page_size=10
+    """
+    return _orjson_response(
+        await FazendaController.get_fazendas_by_point(db, latitude, longitude, page, page_size, after_id, include_total, exact_total),
+        headers=SEARCH_CACHE_CONTROL_HEADERS
     )
 
 
+@router.post(
+    "/busca-pontos",
+    response_model=List[PontoFazendasResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Buscar Fazendas por Vários Pontos",
+    description="Recebe uma lista de coordenadas (até 100 pontos) no body e retorna, para cada ponto, as fazendas que o contêm. "
+                "Todos os pontos são resolvidos em uma única consulta ao banco."
+)
+async def buscar_fazendas_por_pontos(
+    request: PontosBuscaRequest,
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Endpoint para buscar as fazendas que contêm cada um de vários pontos de uma só vez
+    
+    Args:
+        request: Objeto contendo a lista de pontos (no body)
+        db: Sessão do banco de dados (injetada automaticamente)
+        
+    Returns:
+        ORJSONResponse com List[PontoFazendasResponse]: Um item por ponto, na ordem recebida (items vazio se
+        nenhuma fazenda contiver o ponto)
+        
+    Example:
+        POST /fazendas/busca-pontos
+        Body: {"pontos": [{"latitude": -23.5505, "longitude": -46.6333}, {"latitude": -21.7089, "longitude": -51.0731}]}
+    """
+    return _orjson_response(await FazendaController.get_fazendas_by_points(db, request.pontos))
+
+
 @router.post(
     "/busca-raio",
-    response_model=PaginatedResponse[FazendaResponse],
+    response_model=FazendaPage,
     status_code=status.HTTP_200_OK,
-    summary="Buscar Fazendas por Raio",
+    deprecated=True,
+    summary="Buscar Fazendas por Raio (body)",
     description="Recebe coordenadas (latitude/longitude) e raio em quilômetros no body, retorna todas as fazendas dentro desse raio. "
-                "Parâmetros de paginação podem ser passados via query params: page e page_size."
+                "Obsoleto: prefira GET /fazendas/busca-raio, cacheável por navegadores, proxies e CDNs. "
+                "Parâmetros de paginação podem ser passados via query params: page e page_size, "
+                "ou after_id (paginação por cursor, usando o next_cursor da resposta anterior). "
+                "O total só é calculado com include_total=true (estimativa do planner; exato com exact_total=true); "
+                "por padrão a resposta informa apenas has_next."
 )
 async def buscar_fazendas_por_raio(
     request: RaioBuscaRequest,
-    page: int = Query(1, gt=0, description="Número da página (padrão: 1)"),
+    page: int = Query(1, gt=0, deprecated=True, description="Número da página (padrão: 1). Prefira after_id: páginas profundas via OFFSET ficam mais lentas"),
     page_size: int = Query(10, gt=0, le=100, description="Quantidade de itens por página (padrão: 10, máximo: 100)"),
-    db: Session = Depends(get_db)
-) -> PaginatedResponse[FazendaResponse]:
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: id da última fazenda da página anterior (next_cursor). Quando informado, page é ignorado"),
+    include_total: bool = Query(False, description="Se true, calcula total e total_pages (contagem extra no banco). Padrão: false, use has_next para saber se há próxima página"),
+    exact_total: bool = Query(False, description="Com include_total, conta o total exato (mais lento). Padrão: false, total estimado pelo planner"),
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
     """
     Endpoint para buscar fazendas dentro de um raio específico com paginação
     
@@ -109,22 +208,192 @@ async def buscar_fazendas_por_raio(
         request: Objeto contendo latitude, longitude do ponto central e raio em quilômetros (no body)
         page: Número da página (query param, padrão: 1)
         page_size: Tamanho da página (query param, padrão: 10, máximo: 100)
+        after_id: Cursor keyset (query param, opcional) - valor de next_cursor da página anterior
+        include_total: Se True, calcula total e total_pages (query param, padrão: False)
+        exact_total: Com include_total, conta o total exato em vez de estimá-lo (query param, padrão: False)
         db: Sessão do banco de dados (injetada automaticamente)
         
     Returns:
-        PaginatedResponse[FazendaResponse]: Resposta paginada com fazendas dentro do raio especificado
+        ORJSONResponse com FazendaPage: Resposta paginada com fazendas dentro do raio especificado
         (pode retornar lista vazia se nenhuma fazenda estiver dentro do raio)
         
     Example:
         POST /fazendas/busca-raio?page=1&page_size=10
+        POST /fazendas/busca-raio?page_size=10&after_id=1234 (próxima página via cursor)
+        POST /fazendas/busca-raio?page=1&page_size=10&include_total=true (com total estimado)
         Body: {"latitude": -23.5505, "longitude": -46.6333, "raio_km": 50}
     """
-    return FazendaController.get_fazendas_by_radius(
+    return _orjson_response(await FazendaController.get_fazendas_by_radius(
         db,
         request.latitude,
         request.longitude,
         request.raio_km,
         page,
-        page_size
+        page_size,
+        after_id,
+        include_total,
+        exact_total
+    ))
+
+
+@router.get(
+    "/busca-raio",
+    response_model=FazendaPage,
+    status_code=status.HTTP_200_OK,
+    summary="Buscar Fazendas por Raio",
+    description="Recebe coordenadas (latitude/longitude) e raio em quilômetros via query params, retorna todas as fazendas dentro desse raio. "
+                "Parâmetros de paginação: page e page_size, ou after_id (paginação por cursor, usando o next_cursor da resposta anterior). "
+                "O total só é calculado com include_total=true (estimativa do planner; exato com exact_total=true); "
+                "por padrão a resposta informa apenas has_next. A resposta pode ser reaproveitada por 60 s (Cache-Control)."
+)
+async def buscar_fazendas_por_raio_get(
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude do ponto central (entre -90 e 90)"),
+    longitude: float = Query(..., ge=-180, le=180, description="Longitude do ponto central (entre -180 e 180)"),
+    raio_km: float = Query(..., gt=0, le=20000, description="Raio de busca em quilômetros (maior que 0, máximo: 20000)"),
+    page: int = Query(1, gt=0, deprecated=True, description="Número da página (padrão: 1). Prefira after_id: páginas profundas via OFFSET ficam mais lentas"),
+    page_size: int = Query(10, gt=0, le=100, description="Quantidade de itens por página (padrão: 10, máximo: 100)"),
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: id da última fazenda da página anterior (next_cursor). Quando informado, page é ignorado"),
+    include_total: bool = Query(False, description="Se true, calcula total e total_pages (contagem extra no banco). Padrão: false, use has_next para saber se há próxima página"),
+    exact_total: bool = Query(False, description="Com include_total, conta o total exato (mais lento). Padrão: false, total estimado pelo planner"),
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Endpoint para buscar fazendas dentro de um raio específico com paginação, via GET
+    
+    Mesma busca do POST /fazendas/busca-raio, com os parâmetros na URL: a resposta leva
+    Cache-Control público e pode ser servida por navegadores, proxies e CDNs sem chegar à API.
+    
+    Args:
+        latitude: Latitude do ponto central (query param)
+        longitude: Longitude do ponto central (query param)
+        raio_km: Raio de busca em quilômetros (query param)
+        page: Número da página (query param, padrão: 1)
+        page_size: Tamanho da página (query param, padrão: 10, máximo: 100)
+        after_id: Cursor keyset (query param, opcional) - valor de next_cursor da página anterior
+        include_total: Se True, calcula total e total_pages (query param, padrão: False)
+        exact_total: Com include_total, conta o total exato em vez de estimá-lo (query param, padrão: False)
+        db: Sessão do banco de dados (injetada automaticamente)
+        
+    Returns:
+        ORJSONResponse com FazendaPage: Resposta paginada com fazendas dentro do raio especificado
+        
+    Example:
+        GET /fazendas/busca-raio?latitude=-23.5505&longitude=-46.6333&raio_km=50&page_size=10
+    """
+    return _orjson_response(
+        await FazendaController.get_fazendas_by_radius(db, latitude, longitude, raio_km, page, page_size, after_id, include_total, exact_total),
+        headers=SEARCH_CACHE_CONTROL_HEADERS
     )
 
+
+@router.post(
+    "/batch",
+    response_model=List[FazendaResponse],
+    status_code=status.HTTP_200_OK,
+    summary="Buscar Fazendas por IDs",
+    description="Recebe uma lista de IDs no body (até 100) e retorna as fazendas encontradas em uma única consulta ao banco. "
+                "IDs inexistentes são ignorados."
+)
+async def buscar_fazendas_por_ids(
+    request: FazendaBatchRequest,
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Endpoint para buscar várias fazendas pelos IDs de uma só vez
+    
+    Args:
+        request: Objeto contendo a lista de IDs (no body)
+        db: Sessão do banco de dados (injetada automaticamente)
+        
+    Returns:
+        ORJSONResponse com List[FazendaResponse]: Fazendas encontradas, ordenadas por id (pode ser vazia)
+        
+    Example:
+        POST /fazendas/batch
+        Body: {"ids": [1, 2, 3]}
+    """
+    return _orjson_response(await FazendaController.get_fazendas_by_ids(db, request.ids))
+
+
+@router.get(
+    "/tiles/{z}/{x}/{y}.mvt",
+    status_code=status.HTTP_200_OK,
+    summary="Vector Tile das Fazendas",
+    description="Retorna as geometrias das fazendas no tile z/x/y (esquema XYZ, Web Mercator) no formato Mapbox Vector Tile, "
+                "camada \"fazendas\", com as mesmas propriedades de FazendaResponse. "
+                f"Zoom de {TILE_MIN_ZOOM} a {TILE_MAX_ZOOM}.",
+    response_class=Response,
+    responses={200: {"content": {MVT_MEDIA_TYPE: {}}, "description": "Vector tile (vazio se não houver fazendas no tile)"}}
+)
+async def get_fazendas_tile(
+    z: int = Path(..., ge=TILE_MIN_ZOOM, le=TILE_MAX_ZOOM, description="Nível de zoom"),
+    x: int = Path(..., ge=0, description="Coluna do tile"),
+    y: int = Path(..., ge=0, description="Linha do tile"),
+    db: AsyncSession = Depends(get_db)
+) -> Response:
+    """
+    Endpoint para obter as geometrias das fazendas como vector tile (MVT)
+    
+    Args:
+        z: Nível de zoom (path param)
+        x: Coluna do tile (path param)
+        y: Linha do tile (path param)
+        db: Sessão do banco de dados (injetada automaticamente)
+        
+    Returns:
+        Response com o tile binário (application/vnd.mapbox-vector-tile)
+        
+    Raises:
+        HTTPException: 404 se x/y estiverem fora da grade do nível de zoom
+        
+    Example:
+        GET /fazendas/tiles/12/1517/2323.mvt
+    """
+    tile = await FazendaController.get_fazendas_tile(db, z, x, y)
+    return Response(content=tile, media_type=MVT_MEDIA_TYPE, headers=TILE_CACHE_CONTROL_HEADERS)
+
+
+# A rota com parâmetro no caminho (/{cod_imovel}) fica por último: o Starlette testa as
+# rotas em ordem, então os caminhos fixos (/busca-ponto, /batch, ...) casam antes do
+# padrão genérico, e uma rota fixa adicionada no futuro não fica encoberta por ele
+@router.get(
+    "/{cod_imovel}",
+    response_model=FazendaPage,
+    status_code=status.HTTP_200_OK,
+    summary="Buscar Fazendas por Código do Imóvel",
+    description="Retorna os dados de todas as fazendas com o código do imóvel especificado (cod_imovel). Pode retornar múltiplos resultados. "
+                "Parâmetros de paginação podem ser passados via query params: page_size e after_id (paginação por cursor, usando o next_cursor "
+                "da resposta anterior) ou page (paginação por offset, mantida por compatibilidade).",
+    responses=NOT_FOUND_RESPONSE
+)
+async def get_fazenda_by_cod_imovel(
+    cod_imovel: str = Path(..., min_length=1, description="Código do imóvel da fazenda (cod_imovel)"),
+    page: int = Query(1, gt=0, deprecated=True, description="Número da página (padrão: 1). Prefira after_id: páginas profundas via OFFSET ficam mais lentas"),
+    page_size: int = Query(10, gt=0, le=100, description="Quantidade de itens por página (padrão: 10, máximo: 100)"),
+    after_id: Optional[int] = Query(None, ge=0, description="Cursor keyset: id da última fazenda da página anterior (next_cursor). Quando informado, page é ignorado"),
+    db: AsyncSession = Depends(get_db)
+) -> ORJSONResponse:
+    """
+    Endpoint para buscar fazendas pelo código do imóvel (cod_imovel) com paginação
+    
+    Args:
+        cod_imovel: Código do imóvel da fazenda a ser buscada
+        page: Número da página (query param, padrão: 1)
+        page_size: Tamanho da página (query param, padrão: 10, máximo: 100)
+        after_id: Cursor keyset (query param, opcional) - valor de next_cursor da página anterior
+        db: Sessão do banco de dados (injetada automaticamente)
+        
+    Returns:
+        ORJSONResponse com FazendaPage: Resposta paginada com fazendas encontradas (pode conter múltiplos itens)
+        
+    Raises:
+        HTTPException: 404 se nenhuma fazenda for encontrada
+        
+    Example:
+        GET /fazendas/SP-3500105-279714F410E746B0B440EFAD4B0933D4?page=1&page_size=10
+        GET /fazendas/SP-3500105-279714F410E746B0B440EFAD4B0933D4?page_size=10&after_id=1234 (próxima página via cursor)
+    """
+    return _orjson_response(
+        await FazendaController.get_fazenda_by_cod_imovel(db, cod_imovel, page, page_size, after_id),
+        headers=CACHE_CONTROL_HEADERS
+    )
@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Response
 from app.controllers.health_controller import HealthController
 from app.schemas.health_schema import HealthResponse
 
@@ -7,6 +8,10 @@ router = APIRouter(
     tags=["health"]
 )
 
+# Corpo constante serializado uma única vez: cada liveness probe só copia os bytes,
+# sem validação do Pydantic nem codificação JSON por requisição
+_HEALTH_BODY = orjson.dumps(HealthController.get_health().model_dump())
+
 
 @router.get(
     "",
@@ -14,11 +19,12 @@ router = APIRouter(
     summary="Health Check",
     description="Endpoint para verificar o status de saúde da API"
 )
-async def health_check() -> HealthResponse:
+async def health_check() -> Response:
     """
     Endpoint de health check para verificar o status da API
     
     Returns:
-        HealthResponse: Status e mensagem da API
+        Response com HealthResponse já serializado: Status e mensagem da API
+        (response_model mantido só para a documentação OpenAPI)
     """
-    return HealthController.get_health()
+    return Response(content=_HEALTH_BODY, media_type="application/json")
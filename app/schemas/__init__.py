@@ -1,4 +1,4 @@
 from app.schemas.health_schema import HealthResponse
-from app.schemas.fazenda_schema import FazendaResponse, PaginatedResponse
+from app.schemas.fazenda_schema import FazendaPage, FazendaResponse, PaginatedResponse
 
-__all__ = ["HealthResponse", "FazendaResponse", "PaginatedResponse"]
\ No newline at end of file
+__all__ = ["HealthResponse", "FazendaResponse", "PaginatedResponse", "FazendaPage"]
\ No newline at end of file
@@ -1,6 +1,5 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List, Generic, TypeVar
-from datetime import date
 
 T = TypeVar('T')
 
@@ -20,19 +19,10 @@ class FazendaResponse(BaseModel):
     des_condic: Optional[str] = None
     municipio: Optional[str] = None
     cod_estado: Optional[str] = None
+    # Datas já formatadas pelo banco (to_char, YYYY-MM-DD): sem validador Python por linha
     dat_criaca: Optional[str] = None
     dat_atuali: Optional[str] = None
 
-    @field_validator('dat_criaca', 'dat_atuali', mode='before')
-    @classmethod
-    def convert_date_to_string(cls, v):
-        """Converte date para string se necessário"""
-        if v is None:
-            return None
-        if isinstance(v, date):
-            return v.isoformat()
-        return str(v) if v else None
-
     model_config = {
         "from_attributes": True,  # Permite criar a partir de objetos SQLAlchemy
         "json_schema_extra": {
@@ -96,10 +86,13 @@ class PaginatedResponse(BaseModel, Generic[T]):
     Schema genérico de resposta paginada
     """
     items: List[T] = Field(..., description="Lista de itens da página atual")
-    total: int = Field(..., description="Total de itens encontrados")
+    total: Optional[int] = Field(None, description="Total de itens encontrados (null quando include_total=false)")
     page: int = Field(..., description="Página atual")
     page_size: int = Field(..., description="Tamanho da página (quantidade de itens por página)")
-    total_pages: int = Field(..., description="Total de páginas")
+    total_pages: Optional[int] = Field(None, description="Total de páginas (null quando include_total=false)")
+    has_next: bool = Field(False, description="Indica se existe uma próxima página")
+    total_estimated: bool = Field(False, description="Indica se total é uma estimativa do planner (include_total sem exact_total)")
+    next_cursor: Optional[int] = Field(None, description="Cursor (after_id) para buscar a próxima página via paginação keyset")
     
     model_config = {
         "json_schema_extra": {
@@ -108,12 +101,20 @@ class PaginatedResponse(BaseModel, Generic[T]):
                 "total": 100,
                 "page": 1,
                 "page_size": 10,
-                "total_pages": 10
+                "total_pages": 10,
+                "has_next": True,
+                "total_estimated": False,
+                "next_cursor": 10
             }
         }
     }
 
 
+# Especialização concreta criada uma única vez na importação: as rotas e o controller
+# reutilizam a classe, sem resolver PaginatedResponse[FazendaResponse] a cada requisição
+FazendaPage = PaginatedResponse[FazendaResponse]
+
+
 class PontoBuscaRequest(BaseModel):
     """
     Schema de request para busca de fazendas por ponto (coordenadas)
@@ -131,13 +132,40 @@ class PontoBuscaRequest(BaseModel):
     }
 
 
+class PontosBuscaRequest(BaseModel):
+    """
+    Schema de request para busca de fazendas por vários pontos em uma única requisição
+    """
+    pontos: List[PontoBuscaRequest] = Field(..., min_length=1, max_length=100, description="Pontos a buscar (de 1 a 100 pontos)")
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "pontos": [
+                    {"latitude": -23.5505, "longitude": -46.6333},
+                    {"latitude": -21.7089, "longitude": -51.0731}
+                ]
+            }
+        }
+    }
+
+
+class PontoFazendasResponse(BaseModel):
+    """
+    Schema de resposta da busca por vários pontos: as fazendas que contêm um dos pontos
+    """
+    latitude: float = Field(..., description="Latitude do ponto")
+    longitude: float = Field(..., description="Longitude do ponto")
+    items: List[FazendaResponse] = Field(..., description="Fazendas que contêm o ponto (ordenadas por id)")
+
+
 class RaioBuscaRequest(BaseModel):
     """
     Schema de request para busca de fazendas por raio (coordenadas + raio em quilômetros)
     """
     latitude: float = Field(..., ge=-90, le=90, description="Latitude do ponto central (entre -90 e 90)")
     longitude: float = Field(..., ge=-180, le=180, description="Longitude do ponto central (entre -180 e 180)")
-    raio_km: float = Field(..., gt=0, description="Raio de busca em quilômetros (deve ser maior que 0)")
+    raio_km: float = Field(..., gt=0, le=20000, description="Raio de busca em quilômetros (maior que 0, máximo: 20000)")
     
     model_config = {
         "json_schema_extra": {
@@ -147,4 +175,19 @@ class RaioBuscaRequest(BaseModel):
                 "raio_km": 50
             }
         }
-    }
\ No newline at end of file
+    }
+
+
+class FazendaBatchRequest(BaseModel):
+    """
+    Schema de request para busca de várias fazendas pelos IDs em uma única requisição
+    """
+    ids: List[int] = Field(..., min_length=1, max_length=100, description="IDs das fazendas (de 1 a 100 IDs)")
+    
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "ids": [1, 2, 3]
+            }
+        }
+    }
@@ -1,51 +1,92 @@
+import os
+
+# Deve ser definido antes de importar a aplicação: ativa a detecção de N+1 (raiseload)
+os.environ.setdefault("APP_ENV", "test")
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock
-from sqlalchemy.orm import Session  # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession  # type: ignore
 
 from app.main import app
 from app.infrastructure.database import get_db
-from app.models.fazenda_model import Fazenda
+from app.controllers.fazenda_controller import COD_IMOVEL_CACHE, COD_IMOVEL_NOT_FOUND_CACHE, FAZENDA_BY_ID_CACHE, SEARCH_CACHE, TILE_CACHE
+
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Fixture que limpa os caches em memória do controller antes de cada teste.
+    
+    Os caches de cod_imovel, de ID, das buscas espaciais e de tiles são globais ao processo; sem esta limpeza, uma
+    resposta guardada por um teste seria devolvida em outro, ignorando o mock
+    do repository configurado ali.
+    """
+    COD_IMOVEL_CACHE.clear()
+    COD_IMOVEL_NOT_FOUND_CACHE.clear()
+    FAZENDA_BY_ID_CACHE.clear()
+    SEARCH_CACHE.clear()
+    TILE_CACHE.clear()
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def mock_db():
     """
-    Fixture que cria um mock da sessão do banco de dados (SQLAlchemy Session).
+    Fixture que cria um mock da sessão do banco de dados (SQLAlchemy AsyncSession).
     
     Este mock substitui a conexão real com o banco durante os testes, permitindo
     testar a lógica de negócio sem depender de uma conexão real ao PostgreSQL/PostGIS.
     É usado em conjunto com override_get_db para injetar esse mock na aplicação.
+    
+    Criado uma única vez por módulo; reset_mock_db limpa as chamadas registradas
+    antes de cada teste.
     """
-    db = Mock(spec=Session)
+    db = Mock(spec=AsyncSession)
     return db
 
 
-@pytest.fixture
+@pytest.fixture(autouse=True)
+def reset_mock_db(mock_db):
+    """
+    Fixture que isola os testes: limpa as chamadas registradas no mock_db (compartilhado
+    pelo módulo) antes de cada teste.
+    
+    Args:
+        mock_db: Fixture que fornece o mock da sessão do banco de dados
+    """
+    mock_db.reset_mock()
+
+
+@pytest.fixture(scope="module", autouse=True)
 def override_get_db(mock_db):
     """
     Fixture que sobrescreve a dependência get_db do FastAPI para usar um mock.
     
     Durante os testes, substitui a função get_db() real por uma versão que retorna
     o mock_db. Isso permite testar os endpoints sem necessidade de um banco de dados real.
-    Após cada teste, limpa as overrides para não afetar outros testes.
+    Ao fim do módulo, limpa as overrides para não afetar outros módulos.
+    
+    É autouse e instalada uma única vez por módulo, como o client e o mock_db
+    compartilhados: os testes não precisam declará-la (nem o mock_db) para usar o
+    banco mockado.
+    
+    A dependência substituta é uma corrotina que só devolve o mock já criado: sem
+    gerador (nem teardown na pilha de saída da requisição) e sem threadpool, que o
+    FastAPI usaria para uma função síncrona; nenhuma sessão é criada por requisição.
     
     Args:
         mock_db: Fixture que fornece o mock da sessão do banco de dados
     """
-    def _get_db():
-        try:
-            yield mock_db
-        finally:
-            pass
+    async def _get_db():
+        return mock_db
     
     app.dependency_overrides[get_db] = _get_db
     yield
     app.dependency_overrides.clear()
 
 
-@pytest.fixture
-def client(override_get_db):  # noqa: F811
+@pytest.fixture(scope="module")
+def client():
     """
     Fixture que cria um cliente de teste HTTP para a aplicação FastAPI.
     
@@ -53,53 +94,62 @@ def client(override_get_db):  # noqa: F811
     da aplicação sem precisar iniciar um servidor real. É o equivalente a usar
     requests ou httpx, mas integrado ao FastAPI.
     
-    Este cliente já vem com o banco de dados mockado (através do override_get_db),
-    então todos os testes que usam este cliente não precisam de banco real.
+    O cliente é criado uma única vez por módulo de testes (com o lifespan da aplicação
+    executado uma vez, ao abrir e fechar o contexto), em vez de um por teste. O banco
+    de dados continua mockado por teste, através do override_get_db (autouse), então
+    nenhum teste que usa este cliente precisa de banco real.
     """
-    return TestClient(app)
+    with TestClient(app) as test_client:
+        yield test_client
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_fazenda():
     """
-    Fixture que retorna um objeto Fazenda de exemplo para uso nos testes.
+    Fixture que retorna uma fazenda de exemplo para uso nos testes.
     
-    Cria uma instância do modelo Fazenda com dados fictícios mas realistas,
-    simulando uma fazenda do estado de São Paulo. Este objeto é usado como
-    retorno mockado dos repositories nos testes de endpoints.
+    Criada uma única vez por sessão e compartilhada entre os testes: os testes não
+    devem modificá-la (para variações, use uma cópia, ex.: {**sample_fazenda, "id": 2}).
+    
+    Representa uma linha retornada pelo repository (dict com as colunas de
+    FAZENDA_COLUMNS), com dados fictícios mas realistas, simulando uma fazenda
+    do estado de São Paulo. Este objeto é usado como retorno mockado dos
+    repositories nos testes de endpoints.
     
     Campos importantes:
     - id: 1 (identificador único)
     - municipio: "Adamantina" (município de SP)
     - cod_estado: "SP" (código do estado)
-    - geom: None (geometria mockada, seria WKBElement em produção)
+    - Sem geom/geog (as buscas em lista não projetam a geometria)
     
     Returns:
-        Fazenda: Objeto Fazenda com dados de exemplo
+        Dict[str, Any]: Linha de fazenda com dados de exemplo
     """
-    fazenda = Fazenda()
-    fazenda.id = 1
-    fazenda.cod_tema = "AREA_IMOVEL"
-    fazenda.nom_tema = "Area do Imovel"
-    fazenda.cod_imovel = "SP-3500105-279714F410E746B0B440EFAD4B0933D4"
-    fazenda.mod_fiscal = 0.1912
-    fazenda.num_area = 3.8239
-    fazenda.ind_status = "AT"
-    fazenda.ind_tipo = "IRU"
-    fazenda.des_condic = "Aguardando analise"
-    fazenda.municipio = "Adamantina"
-    fazenda.cod_estado = "SP"
-    fazenda.dat_criaca = "2025-10-09"
-    fazenda.dat_atuali = "2025-10-09"
-    fazenda.geom = None  # Geometria seria um objeto WKBElement em produção
-    return fazenda
-
-
-@pytest.fixture
+    return {
+        "id": 1,
+        "cod_tema": "AREA_IMOVEL",
+        "nom_tema": "Area do Imovel",
+        "cod_imovel": "SP-3500105-279714F410E746B0B440EFAD4B0933D4",
+        "mod_fiscal": 0.1912,
+        "num_area": 3.8239,
+        "ind_status": "AT",
+        "ind_tipo": "IRU",
+        "des_condic": "Aguardando analise",
+        "municipio": "Adamantina",
+        "cod_estado": "SP",
+        "dat_criaca": "2025-10-09",
+        "dat_atuali": "2025-10-09",
+    }
+
+
+@pytest.fixture(scope="session")
 def sample_fazendas_list(sample_fazenda):  # noqa: F811
     """
     Fixture que retorna uma lista com 2 fazendas de exemplo para testes.
     
+    Também criada uma única vez por sessão (como a sample_fazenda); não deve ser
+    modificada pelos testes.
+    
     Útil para testar endpoints que retornam múltiplos resultados, como busca por
     ponto ou busca por raio. A lista contém a sample_fazenda (id=1) e uma segunda
     fazenda (id=2) com dados similares mas diferentes.
@@ -108,23 +158,22 @@ def sample_fazendas_list(sample_fazenda):  # noqa: F811
         sample_fazenda: Fixture que fornece a primeira fazenda da lista
     
     Returns:
-        List[Fazenda]: Lista com 2 objetos Fazenda para testes de listagens
+        List[Dict[str, Any]]: Lista com 2 linhas de fazenda para testes de listagens
     """
-    fazenda2 = Fazenda()
-    fazenda2.id = 2
-    fazenda2.cod_tema = "AREA_IMOVEL"
-    fazenda2.nom_tema = "Area do Imovel"
-    fazenda2.cod_imovel = "SP-3500105-279714F410E746B0B440EFAD4B0933D5"
-    fazenda2.mod_fiscal = 0.2000
-    fazenda2.num_area = 5.0000
-    fazenda2.ind_status = "AT"
-    fazenda2.ind_tipo = "IRU"
-    fazenda2.des_condic = "Aguardando analise"
-    fazenda2.municipio = "Adamantina"
-    fazenda2.cod_estado = "SP"
-    fazenda2.dat_criaca = "2025-10-10"
-    fazenda2.dat_atuali = "2025-10-10"
-    fazenda2.geom = None
+    fazenda2 = {
+        "id": 2,
+        "cod_tema": "AREA_IMOVEL",
+        "nom_tema": "Area do Imovel",
+        "cod_imovel": "SP-3500105-279714F410E746B0B440EFAD4B0933D5",
+        "mod_fiscal": 0.2000,
+        "num_area": 5.0000,
+        "ind_status": "AT",
+        "ind_tipo": "IRU",
+        "des_condic": "Aguardando analise",
+        "municipio": "Adamantina",
+        "cod_estado": "SP",
+        "dat_criaca": "2025-10-10",
+        "dat_atuali": "2025-10-10",
+    }
     
     return [sample_fazenda, fazenda2]
-
@@ -1,5 +1,98 @@
-from unittest.mock import patch
-from fastapi import status
+import asyncio
+import orjson
+import pytest
+from types import SimpleNamespace
+from unittest.mock import ANY, patch
+from fastapi import HTTPException
+from starlette.status import (
+    HTTP_200_OK,
+    HTTP_404_NOT_FOUND,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+)
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.controllers.fazenda_controller import FAZENDA_BY_ID_CACHE, FazendaController, fazenda_repository
+
+
+# Bodies válidos das buscas por ponto e por raio, serializados uma única vez para o módulo
+# (enviados com content=, sem codificar o mesmo JSON a cada requisição)
+PAYLOAD_PONTO = orjson.dumps({"latitude": -23.5505, "longitude": -46.6333})
+PAYLOAD_RAIO = orjson.dumps({"latitude": -23.5505, "longitude": -46.6333, "raio_km": 50.0})
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Métodos do repository substituídos por mocks em todos os testes deste módulo
+REPOSITORY_METHODS = ("get_by_cod_imovel", "get_by_id", "get_by_ids", "get_by_point", "get_by_points", "get_by_radius", "get_tile")
+
+
+def _json(response):
+    """
+    Decodifica o corpo JSON da resposta com orjson (decoder em C, o mesmo da API),
+    em vez do json da biblioteca padrão usado por response.json().
+    """
+    return orjson.loads(response.content)
+
+
+def assert_paginated(data, *, total, page, page_size, n_items):
+    """
+    Verifica a estrutura de uma página de fazendas (PaginatedResponse) e a aritmética da
+    paginação: campos presentes, total, página, tamanho, total_pages = ceil(total / page_size)
+    e a quantidade de itens devolvidos.
+    
+    Args:
+        data: Corpo JSON já decodificado da resposta
+        total: Total esperado de registros
+        page: Página esperada
+        page_size: Tamanho de página esperado
+        n_items: Quantidade esperada de itens na página
+    """
+    assert data.keys() >= {"items", "total", "page", "page_size", "total_pages"}
+    assert data["total"] == total
+    assert data["page"] == page
+    assert data["page_size"] == page_size
+    assert data["total_pages"] == -(-total // page_size)
+    assert len(data["items"]) == n_items
+
+
+@pytest.fixture(scope="module", autouse=True)
+def repo_mocks_module():
+    """
+    Fixture que substitui os métodos de busca do fazenda_repository por mocks uma única
+    vez para o módulo inteiro.
+    
+    Em vez de um @patch por teste (com o patcher montado, aplicado e desfeito a cada
+    execução), os patchers são iniciados uma vez e encerrados ao fim do módulo. Os
+    testes configuram o retorno de cada mock (ex.: repo_mocks.get_by_point.return_value)
+    pela fixture repo_mocks, que os limpa antes de cada teste.
+    
+    Returns:
+        SimpleNamespace: Um mock (AsyncMock) por método do repository, pelo nome do método
+    """
+    patchers = [patch.object(fazenda_repository, name) for name in REPOSITORY_METHODS]
+    mocks = SimpleNamespace(**{
+        name: patcher.start() for name, patcher in zip(REPOSITORY_METHODS, patchers)
+    })
+    yield mocks
+    for patcher in patchers:
+        patcher.stop()
+
+
+@pytest.fixture(autouse=True)
+def repo_mocks(repo_mocks_module):
+    """
+    Fixture que isola os testes: limpa chamadas, retorno e side_effect configurados por
+    um teste anterior nos mocks do repository (compartilhados pelo módulo).
+    
+    Args:
+        repo_mocks_module: Fixture com os mocks criados uma vez para o módulo
+    
+    Returns:
+        SimpleNamespace: Os mocks do repository, prontos para o teste configurar
+    """
+    for mock in vars(repo_mocks_module).values():
+        mock.reset_mock(return_value=True, side_effect=True)
+    return repo_mocks_module
 
 
 class TestGetFazendaByCodImovel:
@@ -10,8 +103,7 @@ class TestGetFazendaByCodImovel:
     Testa casos de sucesso, falha (404) e validação de parâmetros inválidos.
     """
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_cod_imovel')
-    def test_get_fazenda_by_cod_imovel_success(self, mock_get_by_cod_imovel, client, sample_fazenda, mock_db):
+    def test_get_fazenda_by_cod_imovel_success(self, repo_mocks, client, sample_fazenda):
         """
         Testa busca bem-sucedida de uma fazenda existente pelo código do imóvel.
         
@@ -19,22 +111,27 @@ class TestGetFazendaByCodImovel:
         
         Verifica:
         - Status HTTP 200 (sucesso)
+        - Resposta paginada com a fazenda encontrada
         - Retorno de todos os campos esperados da fazenda
         - Valores corretos nos campos principais (id, cod_tema, cod_imovel, municipio, etc.)
         - Chamada correta do repository com o cod_imovel fornecido
+        - Cabeçalho Cache-Control (resposta reaproveitável por clientes e proxies)
         
         Este é o caso feliz (happy path) do endpoint de busca por código do imóvel.
         """
         # Configura os mocks
         cod_imovel_test = "SP-3500105-279714F410E746B0B440EFAD4B0933D4"
-        mock_get_by_cod_imovel.return_value = sample_fazenda
+        repo_mocks.get_by_cod_imovel.return_value = ([sample_fazenda], 1, False)
         
         # Faz a requisição
         response = client.get(f"/fazendas/{cod_imovel_test}")
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["cache-control"] == "public, max-age=30"
+        body = _json(response)
+        assert body["total"] == 1
+        data = body["items"][0]
         assert data["id"] == 1
         assert data["cod_tema"] == "AREA_IMOVEL"
         assert data["nom_tema"] == "Area do Imovel"
@@ -43,12 +140,9 @@ class TestGetFazendaByCodImovel:
         assert data["cod_estado"] == "SP"
         
         # Verifica que o método do repository foi chamado corretamente
-        mock_get_by_cod_imovel.assert_called_once()
-        call_args = mock_get_by_cod_imovel.call_args[0]
-        assert call_args[1] == cod_imovel_test  # cod_imovel
+        repo_mocks.get_by_cod_imovel.assert_called_once_with(ANY, cod_imovel_test, 1, 10, None)
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_cod_imovel')
-    def test_get_fazenda_by_cod_imovel_not_found(self, mock_get_by_cod_imovel, client, mock_db):
+    def test_get_fazenda_by_cod_imovel_not_found(self, repo_mocks, client):
         """
         Testa o comportamento quando uma fazenda não existe no banco de dados.
         
@@ -64,31 +158,204 @@ class TestGetFazendaByCodImovel:
         """
         # Configura os mocks
         cod_imovel_test = "SP-9999999-NAOEXISTE"
-        mock_get_by_cod_imovel.return_value = None
+        repo_mocks.get_by_cod_imovel.return_value = ([], 0, False)
         
         # Faz a requisição
         response = client.get(f"/fazendas/{cod_imovel_test}")
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_404_NOT_FOUND
-        data = response.json()
+        assert response.status_code == HTTP_404_NOT_FOUND
+        data = _json(response)
         assert "detail" in data
         assert "não encontrada" in data["detail"].lower()
         assert cod_imovel_test in data["detail"]
+    
+    def test_get_fazenda_by_cod_imovel_keyset_pagination(self, repo_mocks, client, sample_fazendas_list):
+        """
+        Testa a paginação por cursor (keyset) da busca por cod_imovel.
+        
+        Cenário: Página cheia (page_size=2) a partir do cursor after_id=0, com mais
+        fazendas depois dela.
+        
+        Verifica:
+        - Status HTTP 200
+        - Repository chamado com o after_id informado
+        - has_next=True e next_cursor igual ao id do último item da página
+        """
+        # Configura os mocks
+        cod_imovel_test = "SP-3500105-279714F410E746B0B440EFAD4B0933D4"
+        repo_mocks.get_by_cod_imovel.return_value = (sample_fazendas_list, 3, True)
+        
+        # Faz a requisição com cursor
+        response = client.get(f"/fazendas/{cod_imovel_test}?page_size=2&after_id=0")
+        
+        # Verifica a resposta
+        assert response.status_code == HTTP_200_OK
+        data = _json(response)
+        assert data["has_next"] is True
+        assert data["next_cursor"] == 2
+        
+        # Verifica que o cursor foi repassado ao repository
+        repo_mocks.get_by_cod_imovel.assert_called_once_with(ANY, cod_imovel_test, 1, 2, 0)
+    
+    def test_get_fazenda_by_cod_imovel_cached(self, repo_mocks, client, sample_fazenda):
+        """
+        Testa que buscas repetidas pelo mesmo cod_imovel são servidas do cache.
+        
+        Cenário: A mesma fazenda é buscada duas vezes com os mesmos parâmetros de paginação.
+        
+        Verifica:
+        - Ambas as respostas com status HTTP 200 e conteúdo idêntico
+        - Repository chamado apenas uma vez (a segunda resposta vem do cache em memória)
+        
+        O cod_imovel (código CAR) praticamente não muda, então a resposta pode ser
+        reaproveitada sem nova ida ao PostGIS.
+        """
+        # Configura os mocks
+        cod_imovel_test = "SP-3500105-279714F410E746B0B440EFAD4B0933D4"
+        repo_mocks.get_by_cod_imovel.return_value = ([sample_fazenda], 1, False)
+        
+        # Faz a mesma requisição duas vezes
+        first = client.get(f"/fazendas/{cod_imovel_test}")
+        second = client.get(f"/fazendas/{cod_imovel_test}")
+        
+        # Verifica as respostas e que o banco foi consultado uma única vez
+        assert first.status_code == HTTP_200_OK
+        assert second.status_code == HTTP_200_OK
+        assert first.json() == second.json()
+        repo_mocks.get_by_cod_imovel.assert_called_once()
+    
+    def test_get_fazenda_by_cod_imovel_not_found_cached(self, repo_mocks, client):
+        """
+        Testa o cache negativo para cod_imovel inexistentes.
+        
+        Cenário: Um cod_imovel inexistente é buscado duas vezes (inclusive em outra página).
+        
+        Verifica:
+        - Ambas as respostas com status HTTP 404
+        - Repository chamado apenas uma vez (o código inexistente fica em cache negativo)
+        
+        Isso impede que requisições repetidas para códigos inválidos martelem o banco.
+        """
+        # Configura os mocks
+        cod_imovel_test = "SP-9999999-NAOEXISTE"
+        repo_mocks.get_by_cod_imovel.return_value = ([], 0, False)
+        
+        # Faz a requisição duas vezes
+        first = client.get(f"/fazendas/{cod_imovel_test}")
+        second = client.get(f"/fazendas/{cod_imovel_test}?page=2")
+        
+        # Verifica as respostas e que o banco foi consultado uma única vez
+        assert first.status_code == HTTP_404_NOT_FOUND
+        assert second.status_code == HTTP_404_NOT_FOUND
+        repo_mocks.get_by_cod_imovel.assert_called_once()
+    
+    def test_cod_imovel_route_registered_last(self):
+        """
+        Testa a ordem de registro das rotas de /fazendas.
+        
+        Verifica:
+        - GET /fazendas/{cod_imovel} é a última rota do app, depois de todos os caminhos fixos
+        
+        O Starlette testa as rotas em ordem; com o caminho genérico por último, os caminhos
+        fixos casam primeiro e não podem ser encobertos por ele.
+        """
+        paths = [route.path for route in app.routes if route.path.startswith("/fazendas")]
+        
+        assert paths[-1] == "/fazendas/{cod_imovel}"
+        assert paths.count("/fazendas/{cod_imovel}") == 1
+
+
+class TestGetFazendaById:
+    """
+    Classe de testes para FazendaController.get_fazenda_by_id (busca por ID).
+    
+    A busca por ID não tem rota própria (o caminho /fazendas/{...} é usado pelo
+    cod_imovel), então o controller é chamado diretamente, com o repository mockado.
+    """
+    
+    def test_get_fazenda_by_id_cached(self, repo_mocks, sample_fazenda, mock_db):
+        """
+        Testa que buscas repetidas pelo mesmo ID são servidas do cache.
+        
+        Cenário: A fazenda de ID 1 é buscada duas vezes e depois removida do cache
+        (como faria um endpoint de escrita) e buscada novamente.
+        
+        Verifica:
+        - Mesma resposta nas duas primeiras buscas, com o repository chamado uma única vez
+        - Após FAZENDA_BY_ID_CACHE.pop(1), o repository é consultado de novo
+        """
+        repo_mocks.get_by_id.return_value = sample_fazenda
+        
+        first = asyncio.run(FazendaController.get_fazenda_by_id(mock_db, 1))
+        second = asyncio.run(FazendaController.get_fazenda_by_id(mock_db, 1))
+        
+        assert first.id == 1
+        assert second is first
+        repo_mocks.get_by_id.assert_called_once()
+        
+        # Invalidação (ex.: após uma atualização da fazenda)
+        FAZENDA_BY_ID_CACHE.pop(1)
+        asyncio.run(FazendaController.get_fazenda_by_id(mock_db, 1))
+        assert repo_mocks.get_by_id.call_count == 2
+    
+    def test_get_fazenda_by_id_not_found(self, repo_mocks, mock_db):
+        """
+        Testa a busca por um ID inexistente.
+        
+        Cenário: O repository não encontra a fazenda (retorna None).
+        
+        Verifica:
+        - HTTPException com status 404
+        - Nada é guardado no cache (a próxima busca consulta o banco de novo)
+        """
+        repo_mocks.get_by_id.return_value = None
+        
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(FazendaController.get_fazenda_by_id(mock_db, 999))
+        
+        assert exc_info.value.status_code == HTTP_404_NOT_FOUND
+        assert len(FAZENDA_BY_ID_CACHE) == 0
 
 
 class TestBuscarFazendasPorPonto:
     """
-    Classe de testes para o endpoint POST /fazendas/busca-ponto.
+    Classe de testes para os endpoints POST e GET /fazendas/busca-ponto.
     
     Este endpoint recebe coordenadas (latitude/longitude) e retorna todas as
     fazendas cuja geometria contém aquele ponto. Testa casos de sucesso, lista
     vazia, paginação e validações de entrada.
     """
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_point')
-    def test_buscar_fazendas_por_ponto_success(self, mock_get_by_point, 
-                                                 client, sample_fazendas_list, mock_db):
+    def test_buscar_fazendas_por_ponto_get(self, repo_mocks, client, sample_fazendas_list):
+        """
+        Testa a busca por ponto via GET, com as coordenadas nos query params.
+        
+        Cenário: Existem 2 fazendas que contêm o ponto (-23.5505, -46.6333).
+        
+        Verifica:
+        - Status HTTP 200 e as 2 fazendas na resposta
+        - Cabeçalho Cache-Control público (resposta cacheável por CDN/proxy)
+        - Repository chamado com as coordenadas e a paginação dos query params
+        - Coordenadas fora do intervalo válido retornam 422
+        """
+        repo_mocks.get_by_point.return_value = (sample_fazendas_list, None, False)
+        
+        response = client.get("/fazendas/busca-ponto?latitude=-23.5505&longitude=-46.6333&page_size=5")
+        
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["cache-control"] == "public, max-age=60, stale-while-revalidate=300"
+        assert [item["id"] for item in _json(response)["items"]] == [1, 2]
+        
+        repo_mocks.get_by_point.assert_called_once_with(
+            ANY, -23.5505, -46.6333, 1, 5, None, include_total=False, exact_total=False
+        )
+        
+        response = client.get("/fazendas/busca-ponto?latitude=-91&longitude=-46.6333")
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_buscar_fazendas_por_ponto_success(self, repo_mocks, 
+                                                 client, sample_fazendas_list):
         """
         Testa busca bem-sucedida de fazendas que contêm um ponto específico.
         
@@ -98,139 +365,110 @@ class TestBuscarFazendasPorPonto:
         - Status HTTP 200 (sucesso)
         - Estrutura de resposta paginada correta (items, total, page, etc.)
         - Total de 2 fazendas encontradas
-        - Paginação funcionando (page=1, page_size=10, total_pages=1)
+        - Paginação funcionando (page=1, page_size=10, total_pages=1, has_next=False)
         - Lista items contém 2 fazendas com IDs 1 e 2
-        - Chamada correta do repository com coordenadas e parâmetros de paginação
+        - Total estimado (total_estimated=True), já que exact_total não foi informado
+        - Chamada correta do repository com coordenadas, parâmetros de paginação e include_total
         
         Este é o caso feliz do endpoint, testando o fluxo completo com resultados.
         """
         # Configura os mocks
-        mock_get_by_point.return_value = (sample_fazendas_list, 2)
-        
-        # Dados da requisição
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333
-        }
+        repo_mocks.get_by_point.return_value = (sample_fazendas_list, 2, False)
         
         # Faz a requisição
-        response = client.post("/fazendas/busca-ponto?page=1&page_size=10", json=payload)
+        response = client.post("/fazendas/busca-ponto?page=1&page_size=10&include_total=true", content=PAYLOAD_PONTO, headers=JSON_HEADERS)
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert "items" in data
-        assert "total" in data
-        assert "page" in data
-        assert "page_size" in data
-        assert "total_pages" in data
-        
-        assert data["total"] == 2
-        assert data["page"] == 1
-        assert data["page_size"] == 10
-        assert data["total_pages"] == 1
-        assert len(data["items"]) == 2
+        assert response.status_code == HTTP_200_OK
+        data = _json(response)
+        assert_paginated(data, total=2, page=1, page_size=10, n_items=2)
+        assert data["has_next"] is False
+        assert data["total_estimated"] is True
         assert data["items"][0]["id"] == 1
         assert data["items"][1]["id"] == 2
         
         # Verifica que o método do repository foi chamado corretamente
-        mock_get_by_point.assert_called_once()
-        call_args = mock_get_by_point.call_args[0]
-        assert call_args[1] == -23.5505  # latitude
-        assert call_args[2] == -46.6333  # longitude
-        assert call_args[3] == 1  # page
-        assert call_args[4] == 10  # page_size
+        repo_mocks.get_by_point.assert_called_once_with(
+            ANY, -23.5505, -46.6333, 1, 10, None, include_total=True, exact_total=False
+        )
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_point')
-    def test_buscar_fazendas_por_ponto_empty_result(self, mock_get_by_point, 
-                                                      client, mock_db):
+    def test_buscar_fazendas_por_ponto_keyset_pagination(self, repo_mocks, 
+                                                           client, sample_fazendas_list):
         """
-        Testa o comportamento quando nenhuma fazenda contém o ponto fornecido.
+        Testa a paginação por cursor (keyset) usando o parâmetro after_id.
         
-        Cenário: Nenhuma fazenda contém o ponto (-50.0, -50.0) (coordenadas
-        fora da área coberta pelos dados, por exemplo).
+        Cenário: Página cheia (page_size=2) solicitada a partir do cursor after_id=0,
+        sem include_total (padrão), e o repository indica que há próxima página.
         
         Verifica:
-        - Status HTTP 200 (sucesso - lista vazia é um resultado válido)
-        - Total = 0 (nenhuma fazenda encontrada)
-        - Lista items vazia
-        - total_pages = 0
-        - Estrutura de paginação mantida mesmo com resultados vazios
+        - Status HTTP 200
+        - Repository chamado com o after_id informado e include_total=False
+        - has_next=True e next_cursor igual ao id do último item da página
+        - total e total_pages nulos (nenhuma contagem feita)
         
-        Este teste garante que a API lida corretamente com casos onde não há
-        resultados, retornando uma estrutura válida mas vazia.
+        Este teste garante que o cliente consegue encadear páginas usando o
+        next_cursor retornado, sem depender de OFFSET nem de uma query count().
         """
-        # Configura os mocks
-        mock_get_by_point.return_value = ([], 0)
-        
-        # Dados da requisição
-        payload = {
-            "latitude": -50.0,
-            "longitude": -50.0
-        }
+        # Configura os mocks - página cheia com as 2 fazendas
+        repo_mocks.get_by_point.return_value = (sample_fazendas_list, None, True)
         
-        # Faz a requisição
-        response = client.post("/fazendas/busca-ponto", json=payload)
+        # Faz a requisição com cursor
+        response = client.post("/fazendas/busca-ponto?page_size=2&after_id=0", content=PAYLOAD_PONTO, headers=JSON_HEADERS)
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert data["total"] == 0
-        assert data["page"] == 1
-        assert data["page_size"] == 10
-        assert data["total_pages"] == 0
-        assert len(data["items"]) == 0
+        assert response.status_code == HTTP_200_OK
+        data = _json(response)
+        assert len(data["items"]) == 2
+        assert data["has_next"] is True
+        assert data["next_cursor"] == 2
+        assert data["total"] is None
+        assert data["total_pages"] is None
+        
+        # Verifica que o cursor foi repassado ao repository
+        repo_mocks.get_by_point.assert_called_once_with(
+            ANY, -23.5505, -46.6333, 1, 2, 0, include_total=False, exact_total=False
+        )
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_point')
-    def test_buscar_fazendas_por_ponto_pagination(self, mock_get_by_point, 
-                                                    client, sample_fazendas_list, mock_db):
+    def test_buscar_fazendas_por_ponto_internal_error(self, repo_mocks, override_get_db):
         """
-        Testa se a paginação está funcionando corretamente.
+        Testa o tratamento de erros inesperados na busca por ponto.
         
-        Cenário: Existem 2 fazendas no total, solicitando página 2 com page_size=1.
+        Cenário: O repository levanta uma exceção não prevista (ex.: falha no banco).
         
         Verifica:
-        - Status HTTP 200
-        - page = 2 (página solicitada)
-        - page_size = 1 (tamanho da página solicitado)
-        - total = 2 (total de registros)
-        - total_pages = 2 (2 páginas no total)
-        - Repository chamado com os parâmetros de paginação corretos (page=2, page_size=1)
+        - Status HTTP 500 (Internal Server Error)
+        - Mensagem genérica, sem expor detalhes internos da exceção
         
-        Este teste garante que os parâmetros de paginação são corretamente
-        passados para o repository e refletidos na resposta.
+        Os controllers não têm try/except genéricos: o erro chega ao handler
+        global de Exception registrado em app/main.py. O cliente é criado com
+        raise_server_exceptions=False para receber a resposta do handler em vez
+        de a exceção ser relançada no teste.
         """
-        # Configura os mocks - retorna apenas uma fazenda na página 2
-        mock_get_by_point.return_value = ([sample_fazendas_list[0]], 2)
-        
-        # Dados da requisição
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333
-        }
+        # Configura o mock para falhar
+        repo_mocks.get_by_point.side_effect = RuntimeError("conexão perdida")
+        client = TestClient(app, raise_server_exceptions=False)
         
-        # Faz a requisição com paginação
-        response = client.post("/fazendas/busca-ponto?page=2&page_size=1", json=payload)
+        # Faz a requisição
+        response = client.post("/fazendas/busca-ponto", content=PAYLOAD_PONTO, headers=JSON_HEADERS)
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert data["page"] == 2
-        assert data["page_size"] == 1
-        assert data["total"] == 2
-        assert data["total_pages"] == 2
-        
-        # Verifica que o método do repository foi chamado com os parâmetros corretos
-        mock_get_by_point.assert_called_once()
-        call_args = mock_get_by_point.call_args[0]
-        assert call_args[3] == 2  # page
-        assert call_args[4] == 1  # page_size
+        assert response.status_code == HTTP_500_INTERNAL_SERVER_ERROR
+        assert _json(response) == {"detail": "Erro interno do servidor"}
     
-    def test_buscar_fazendas_por_ponto_invalid_coordinates(self, client):
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"latitude": 91.0, "longitude": -46.6333},  # Latitude deve ser entre -90 e 90
+            {"latitude": -23.5505, "longitude": 181.0},  # Longitude deve ser entre -180 e 180
+            {},  # Dados faltando
+        ],
+        ids=["latitude", "longitude", "vazio"],
+    )
+    def test_buscar_fazendas_por_ponto_invalid_coordinates(self, client, payload):
         """
         Testa a validação de coordenadas geográficas inválidas.
         
-        Cenários testados:
+        Cenários testados (um caso parametrizado por entrada):
         - Latitude = 91.0 (fora do intervalo válido -90 a 90)
         - Longitude = 181.0 (fora do intervalo válido -180 a 180)
         - Body vazio (campos obrigatórios faltando)
@@ -242,31 +480,22 @@ class TestBuscarFazendasPorPonto:
         Este teste garante que coordenadas inválidas são rejeitadas antes
         de processar a requisição, evitando erros no processamento geoespacial.
         """
-        # Latitude fora do intervalo válido
-        payload = {
-            "latitude": 91.0,  # Deve ser entre -90 e 90
-            "longitude": -46.6333
-        }
         response = client.post("/fazendas/busca-ponto", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-        
-        # Longitude fora do intervalo válido
-        payload = {
-            "latitude": -23.5505,
-            "longitude": 181.0  # Deve ser entre -180 e 180
-        }
-        response = client.post("/fazendas/busca-ponto", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-        
-        # Dados faltando
-        response = client.post("/fazendas/busca-ponto", json={})
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
     
-    def test_buscar_fazendas_por_ponto_invalid_pagination(self, client):
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "page=0",  # Page inválida (zero ou negativo)
+            "page_size=101",  # Page_size muito grande (maior que 100)
+            "page_size=0",  # Page_size inválido (zero ou negativo)
+        ],
+    )
+    def test_buscar_fazendas_por_ponto_invalid_pagination(self, client, query):
         """
         Testa a validação de parâmetros de paginação inválidos.
         
-        Cenários testados:
+        Cenários testados (um caso parametrizado por query string):
         - page = 0 (deve ser > 0)
         - page_size = 101 (excede o máximo permitido de 100)
         - page_size = 0 (deve ser > 0)
@@ -279,36 +508,94 @@ class TestBuscarFazendasPorPonto:
         corretamente, prevenindo comportamentos inesperados ou problemas
         de performance com page_size muito grande.
         """
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333
-        }
-        
-        # Page inválida (zero ou negativo)
-        response = client.post("/fazendas/busca-ponto?page=0", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-        
-        # Page_size muito grande (maior que 100)
-        response = client.post("/fazendas/busca-ponto?page_size=101", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-        
-        # Page_size inválido (zero ou negativo)
-        response = client.post("/fazendas/busca-ponto?page_size=0", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        response = client.post(f"/fazendas/busca-ponto?{query}", content=PAYLOAD_PONTO, headers=JSON_HEADERS)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
 
 
 class TestBuscarFazendasPorRaio:
     """
-    Classe de testes para o endpoint POST /fazendas/busca-raio.
+    Classe de testes para os endpoints POST e GET /fazendas/busca-raio.
     
     Este endpoint recebe coordenadas (latitude/longitude) e um raio em quilômetros,
     retornando todas as fazendas cuja geometria está dentro desse raio do ponto
     central. Testa casos de sucesso, lista vazia, paginação e validações.
     """
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_radius')
-    def test_buscar_fazendas_por_raio_success(self, mock_get_by_radius, 
-                                               client, sample_fazendas_list, mock_db):
+    def test_buscar_fazendas_por_raio_gzip(self, repo_mocks, client, sample_fazenda):
+        """
+        Testa a compressão gzip de uma página grande de fazendas.
+        
+        Cenário: A busca retorna 50 fazendas e o cliente aceita gzip.
+        
+        Verifica:
+        - Resposta com Content-Encoding: gzip
+        - Corpo descomprimido com as 50 fazendas
+        - Sem Accept-Encoding: gzip, a resposta não é comprimida
+        """
+        repo_mocks.get_by_radius.return_value = ([{**sample_fazenda, "id": i} for i in range(1, 51)], None, False)
+        
+        response = client.post("/fazendas/busca-raio?page_size=50", content=PAYLOAD_RAIO, headers={**JSON_HEADERS, "Accept-Encoding": "gzip"})
+        
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(_json(response)["items"]) == 50
+        
+        response = client.post("/fazendas/busca-raio?page_size=50", content=PAYLOAD_RAIO, headers={**JSON_HEADERS, "Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+    
+    def test_buscar_fazendas_por_raio_get(self, repo_mocks, client, sample_fazendas_list):
+        """
+        Testa a busca por raio via GET, com coordenadas e raio nos query params.
+        
+        Cenário: Existem 2 fazendas dentro de 50 km do ponto (-23.5505, -46.6333).
+        
+        Verifica:
+        - Status HTTP 200 e as 2 fazendas na resposta
+        - Cabeçalho Cache-Control público (resposta cacheável por CDN/proxy)
+        - Repository chamado com coordenadas, raio e include_total dos query params
+        - Raio ausente retorna 422 (a rota não cai em GET /fazendas/{cod_imovel})
+        """
+        repo_mocks.get_by_radius.return_value = (sample_fazendas_list, 2, False)
+        
+        response = client.get("/fazendas/busca-raio?latitude=-23.5505&longitude=-46.6333&raio_km=50&include_total=true")
+        
+        assert response.status_code == HTTP_200_OK
+        assert response.headers["cache-control"] == "public, max-age=60, stale-while-revalidate=300"
+        data = _json(response)
+        assert data["total"] == 2
+        assert len(data["items"]) == 2
+        
+        repo_mocks.get_by_radius.assert_called_once_with(
+            ANY, -23.5505, -46.6333, 50.0, 1, 10, None, include_total=True, exact_total=False
+        )
+        
+        response = client.get("/fazendas/busca-raio?latitude=-23.5505&longitude=-46.6333")
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    
+    def test_buscar_fazendas_por_raio_get_quantized_cache(self, repo_mocks, client, sample_fazendas_list):
+        """
+        Testa o arredondamento das entradas antes do cache das buscas por raio.
+        
+        Cenário: Duas buscas GET que só diferem a partir da 6ª casa decimal das coordenadas
+        e por menos de 10 m no raio.
+        
+        Verifica:
+        - As duas respostas são iguais e o repository é consultado uma única vez
+        - Repository chamado com coordenadas (5 casas decimais) e raio (múltiplo de 10 m) arredondados
+        """
+        repo_mocks.get_by_radius.return_value = (sample_fazendas_list, None, False)
+        
+        first = client.get("/fazendas/busca-raio?latitude=-23.5505012&longitude=-46.6332998&raio_km=50.0031")
+        second = client.get("/fazendas/busca-raio?latitude=-23.5504996&longitude=-46.6333004&raio_km=49.9984")
+        
+        assert first.status_code == second.status_code == HTTP_200_OK
+        assert _json(first) == _json(second)
+        repo_mocks.get_by_radius.assert_called_once_with(
+            ANY, -23.5505, -46.6333, 50.0, 1, 10, None, include_total=False, exact_total=False
+        )
+    
+    def test_buscar_fazendas_por_raio_success(self, repo_mocks, 
+                                               client, sample_fazendas_list):
         """
         Testa busca bem-sucedida de fazendas dentro de um raio específico.
         
@@ -325,217 +612,363 @@ class TestBuscarFazendasPorRaio:
         Este é o caso feliz do endpoint de busca por raio, testando o fluxo completo.
         """
         # Configura os mocks
-        mock_get_by_radius.return_value = (sample_fazendas_list, 2)
-        
-        # Dados da requisição
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333,
-            "raio_km": 50.0
-        }
+        repo_mocks.get_by_radius.return_value = (sample_fazendas_list, 2, False)
         
         # Faz a requisição
-        response = client.post("/fazendas/busca-raio?page=1&page_size=10", json=payload)
+        response = client.post("/fazendas/busca-raio?page=1&page_size=10&include_total=true&exact_total=true", content=PAYLOAD_RAIO, headers=JSON_HEADERS)
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert "items" in data
-        assert "total" in data
-        assert "page" in data
-        assert "page_size" in data
-        assert "total_pages" in data
-        
-        assert data["total"] == 2
-        assert data["page"] == 1
-        assert data["page_size"] == 10
-        assert data["total_pages"] == 1
-        assert len(data["items"]) == 2
+        assert response.status_code == HTTP_200_OK
+        data = _json(response)
+        assert_paginated(data, total=2, page=1, page_size=10, n_items=2)
         
         # Verifica que o método do repository foi chamado corretamente
-        mock_get_by_radius.assert_called_once()
-        call_args = mock_get_by_radius.call_args[0]
-        assert call_args[1] == -23.5505  # latitude
-        assert call_args[2] == -46.6333  # longitude
-        assert call_args[3] == 50.0  # raio_km
-        assert call_args[4] == 1  # page
-        assert call_args[5] == 10  # page_size
+        repo_mocks.get_by_radius.assert_called_once_with(
+            ANY, -23.5505, -46.6333, 50.0, 1, 10, None, include_total=True, exact_total=True
+        )
+        assert data["total_estimated"] is False
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_radius')
-    def test_buscar_fazendas_por_raio_empty_result(self, mock_get_by_radius, 
-                                                     client, mock_db):
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            {"latitude": 91.0, "longitude": -46.6333, "raio_km": 50.0},  # Latitude fora do intervalo
+            {"latitude": -23.5505, "longitude": 181.0, "raio_km": 50.0},  # Longitude fora do intervalo
+            {"latitude": -23.5505, "longitude": -46.6333, "raio_km": 0},  # Raio zero
+            {"latitude": -23.5505, "longitude": -46.6333, "raio_km": -10},  # Raio negativo
+            {},  # Dados faltando
+        ],
+        ids=["latitude", "longitude", "raio_zero", "raio_negativo", "vazio"],
+    )
+    def test_buscar_fazendas_por_raio_invalid_coordinates(self, client, payload):
         """
-        Testa o comportamento quando nenhuma fazenda está dentro do raio fornecido.
+        Testa a validação de coordenadas geográficas e raio inválidos.
         
-        Cenário: Nenhuma fazenda está dentro de 1km do ponto (-50.0, -50.0).
+        Cenários testados (um caso parametrizado por entrada):
+        - Latitude = 91.0 (fora do intervalo -90 a 90)
+        - Longitude = 181.0 (fora do intervalo -180 a 180)
+        - raio_km = 0 (deve ser > 0)
+        - raio_km = -10 (valores negativos não permitidos)
+        - Body vazio (campos obrigatórios faltando)
+        
+        Verifica:
+        - Status HTTP 422 (Unprocessable Entity) para todos os casos
+        - Validação do Pydantic rejeitando valores inválidos
+        
+        Este teste garante que todos os parâmetros de entrada são validados
+        antes do processamento, especialmente o raio que deve ser positivo
+        para fazer sentido em uma busca geoespacial.
+        """
+        response = client.post("/fazendas/busca-raio", json=payload)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+    
+    @pytest.mark.parametrize(
+        "query",
+        [
+            "page=0",  # Page inválida (zero ou negativo)
+            "page_size=101",  # Page_size muito grande (maior que 100)
+            "page_size=0",  # Page_size inválido (zero ou negativo)
+        ],
+    )
+    def test_buscar_fazendas_por_raio_invalid_pagination(self, client, query):
+        """
+        Testa a validação de parâmetros de paginação inválidos na busca por raio.
+        
+        Cenários testados (um caso parametrizado por query string):
+        - page = 0 (deve ser > 0)
+        - page_size = 101 (excede o máximo de 100)
+        - page_size = 0 (deve ser > 0)
+        
+        Verifica:
+        - Status HTTP 422 (Unprocessable Entity) para todos os casos
+        - Validação do FastAPI Query funcionando corretamente
+        
+        Este teste garante consistência nas validações de paginação entre
+        todos os endpoints que suportam paginação, mantendo o mesmo comportamento.
+        """
+        response = client.post(f"/fazendas/busca-raio?{query}", content=PAYLOAD_RAIO, headers=JSON_HEADERS)
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestBuscasPaginadas:
+    """
+    Classe de testes compartilhados pelas buscas paginadas POST /fazendas/busca-ponto e
+    POST /fazendas/busca-raio.
+    
+    As duas buscas têm o mesmo contrato de paginação (PaginatedResponse) e só diferem
+    na URL, no raio_km do body e no método do repository; cada teste roda para os dois
+    endpoints (parametrizado por busca).
+    """
+    
+    @pytest.mark.parametrize(
+        "endpoint,repo_method,extra",
+        [
+            pytest.param("busca-ponto", "get_by_point", {}, id="ponto"),
+            pytest.param("busca-raio", "get_by_radius", {"raio_km": 1.0}, id="raio"),
+        ],
+    )
+    def test_busca_empty_result(self, repo_mocks, client, endpoint, repo_method, extra):
+        """
+        Testa o comportamento quando nenhuma fazenda é encontrada pela busca.
+        
+        Cenário: Nenhuma fazenda contém o ponto (-50.0, -50.0) nem está no raio em
+        torno dele (coordenadas fora da área coberta pelos dados, por exemplo).
         
         Verifica:
         - Status HTTP 200 (sucesso - lista vazia é um resultado válido)
-        - Total = 0 (nenhuma fazenda encontrada)
+        - Total = 0 (nenhuma fazenda encontrada) e total_pages = 0
         - Lista items vazia
-        - total_pages = 0
-        - Estrutura de paginação mantida mesmo sem resultados
+        - Estrutura de paginação mantida mesmo com resultados vazios
         
-        Este teste garante que a API retorna uma resposta válida mesmo quando
-        não há fazendas no raio especificado, importante para casos onde o
-        usuário busca em áreas não cobertas pelos dados.
+        Este teste garante que a API lida corretamente com casos onde não há
+        resultados, retornando uma estrutura válida mas vazia.
         """
         # Configura os mocks
-        mock_get_by_radius.return_value = ([], 0)
-        
-        # Dados da requisição
-        payload = {
-            "latitude": -50.0,
-            "longitude": -50.0,
-            "raio_km": 1.0
-        }
+        getattr(repo_mocks, repo_method).return_value = ([], 0, False)
         
-        # Faz a requisição
-        response = client.post("/fazendas/busca-raio", json=payload)
+        # Faz a requisição (com include_total para receber o total)
+        payload = {"latitude": -50.0, "longitude": -50.0, **extra}
+        response = client.post(f"/fazendas/{endpoint}?include_total=true", json=payload)
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert data["total"] == 0
-        assert data["page"] == 1
-        assert data["page_size"] == 10
-        assert data["total_pages"] == 0
-        assert len(data["items"]) == 0
+        assert response.status_code == HTTP_200_OK
+        assert_paginated(_json(response), total=0, page=1, page_size=10, n_items=0)
     
-    @patch('app.controllers.fazenda_controller.FazendaRepository.get_by_radius')
-    def test_buscar_fazendas_por_raio_pagination(self, mock_get_by_radius, 
-                                                   client, sample_fazendas_list, mock_db):
+    @pytest.mark.parametrize(
+        "endpoint,repo_method,body,search_args",
+        [
+            pytest.param("busca-ponto", "get_by_point", PAYLOAD_PONTO, (-23.5505, -46.6333), id="ponto"),
+            pytest.param("busca-raio", "get_by_radius", PAYLOAD_RAIO, (-23.5505, -46.6333, 50.0), id="raio"),
+        ],
+    )
+    def test_busca_pagination(self, repo_mocks, client, sample_fazendas_list,
+                              endpoint, repo_method, body, search_args):
         """
-        Testa se a paginação funciona corretamente na busca por raio.
+        Testa se a paginação está funcionando corretamente nas duas buscas.
         
-        Cenário: Existem 2 fazendas no total dentro do raio, solicitando página 2
-        com page_size=1.
+        Cenário: Existem 2 fazendas no total, solicitando página 2 com page_size=1.
         
         Verifica:
         - Status HTTP 200
-        - Parâmetros de paginação corretos na resposta (page=2, page_size=1)
-        - Total e total_pages calculados corretamente
-        - Repository chamado com os parâmetros de paginação corretos
+        - page = 2 (página solicitada) e page_size = 1 (tamanho solicitado)
+        - total = 2 (total de registros) e total_pages = 2
+        - Repository chamado com os parâmetros de busca e de paginação corretos
         
-        Este teste garante que a paginação funciona da mesma forma em todos
-        os endpoints de busca, mantendo consistência na API.
+        Este teste garante que os parâmetros de paginação são corretamente
+        passados para o repository e refletidos na resposta, da mesma forma em
+        todos os endpoints de busca.
         """
         # Configura os mocks - retorna apenas uma fazenda na página 2
-        mock_get_by_radius.return_value = ([sample_fazendas_list[0]], 2)
-        
-        # Dados da requisição
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333,
-            "raio_km": 50.0
-        }
+        repo_mock = getattr(repo_mocks, repo_method)
+        repo_mock.return_value = ([sample_fazendas_list[0]], 2, False)
         
         # Faz a requisição com paginação
-        response = client.post("/fazendas/busca-raio?page=2&page_size=1", json=payload)
+        response = client.post(f"/fazendas/{endpoint}?page=2&page_size=1&include_total=true", content=body, headers=JSON_HEADERS)
         
         # Verifica a resposta
-        assert response.status_code == status.HTTP_200_OK
-        data = response.json()
-        assert data["page"] == 2
-        assert data["page_size"] == 1
-        assert data["total"] == 2
-        assert data["total_pages"] == 2
+        assert response.status_code == HTTP_200_OK
+        assert_paginated(_json(response), total=2, page=2, page_size=1, n_items=1)
         
         # Verifica que o método do repository foi chamado com os parâmetros corretos
-        mock_get_by_radius.assert_called_once()
-        call_args = mock_get_by_radius.call_args[0]
-        assert call_args[4] == 2  # page
-        assert call_args[5] == 1  # page_size
+        repo_mock.assert_called_once_with(
+            ANY, *search_args, 2, 1, None, include_total=True, exact_total=False
+        )
+
+
+class TestBuscarFazendasPorIds:
+    """
+    Classe de testes para o endpoint POST /fazendas/batch.
+    
+    Este endpoint recebe uma lista de IDs e retorna as fazendas correspondentes
+    em uma única consulta ao banco. Testa o caso de sucesso e as validações do body.
+    """
     
-    def test_buscar_fazendas_por_raio_invalid_coordinates(self, client):
+    def test_buscar_fazendas_por_ids_success(self, repo_mocks,
+                                             client, sample_fazendas_list):
         """
-        Testa a validação de coordenadas geográficas e raio inválidos.
+        Testa busca bem-sucedida de várias fazendas pelos IDs.
+        
+        Cenário: São pedidos os IDs [2, 1, 2, 99]; existem as fazendas 1 e 2.
+        
+        Verifica:
+        - Status HTTP 200 (sucesso)
+        - Lista com as 2 fazendas encontradas (ID inexistente ignorado)
+        - Repository chamado uma única vez, com os IDs sem repetição
+        
+        Garante que N IDs são resolvidos em uma só ida ao banco.
+        """
+        # Configura os mocks
+        repo_mocks.get_by_ids.return_value = sample_fazendas_list
+        
+        # Faz a requisição
+        response = client.post("/fazendas/batch", json={"ids": [2, 1, 2, 99]})
+        
+        # Verifica a resposta
+        assert response.status_code == HTTP_200_OK
+        data = _json(response)
+        assert [fazenda["id"] for fazenda in data] == [1, 2]
+        
+        # Verifica que o repository foi chamado uma vez, sem IDs repetidos
+        repo_mocks.get_by_ids.assert_called_once_with(ANY, [2, 1, 99])
+    
+    def test_buscar_fazendas_por_ids_invalid_body(self, client):
+        """
+        Testa a validação do body da busca em lote.
         
         Cenários testados:
-        - Latitude = 91.0 (fora do intervalo -90 a 90)
-        - Longitude = 181.0 (fora do intervalo -180 a 180)
-        - raio_km = 0 (deve ser > 0)
-        - raio_km = -10 (valores negativos não permitidos)
-        - Body vazio (campos obrigatórios faltando)
+        - Lista vazia (mínimo de 1 ID)
+        - Mais de 100 IDs (máximo permitido)
+        - ID não numérico
         
         Verifica:
         - Status HTTP 422 (Unprocessable Entity) para todos os casos
-        - Validação do Pydantic rejeitando valores inválidos
+        """
+        # Lista vazia
+        response = client.post("/fazendas/batch", json={"ids": []})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
         
-        Este teste garante que todos os parâmetros de entrada são validados
-        antes do processamento, especialmente o raio que deve ser positivo
-        para fazer sentido em uma busca geoespacial.
+        # Mais de 100 IDs
+        response = client.post("/fazendas/batch", json={"ids": list(range(1, 102))})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+        
+        # ID não numérico
+        response = client.post("/fazendas/batch", json={"ids": ["abc"]})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
+
+class TestBuscarFazendasPorPontos:
+    """
+    Classe de testes para o endpoint POST /fazendas/busca-pontos.
+    
+    Este endpoint recebe vários pontos e retorna, para cada um, as fazendas que o
+    contêm, usando uma única consulta ao banco. Testa o agrupamento por ponto e as
+    validações do body.
+    """
+    
+    def test_buscar_fazendas_por_pontos_success(self, repo_mocks,
+                                                client, sample_fazendas_list):
         """
-        # Latitude fora do intervalo válido
-        payload = {
-            "latitude": 91.0,
-            "longitude": -46.6333,
-            "raio_km": 50.0
-        }
-        response = client.post("/fazendas/busca-raio", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        Testa busca bem-sucedida por vários pontos.
         
-        # Longitude fora do intervalo válido
-        payload = {
-            "latitude": -23.5505,
-            "longitude": 181.0,
-            "raio_km": 50.0
-        }
-        response = client.post("/fazendas/busca-raio", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        Cenário: São enviados 3 pontos; o primeiro está contido nas fazendas 1 e 2,
+        o segundo em nenhuma e o terceiro na fazenda 2.
         
-        # Raio inválido (zero ou negativo)
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333,
-            "raio_km": 0
-        }
-        response = client.post("/fazendas/busca-raio", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        Verifica:
+        - Status HTTP 200 (sucesso)
+        - Um item por ponto, na ordem recebida, com as coordenadas do ponto
+        - Fazendas agrupadas pelo point_index (ponto sem fazendas com items vazio)
+        - Repository chamado uma única vez com todos os pontos (latitude, longitude)
+        """
+        # Configura os mocks - linhas já ordenadas por ponto e id
+        fazenda1, fazenda2 = sample_fazendas_list
+        repo_mocks.get_by_points.return_value = [
+            {**fazenda1, "point_index": 1},
+            {**fazenda2, "point_index": 1},
+            {**fazenda2, "point_index": 3},
+        ]
         
+        # Dados da requisição
         payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333,
-            "raio_km": -10
+            "pontos": [
+                {"latitude": -23.5505, "longitude": -46.6333},
+                {"latitude": -50.0, "longitude": -50.0},
+                {"latitude": -21.7089, "longitude": -51.0731}
+            ]
         }
-        response = client.post("/fazendas/busca-raio", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
         
-        # Dados faltando
-        response = client.post("/fazendas/busca-raio", json={})
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        # Faz a requisição
+        response = client.post("/fazendas/busca-pontos", json=payload)
+        
+        # Verifica a resposta
+        assert response.status_code == HTTP_200_OK
+        data = _json(response)
+        assert len(data) == 3
+        assert data[0]["latitude"] == -23.5505
+        assert data[0]["longitude"] == -46.6333
+        assert [fazenda["id"] for fazenda in data[0]["items"]] == [1, 2]
+        assert data[1]["items"] == []
+        assert [fazenda["id"] for fazenda in data[2]["items"]] == [2]
+        assert "point_index" not in data[0]["items"][0]
+        
+        # Verifica que o repository foi chamado uma vez com todos os pontos
+        repo_mocks.get_by_points.assert_called_once_with(
+            ANY, [(-23.5505, -46.6333), (-50.0, -50.0), (-21.7089, -51.0731)]
+        )
     
-    def test_buscar_fazendas_por_raio_invalid_pagination(self, client):
+    def test_buscar_fazendas_por_pontos_invalid_body(self, client):
         """
-        Testa a validação de parâmetros de paginação inválidos na busca por raio.
+        Testa a validação do body da busca por vários pontos.
         
         Cenários testados:
-        - page = 0 (deve ser > 0)
-        - page_size = 101 (excede o máximo de 100)
-        - page_size = 0 (deve ser > 0)
+        - Lista vazia (mínimo de 1 ponto)
+        - Mais de 100 pontos (máximo permitido)
+        - Ponto com latitude inválida (> 90)
         
         Verifica:
         - Status HTTP 422 (Unprocessable Entity) para todos os casos
-        - Validação do FastAPI Query funcionando corretamente
-        
-        Este teste garante consistência nas validações de paginação entre
-        todos os endpoints que suportam paginação, mantendo o mesmo comportamento.
         """
-        payload = {
-            "latitude": -23.5505,
-            "longitude": -46.6333,
-            "raio_km": 50.0
-        }
+        ponto = {"latitude": -23.5505, "longitude": -46.6333}
         
-        # Page inválida (zero ou negativo)
-        response = client.post("/fazendas/busca-raio?page=0", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        # Lista vazia
+        response = client.post("/fazendas/busca-pontos", json={"pontos": []})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
         
-        # Page_size muito grande (maior que 100)
-        response = client.post("/fazendas/busca-raio?page_size=101", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        # Mais de 100 pontos
+        response = client.post("/fazendas/busca-pontos", json={"pontos": [ponto] * 101})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
         
-        # Page_size inválido (zero ou negativo)
-        response = client.post("/fazendas/busca-raio?page_size=0", json=payload)
-        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        # Latitude inválida
+        response = client.post("/fazendas/busca-pontos", json={"pontos": [{"latitude": 91.0, "longitude": -46.6333}]})
+        assert response.status_code == HTTP_422_UNPROCESSABLE_ENTITY
+
 
+class TestGetFazendasTile:
+    """
+    Classe de testes para o endpoint GET /fazendas/tiles/{z}/{x}/{y}.mvt.
+    
+    Este endpoint retorna as geometrias das fazendas de um tile como Mapbox Vector
+    Tile (binário gerado pelo PostGIS). Testa o conteúdo e os cabeçalhos da resposta,
+    o cache em memória e a validação do tile.
+    """
+    
+    def test_get_fazendas_tile_success(self, repo_mocks, client):
+        """
+        Testa a obtenção de um vector tile.
+        
+        Cenário: O repository gera um tile com conteúdo binário para 12/1517/2323.
+        
+        Verifica:
+        - Status HTTP 200 com o corpo binário devolvido sem alterações
+        - Content-Type application/vnd.mapbox-vector-tile e Cache-Control público
+        - Repository chamado com z, x, y e a camada "fazendas"
+        - Segunda requisição do mesmo tile servida do cache (repository chamado uma vez)
+        """
+        repo_mocks.get_tile.return_value = b"\x1a\x10\x0a\x08fazendas"
+        
+        response = client.get("/fazendas/tiles/12/1517/2323.mvt")
+        again = client.get("/fazendas/tiles/12/1517/2323.mvt")
+        
+        assert response.status_code == HTTP_200_OK
+        assert response.content == b"\x1a\x10\x0a\x08fazendas"
+        assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+        assert response.headers["cache-control"] == "public, max-age=3600"
+        assert again.content == response.content
+        
+        repo_mocks.get_tile.assert_called_once_with(ANY, 12, 1517, 2323, "fazendas")
+    
+    def test_get_fazendas_tile_invalid(self, repo_mocks, client):
+        """
+        Testa a validação do tile pedido.
+        
+        Cenários testados:
+        - Zoom abaixo do mínimo (tile grande demais) ou acima do máximo
+        - Coluna fora da grade do nível de zoom (x >= 2^z)
+        
+        Verifica:
+        - Status HTTP 422 para zoom inválido e 404 para tile fora da grade
+        - Repository nunca chamado
+        """
+        assert client.get("/fazendas/tiles/5/10/12.mvt").status_code == HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/fazendas/tiles/23/0/0.mvt").status_code == HTTP_422_UNPROCESSABLE_ENTITY
+        assert client.get("/fazendas/tiles/12/4096/0.mvt").status_code == HTTP_404_NOT_FOUND
+        
+        repo_mocks.get_tile.assert_not_called()
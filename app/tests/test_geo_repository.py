@@ -0,0 +1,481 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.database import PLANNER_SETTINGS
+from app.repositories.fazenda_repository import fazenda_repository
+from app.repositories.geo_repository_mixin import LARGE_RADIUS_SETTINGS
+from app.schemas.fazenda_schema import FazendaResponse
+
+
+def _mock_db(rows):
+    """
+    Cria uma sessão assíncrona mockada cujo execute() retorna as linhas informadas
+    (iteradas via .mappings()), registrando as queries executadas.
+    """
+    result = MagicMock()
+    result.mappings.return_value = iter(rows)
+    db = MagicMock()
+    db.execute = AsyncMock(return_value=result)
+    db.scalar = AsyncMock(return_value=0)
+    return db
+
+
+def _compiled_sql(db):
+    """
+    Retorna o SQL (dialeto PostgreSQL) da query passada ao primeiro db.execute().
+    """
+    stmt = db.execute.await_args[0][0]
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestGeoRepositoryPagination:
+    """
+    Classe de testes para a paginação das buscas geoespaciais (GeoRepositoryMixin._paginate).
+    
+    Verifica que, por padrão, nenhuma contagem é feita (has_next vem da linha excedente
+    de LIMIT page_size + 1), que com include_total o total é estimado pelo planner e
+    que, com exact_total, página e total exato são obtidos em uma única ida ao banco (CTE filtrada usada pela contagem e pela página), tanto na
+    paginação por offset quanto na paginação keyset (after_id).
+    """
+    
+    def test_get_by_point_without_total(self, sample_fazenda, sample_fazendas_list):
+        """
+        Testa que, sem include_total, a busca por ponto não faz nenhuma contagem.
+        
+        Cenário: page_size=2 e o banco retorna 3 linhas (a terceira é a excedente).
+        
+        Verifica:
+        - Apenas as 2 primeiras linhas são retornadas, com has_next=True
+        - Total None (não calculado)
+        - SQL sem count(*) e sem CTE, com LIMIT page_size + 1
+        """
+        rows = sample_fazendas_list + [{**sample_fazenda, "id": 3}]
+        db = _mock_db(rows)
+        
+        fazendas, total, has_next = asyncio.run(
+            fazenda_repository.get_by_point(db, -23.5505, -46.6333, page=1, page_size=2)
+        )
+        
+        assert fazendas == sample_fazendas_list
+        assert total is None
+        assert has_next is True
+        db.execute.assert_awaited_once()
+        db.scalar.assert_not_awaited()
+        
+        stmt = db.execute.await_args[0][0]
+        sql = _compiled_sql(db)
+        assert "count(*)" not in sql
+        assert "WITH" not in sql
+        assert "ORDER BY fazendas.id" in sql
+        assert stmt._limit == 3
+    
+    def test_get_by_point_estimated_total(self, sample_fazendas_list):
+        """
+        Testa que, com include_total sem exact_total, o total é estimado pelo planner.
+        
+        Cenário: A página retorna 2 fazendas e o EXPLAIN estima 42 linhas.
+        
+        Verifica:
+        - Total igual ao Plan Rows do EXPLAIN (sem count(*))
+        - Segunda execução é um EXPLAIN (FORMAT JSON) do select filtrado, com os valores
+          das coordenadas no SQL
+        """
+        page_result = MagicMock()
+        page_result.mappings.return_value = iter(sample_fazendas_list)
+        explain_result = MagicMock()
+        explain_result.scalar.return_value = '[{"Plan": {"Plan Rows": 42}}]'
+        db = MagicMock()
+        db.execute = AsyncMock(side_effect=[page_result, explain_result])
+        
+        fazendas, total, has_next = asyncio.run(
+            fazenda_repository.get_by_point(db, -23.5505, -46.6333, page=1, page_size=2, include_total=True)
+        )
+        
+        assert fazendas == sample_fazendas_list
+        assert total == 42
+        assert has_next is False
+        assert db.execute.await_count == 2
+        
+        page_sql = _compiled_sql(db)
+        assert "count(*)" not in page_sql
+        
+        explain_sql = str(db.execute.await_args_list[1][0][0])
+        assert explain_sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "ST_Point(-46.6333, -23.5505, 4326)" in explain_sql
+    
+    def test_get_by_point_single_round_trip(self, sample_fazendas_list):
+        """
+        Testa que a busca por ponto com total exato obtém página e total na mesma query.
+        
+        Cenário: A primeira página retorna 2 fazendas, cada linha com a coluna total = 5.
+        
+        Verifica:
+        - db.execute chamado uma única vez e db.scalar nunca (sem query count() separada)
+        - Total lido da coluna total da primeira linha
+        - Coluna total removida das linhas retornadas
+        - Coordenadas passadas como parâmetros (:lon, :lat) na execução
+        - SQL com CTE filtrada, count(*) em LEFT JOIN com a página, ORDER BY id, LIMIT e OFFSET
+        """
+        rows = [{**fazenda, "total": 5} for fazenda in sample_fazendas_list]
+        db = _mock_db(rows)
+        
+        fazendas, total, has_next = asyncio.run(
+            fazenda_repository.get_by_point(db, -23.5505, -46.6333, page=1, page_size=2, include_total=True, exact_total=True)
+        )
+        
+        assert total == 5
+        assert has_next is False
+        assert fazendas == sample_fazendas_list
+        db.execute.assert_awaited_once()
+        db.scalar.assert_not_awaited()
+        
+        # Coordenadas passadas como parâmetros na execução (select montado uma única vez)
+        assert db.execute.await_args[0][1] == {"lon": -46.6333, "lat": -23.5505}
+        
+        sql = _compiled_sql(db)
+        assert "WITH filtered AS" in sql
+        assert "count(*) AS total" in sql
+        assert "LEFT OUTER JOIN" in sql
+        assert "ORDER BY filtered.id" in sql
+        assert "LIMIT" in sql and "OFFSET" in sql
+    
+    def test_get_by_cod_imovel_single_round_trip(self, sample_fazendas_list):
+        """
+        Testa que a busca por cod_imovel obtém página e total exato na mesma query.
+        
+        Cenário: O código tem 2 fazendas; a página (page_size=10) retorna ambas com total = 2.
+        
+        Verifica:
+        - db.execute chamado uma única vez (sem query count() separada nem EXPLAIN)
+        - Total exato lido da coluna total e has_next pela linha excedente ausente
+        - SQL com CTE filtrada por cod_imovel e count(*) em LEFT JOIN com a página
+        """
+        rows = [{**fazenda, "total": 2} for fazenda in sample_fazendas_list]
+        db = _mock_db(rows)
+        
+        fazendas, total, has_next = asyncio.run(
+            fazenda_repository.get_by_cod_imovel(db, "SP-3500105-279714F410E746B0B440EFAD4B0933D4", page=1, page_size=10)
+        )
+        
+        assert total == 2
+        assert has_next is False
+        assert fazendas == sample_fazendas_list
+        db.execute.assert_awaited_once()
+        db.scalar.assert_not_awaited()
+        assert db.execute.await_args[0][1] == {"cod_imovel": "SP-3500105-279714F410E746B0B440EFAD4B0933D4"}
+        
+        sql = _compiled_sql(db)
+        assert "WITH filtered AS" in sql
+        assert "fazendas.cod_imovel = %(cod_imovel)s" in sql
+        assert "count(*) AS total" in sql
+        assert "LEFT OUTER JOIN" in sql
+    
+    def test_get_by_point_page_beyond_end(self, sample_fazenda):
+        """
+        Testa que uma página além do fim retorna o total sem consulta extra.
+        
+        Cenário: Existem 3 fazendas e é pedida a página 5. Pelo LEFT JOIN, o banco
+        devolve uma única linha com o total e as colunas da fazenda nulas.
+        
+        Verifica:
+        - Lista vazia e total 3 (o total continua correto)
+        - Nenhuma query count() adicional (db.scalar não chamado)
+        """
+        empty_row = {**{key: None for key in sample_fazenda}, "total": 3}
+        db = _mock_db([empty_row])
+        
+        fazendas, total, has_next = asyncio.run(
+            fazenda_repository.get_by_point(db, -23.5505, -46.6333, page=5, page_size=10, include_total=True, exact_total=True)
+        )
+        
+        assert fazendas == []
+        assert total == 3
+        assert has_next is False
+        db.execute.assert_awaited_once()
+        db.scalar.assert_not_awaited()
+    
+    def test_get_by_radius_keyset_single_round_trip(self, sample_fazendas_list):
+        """
+        Testa a paginação keyset (after_id) da busca por raio com total exato.
+        
+        Cenário: Busca a partir do cursor after_id=10, com 2 fazendas na página.
+        
+        Verifica:
+        - db.execute chamado uma única vez e db.scalar nunca
+        - SQL filtra pelo cursor (id > after_id) sem OFFSET
+        - Total calculado sobre a CTE inteira, antes do filtro do cursor
+        """
+        rows = [{**fazenda, "total": 7} for fazenda in sample_fazendas_list]
+        db = _mock_db(rows)
+        
+        fazendas, total, has_next = asyncio.run(
+            fazenda_repository.get_by_radius(db, -23.5505, -46.6333, 50, page=1, page_size=2, after_id=10, include_total=True, exact_total=True)
+        )
+        
+        assert total == 7
+        assert fazendas == sample_fazendas_list
+        db.execute.assert_awaited_once()
+        db.scalar.assert_not_awaited()
+        
+        sql = _compiled_sql(db)
+        assert "count(*) AS total" in sql
+        assert "filtered.id >" in sql
+        assert "OFFSET" not in sql
+
+
+
+class TestGeoRepositoryPontos:
+    """
+    Classe de testes para a busca por vários pontos (GeoRepositoryMixin.get_by_points).
+    
+    Verifica que todos os pontos são resolvidos em uma única query, com os pontos
+    passados como dois parâmetros array (o texto da query não depende da quantidade).
+    """
+    
+    def test_get_by_points_single_query(self, sample_fazenda):
+        """
+        Testa que a busca por vários pontos usa uma única query com unnest dos arrays.
+        
+        Cenário: Dois pontos; o banco retorna uma fazenda para o segundo ponto.
+        
+        Verifica:
+        - db.execute chamado uma única vez, com os arrays :lats e :lons
+        - Linhas retornadas como dicts com point_index
+        - SQL com unnest(...) WITH ORDINALITY, && e ST_Intersects, ordenado por ponto e id
+        """
+        db = _mock_db([{**sample_fazenda, "point_index": 2}])
+        
+        fazendas = asyncio.run(
+            fazenda_repository.get_by_points(db, [(-23.5505, -46.6333), (-21.7089, -51.0731)])
+        )
+        
+        assert fazendas == [{**sample_fazenda, "point_index": 2}]
+        db.execute.assert_awaited_once()
+        assert db.execute.await_args[0][1] == {
+            "lats": [-23.5505, -21.7089],
+            "lons": [-46.6333, -51.0731],
+        }
+        
+        sql = _compiled_sql(db)
+        assert "unnest(" in sql and "WITH ORDINALITY AS p(lat, lon, i)" in sql
+        assert "fazendas.geom && ST_Point(p.lon, p.lat" in sql
+        assert "ST_Intersects(fazendas.geom, ST_Point(p.lon, p.lat" in sql
+        assert "ORDER BY p.i, fazendas.id" in sql
+
+
+class TestGeoRepositoryRadius:
+    """
+    Classe de testes para o select da busca por raio (GeoRepositoryMixin._build_radius_statement).
+    
+    Verifica que as colunas indexadas são usadas sem cast: geom no filtro de bounding
+    box e geog no ST_DWithin. Um cast na coluna (ex.: geog::geometry) seria avaliado
+    linha a linha e impediria o uso do índice.
+    """
+    
+    def test_radius_statement_without_column_casts(self):
+        """
+        Testa o SQL da busca por raio.
+        
+        Verifica:
+        - Bounding box com geom && ST_MakeEnvelope (parâmetros calculados em Python)
+        - ST_DWithin direto na coluna geog, com apenas o ponto convertido para geography
+        - Nenhum cast das colunas geom/geog e nenhum text() com ST_Buffer/ST_Envelope
+        """
+        stmt = fazenda_repository._build_radius_statement("geom")
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        
+        assert "fazendas.geom && ST_MakeEnvelope(" in sql
+        assert "ST_DWithin(fazendas.geog, CAST(ST_Point(" in sql
+        assert "AS geography(POINT,4326))" in sql
+        assert "CAST(fazendas.geog" not in sql
+        assert "CAST(fazendas.geom" not in sql
+        assert "::" not in sql
+        assert "ST_Buffer" not in sql and "ST_Envelope(" not in sql
+    
+    def test_radius_envelope_cached(self):
+        """
+        Testa o cálculo e o cache do bounding box da busca por raio.
+        
+        Cenário: O mesmo (longitude, latitude, raio) é pedido duas vezes.
+        
+        Verifica:
+        - Retângulo contém o ponto central
+        - Segunda chamada servida do cache LRU (mesmo objeto, um hit a mais)
+        """
+        first = fazenda_repository._radius_envelope(-46.6333, -23.5505, 50_000.0)
+        hits = fazenda_repository._radius_envelope.cache_info().hits
+        second = fazenda_repository._radius_envelope(-46.6333, -23.5505, 50_000.0)
+        
+        xmin, ymin, xmax, ymax = first
+        assert xmin < -46.6333 < xmax
+        assert ymin < -23.5505 < ymax
+        assert second is first
+        assert fazenda_repository._radius_envelope.cache_info().hits == hits + 1
+
+
+class TestFazendaRepositoryProjection:
+    """
+    Classe de testes para a projeção das buscas em lista (FAZENDA_COLUMNS).
+    
+    As listas retornam apenas as colunas de FazendaResponse: as geometrias (geom/geog),
+    que podem ter vários KB por linha, nunca trafegam do banco para a API nessas buscas.
+    """
+    
+    def test_list_statements_do_not_select_geometry(self):
+        """
+        Testa que os selects das buscas em lista não projetam geom/geog.
+        
+        Verifica, para as buscas por ponto, por vários pontos, por raio e por ID:
+        - Nenhuma coluna geom/geog no SELECT (filtros no WHERE/JOIN continuam usando-as)
+        - Colunas projetadas iguais aos campos de FazendaResponse
+        """
+        statements = [
+            fazenda_repository._build_point_statement("geom"),
+            fazenda_repository._build_radius_statement("geom"),
+            fazenda_repository._get_by_id_statement,
+        ]
+        
+        for stmt in statements:
+            keys = list(stmt.selected_columns.keys())
+            assert "geom" not in keys and "geog" not in keys
+            assert keys == list(FazendaResponse.model_fields)
+        
+        points_keys = list(fazenda_repository._build_points_statement("geom").selected_columns.keys())
+        assert points_keys == ["point_index", *FazendaResponse.model_fields]
+    
+    def test_cod_imovel_and_ids_queries_do_not_touch_geometry(self):
+        """
+        Testa que as buscas por cod_imovel e por IDs não leem geometria.
+        
+        Verifica:
+        - SQL executado sem nenhuma referência a geom/geog (nem no SELECT, nem no filtro)
+        - Linhas retornadas como dicts (sem hidratar entidades ORM)
+        - Busca por IDs com o select em cache e os IDs passados na execução
+        """
+        db = _mock_db([])
+        asyncio.run(fazenda_repository.get_by_cod_imovel(db, "SP-3500105-279714F410E746B0B440EFAD4B0933D4"))
+        sql = _compiled_sql(db)
+        assert "geom" not in sql and "geog" not in sql
+        
+        rows = [{"id": 1}, {"id": 2}]
+        db = _mock_db(rows)
+        fazendas = asyncio.run(fazenda_repository.get_by_ids(db, [1, 2, 3]))
+        sql = _compiled_sql(db)
+        assert "geom" not in sql and "geog" not in sql
+        assert db.execute.await_args[0][1] == {"ids": [1, 2, 3]}
+        assert fazendas == rows and all(type(fazenda) is dict for fazenda in fazendas)
+        
+        # O select é montado uma única vez e reaproveitado nas chamadas seguintes
+        stmt = db.execute.await_args[0][0]
+        db = _mock_db([])
+        asyncio.run(fazenda_repository.get_by_ids(db, [4]))
+        assert db.execute.await_args[0][0] is stmt
+    
+    def test_get_by_radius_quantizes_inputs(self):
+        """
+        Testa o arredondamento das entradas da busca por raio.
+        
+        Cenário: Raio de 5.0000001 km e coordenadas com 7 casas decimais.
+        
+        Verifica:
+        - Raio arredondado para o múltiplo de 10 m mais próximo (5000 m, igual a 5 km)
+        - Raio mínimo de 10 m (um raio de 1 m não vira 0)
+        - Latitude/longitude arredondadas para 5 casas decimais
+        """
+        db = _mock_db([])
+        
+        asyncio.run(
+            fazenda_repository.get_by_radius(db, -23.5505123, -46.6333456, 5.0000001)
+        )
+        
+        params = db.execute.await_args[0][1]
+        assert params["radius"] == 5000
+        assert params["lat"] == -23.55051
+        assert params["lon"] == -46.63335
+        
+        db = _mock_db([])
+        asyncio.run(fazenda_repository.get_by_radius(db, -23.5505, -46.6333, 0.001))
+        assert db.execute.await_args[0][1]["radius"] == 10
+    
+    def test_get_by_radius_large_radius_disables_seqscan(self):
+        """
+        Testa a desativação de seq scans nas buscas por raio grande.
+        
+        Cenário: Uma busca com raio de 50 km e outra com raio de 150 km.
+        
+        Verifica:
+        - Raio até 100 km: uma única query (a busca), sem ajustes de transação
+        - Raio acima de 100 km: enable_seqscan = off antes da busca, na mesma sessão
+        """
+        db = _mock_db([])
+        asyncio.run(fazenda_repository.get_by_radius(db, -23.5505, -46.6333, 50))
+        assert db.execute.await_count == 1
+        assert "enable_seqscan" not in _compiled_sql(db)
+        
+        db = _mock_db([])
+        asyncio.run(fazenda_repository.get_by_radius(db, -23.5505, -46.6333, 150))
+        assert db.execute.await_count == 2
+        assert db.execute.await_args_list[0][0][0] is LARGE_RADIUS_SETTINGS
+        assert "'enable_seqscan', 'off', true" in str(LARGE_RADIUS_SETTINGS)
+        assert "ST_DWithin" in _compiled_sql(db)
+    
+    def test_large_radius_overrides_generic_plan(self):
+        """
+        Testa a interação entre o plano genérico das conexões e a dica de raio grande.
+        
+        Cenário: As conexões usam plan_cache_mode=force_generic_plan (PLANNER_SETTINGS),
+        e um plano genérico em cache não é replanejado quando enable_seqscan muda.
+        
+        Verifica:
+        - A busca por raio grande força um plano customizado na transação (set_config
+          local), no mesmo comando e antes de desligar os seq scans
+        """
+        assert PLANNER_SETTINGS["plan_cache_mode"] == "force_generic_plan"
+        
+        sql = str(LARGE_RADIUS_SETTINGS)
+        assert "set_config('plan_cache_mode', 'force_custom_plan', true)" in sql
+        assert sql.index("plan_cache_mode") < sql.index("enable_seqscan")
+
+
+class TestGeoRepositoryTile:
+    """
+    Classe de testes para o vector tile (GeoRepositoryMixin.get_tile).
+    
+    Verifica que o tile é gerado inteiro no PostGIS (ST_AsMVTGeom + ST_AsMVT), com o
+    filtro de bounding box no índice de geom e os parâmetros z/x/y na execução.
+    """
+    
+    def test_get_tile(self):
+        """
+        Testa a geração de um tile.
+        
+        Cenário: O banco retorna o tile binário (memoryview, como o bytea do asyncpg) e,
+        numa segunda chamada, NULL (nenhuma fazenda no tile).
+        
+        Verifica:
+        - Tile retornado como bytes; NULL vira um tile vazio (b"")
+        - Parâmetros z, x, y passados na execução (select montado uma única vez)
+        - SQL com ST_TileEnvelope, ST_AsMVTGeom sobre geom em 3857, ST_AsMVT da subquery
+          e filtro geom && envelope convertido para 4326 (sem transformar a coluna no filtro)
+        """
+        result = MagicMock()
+        result.scalar.return_value = memoryview(b"\x1a\x02mvt")
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=result)
+        
+        tile = asyncio.run(fazenda_repository.get_tile(db, 12, 1517, 2323, "fazendas"))
+        
+        assert tile == b"\x1a\x02mvt"
+        assert db.execute.await_args[0][1] == {"z": 12, "x": 1517, "y": 2323}
+        
+        sql = _compiled_sql(db)
+        assert "ST_AsMVT(feicoes" in sql
+        assert "ST_AsMVTGeom(ST_Transform(fazendas.geom" in sql
+        assert "ST_TileEnvelope(%(z)s, %(x)s, %(y)s)" in sql
+        assert "fazendas.geom && ST_Transform(ST_TileEnvelope(" in sql
+        assert "geog" not in sql
+        
+        result.scalar.return_value = None
+        assert asyncio.run(fazenda_repository.get_tile(db, 12, 0, 0, "fazendas")) == b""
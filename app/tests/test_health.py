@@ -18,6 +18,7 @@ class TestHealthEndpoint:
         - Campo "status" com valor "healthy"
         - Campo "message" com a mensagem padrão
         - Presença de ambos os campos obrigatórios
+        - Content-Type application/json (corpo pré-serializado)
         
         Este é um teste básico que garante que o endpoint mais simples da API
         está funcionando corretamente.
@@ -30,6 +31,7 @@ class TestHealthEndpoint:
         assert data["message"] == "API está funcionando corretamente"
         assert "status" in data
         assert "message" in data
+        assert response.headers["content-type"] == "application/json"
     
     def test_health_check_response_structure(self, client):
         """
@@ -0,0 +1,14 @@
+-- Parâmetros do planner para as buscas espaciais da API, persistidos no banco
+-- (mesmos valores de PLANNER_SETTINGS em app/infrastructure/database.py).
+-- Valem para toda nova sessão, inclusive as abertas pelo PgBouncer em modo transaction,
+-- que não repassa os server_settings enviados pelo asyncpg na conexão.
+-- plan_cache_mode fica de fora: com PgBouncer cada prepared statement é usado uma única
+-- vez, e um plano genérico forçado só pioraria essas execuções
+DO $$
+BEGIN
+    EXECUTE format('ALTER DATABASE %I SET random_page_cost = 1.1', current_database());
+    EXECUTE format('ALTER DATABASE %I SET effective_cache_size = %L', current_database(), '4GB');
+    EXECUTE format('ALTER DATABASE %I SET work_mem = %L', current_database(), '32MB');
+    EXECUTE format('ALTER DATABASE %I SET jit = off', current_database());
+END
+$$;
@@ -4,31 +4,42 @@ Script para baixar os dados do Google Drive (ZIP) e descompactar.
 """
 
 import sys
+import tempfile
 import zipfile
 from pathlib import Path
 import gdown
 
 def download_data(path: str):
-    """Baixa o arquivo ZIP do Google Drive e descompacta."""
+    """
+    Baixa o arquivo ZIP do Google Drive e descompacta.
+    
+    O ZIP é gravado em um arquivo temporário anônimo no próprio diretório de dados (sem
+    fazendas_sp.zip para apagar depois, nem sobra em caso de erro) e é extraído arquivo
+    por arquivo, com progresso. O download continua com o gdown, que trata a página de
+    confirmação do Google Drive para arquivos grandes.
+    """
     file_id = "15ghpnwzdDhFqelouqvQwXlbzovtPhlFe"
-    zip_file = Path(path) / "fazendas_sp.zip"
+    Path(path).mkdir(parents=True, exist_ok=True)
     
     print("📥 Baixando dados...")
     try:
-        gdown.download(f"https://drive.google.com/uc?id={file_id}", str(zip_file), quiet=False)
-        
-        if not zip_file.exists() or zip_file.stat().st_size == 0:
-            print("❌ Erro ao baixar arquivo")
-            return False
+        with tempfile.TemporaryFile(dir=path) as zip_file:
+            gdown.download(f"https://drive.google.com/uc?id={file_id}", zip_file, quiet=False)
+            
+            if zip_file.tell() == 0:
+                print("❌ Erro ao baixar arquivo")
+                return False
+            
+            print("📦 Descompactando...")
+            zip_file.seek(0)
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                members = zip_ref.infolist()
+                for i, member in enumerate(members, start=1):
+                    zip_ref.extract(member, path)
+                    print(f"   {i}/{len(members)} {member.filename}")
         
-        print("📦 Descompactando...")
-        with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-            zip_ref.extractall(path)
-        
-        zip_file.unlink()
         print("✅ Download e extração concluídos!")
         return True
     except Exception as e:
         print(f"❌ Erro: {e}")
         return False
-
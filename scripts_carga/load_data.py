@@ -11,98 +11,151 @@ if __name__ == "__main__":
     # Configura o método de start para evitar problemas no Windows
     multiprocessing.set_start_method('spawn', force=True)
 
+import io
 import logging
 import os
-import threading
 import time
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
-import fiona
 import geopandas as gpd
-from shapely.geometry import Polygon, MultiPolygon
+import numpy as np
+import pandas as pd
+import pyogrio
+import shapely
+from pyproj import CRS, Transformer
 from sqlalchemy import create_engine, text
-from geoalchemy2 import Geometry
 from tqdm_loggable.auto import tqdm
 
 # Configura logging para INFO (necessário para tqdm-loggable)
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
+# Memória para ordenação na criação de índices e no CLUSTER (maintenance_work_mem)
+MAINTENANCE_WORK_MEM = "1GB"
+
+# Processos que leem e normalizam os lotes em paralelo, e lotes em andamento por processo
+# (a janela limita a memória a LOAD_WORKERS * BATCH_WINDOW_PER_WORKER lotes prontos)
+LOAD_WORKERS = os.cpu_count() or 1
+BATCH_WINDOW_PER_WORKER = 2
+
+# Estado de cada processo de conversão (preenchido por init_worker)
+_worker_state = {}
+
 
 # ---------------------------------------------------------------------
 # Geometria
 # ---------------------------------------------------------------------
 
-def normalize_polygon_type(geom):
+def normalize_geometries(geoms):
     """
-    Mantém Polygon como Polygon e MultiPolygon como MultiPolygon.
+    Mantém Polygon como Polygon e MultiPolygon como MultiPolygon, corrigindo as inválidas.
+    Opera sobre o lote inteiro de uma vez (Shapely 2: laços em C do GEOS sobre o array
+    NumPy, sem chamada Python por geometria); só as inválidas passam por make_valid.
     """
-    if geom is None:
-        return None
-
-    if isinstance(geom, (Polygon, MultiPolygon)):
-        return geom
-
-    return geom
+    values = geoms.to_numpy()
+    invalid = ~shapely.is_valid(values) & ~shapely.is_missing(values)
+    if invalid.any():
+        values[invalid] = shapely.make_valid(values[invalid])
+    return gpd.GeoSeries(values, index=geoms.index, crs=geoms.crs)
 
 
 # ---------------------------------------------------------------------
 # GeoDataFrame
 # ---------------------------------------------------------------------
 
-def convert_date_format(date_str):
+def convert_date_column(values):
     """
-    Converte data do formato DD/MM/YYYY para YYYY-MM-DD.
-    Retorna None se a data for inválida ou vazia.
+    Converte uma coluna de datas do formato DD/MM/YYYY (ou YYYY-MM-DD) para datetime64.
+    Converte a coluna inteira de uma vez (pandas), sem strptime por linha, e mantém o
+    resultado como datetime64 (a coluna DATE do PostgreSQL aceita), sem strftime por linha.
+    DD/MM/YYYY tem posições fixas: dia, mês e ano são fatiados da coluna e remontados
+    como YYYY-MM-DD, e a coluna toda passa por um único parse ISO 8601 (parser em C do
+    pandas), em vez de um strptime de '%d/%m/%Y' por valor seguido de um segundo parse.
+    Datas inválidas ou vazias viram NaT (inseridas como NULL no banco).
     """
-    # Verifica se é nulo ou vazio
-    if date_str is None:
-        return None
+    # Colunas do tipo data do shapefile já chegam como datetime64
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
     
-    # Converte para string e remove espaços
-    date_str = str(date_str).strip()
+    # Converte para string e remove espaços (nulos continuam nulos)
+    texto = values.astype("string").str.strip()
     
-    if date_str == '' or date_str.lower() in ['nan', 'none', 'null']:
-        return None
+    # DD/MM/YYYY: 10 caracteres com "/" nas posições 2 e 5
+    formato_br = (
+        (texto.str.len() == 10)
+        & (texto.str.slice(2, 3) == "/")
+        & (texto.str.slice(5, 6) == "/")
+    ).fillna(False)
     
-    try:
-        # Tenta converter DD/MM/YYYY para YYYY-MM-DD
-        date_obj = datetime.strptime(date_str, '%d/%m/%Y')
-        return date_obj.strftime('%Y-%m-%d')
-    except (ValueError, TypeError):
-        # Se falhar, tenta outros formatos comuns
-        try:
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            return date_obj.strftime('%Y-%m-%d')
-        except (ValueError, TypeError):
-            # Se ainda falhar, retorna None (será inserido como NULL no banco)
-            return None
+    # Remonta DD/MM/YYYY como YYYY-MM-DD (o que já estiver em YYYY-MM-DD fica como está)
+    iso = (
+        texto.str.slice(6, 10) + "-" + texto.str.slice(3, 5) + "-" + texto.str.slice(0, 2)
+    )
+    texto = iso.where(formato_br, texto)
+    
+    return pd.to_datetime(texto, format='%Y-%m-%d', errors='coerce')
 
 
-def normalize_gdf(features, crs):
+@lru_cache(maxsize=16)
+def get_transformer(src_crs, dst_crs="EPSG:4326"):
     """
-    Converte features (do fiona) em GeoDataFrame usando GeoPandas.
-    GeoPandas não tem leitura nativa em chunks para Shapefiles,
-    então usamos fiona para ler iterativamente e GeoPandas para processar.
+    Retorna o Transformer de src_crs para dst_crs (always_xy: longitude, latitude),
+    criado uma única vez por par de CRS no processo e reutilizado nas chamadas seguintes
+    (ex.: vários shapefiles carregados pelo mesmo processo).
     """
-    # GeoPandas converte features do fiona em GeoDataFrame
-    gdf = gpd.GeoDataFrame.from_features(features, crs=crs)
+    return Transformer.from_crs(src_crs, dst_crs, always_xy=True)
 
-    # Renomeia a coluna geometry para geom
-    if "geometry" in gdf.columns:
-        gdf = gdf.rename_geometry("geom")
 
-    # CRS padrão se ausente
-    if gdf.crs is None:
-        gdf.set_crs(epsg=4674, inplace=True)
+def resolve_source_crs(src_crs):
+    """
+    Resolve o CRS do shapefile uma única vez por arquivo (e não a cada lote).
+    Retorna o CRS (pyproj) e o Transformer para WGS84 (EPSG:4326), ou None se o
+    arquivo já estiver em WGS84. O Transformer vem de get_transformer (em cache) e é
+    reutilizado em todos os lotes (o to_crs do GeoPandas monta um novo a cada chamada).
+    Usa SIRGAS 2000 (EPSG:4674) se o shapefile não informar o CRS.
+    """
+    crs = CRS.from_user_input(src_crs) if src_crs else CRS.from_epsg(4674)
+    if crs.to_epsg() == 4326:
+        return crs, None
+    return crs, get_transformer(crs)
 
-    # Converte para WGS84 apenas se necessário (otimização - usa to_epsg() que é mais rápido)
-    if gdf.crs.to_epsg() != 4326:
-        gdf = gdf.to_crs("EPSG:4326")
 
-    # Normaliza geometria (mantém para garantir consistência)
-    gdf["geom"] = gdf["geom"].apply(normalize_polygon_type)
+def transform_geometries(geoms, transformer):
+    """
+    Reprojeta o lote inteiro com um Transformer já criado: o shapely.transform passa
+    todas as coordenadas do lote em um único array e o pyproj as converte de uma vez.
+    """
+    def reproject(coords):
+        x, y = transformer.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack((x, y))
+    
+    values = shapely.transform(geoms.to_numpy(), reproject)
+    return gpd.GeoSeries(values, index=geoms.index, crs="EPSG:4326")
 
+
+def normalize_gdf(gdf, crs, transformer=None):
+    """
+    Normaliza um lote lido pelo pyogrio (read_dataframe com skip/max_features).
+    O CRS e o Transformer já vêm resolvidos (resolve_source_crs), sem reinterpretá-los
+    nem recriá-los a cada lote.
+    """
+    # Atribui o CRS de origem (o shapefile pode não informar nenhum)
+    gdf = gdf.set_crs(crs, allow_override=True)
+    
+    # Renomeia a coluna geometry para geom
+    if "geometry" in gdf.columns:
+        gdf = gdf.rename_geometry("geom")
+    
+    # Converte para WGS84 apenas se necessário (decidido uma vez por arquivo)
+    if transformer is not None:
+        gdf = gdf.set_geometry(transform_geometries(gdf["geom"], transformer))
+    
+    # Normaliza geometria (corrige as inválidas em uma única operação vetorizada)
+    gdf["geom"] = normalize_geometries(gdf["geom"])
+    
     return gdf
 
 
@@ -110,47 +163,71 @@ def normalize_gdf(features, crs):
 # PostGIS
 # ---------------------------------------------------------------------
 
-def map_column_name_to_postgres_type(column_name):
+# Tipo PostgreSQL de cada coluna do shapefile, pelo nome (em minúsculas)
+COLUMN_TYPE_MAPPING = {
+    'cod_tema': 'TEXT',
+    'nom_tema': 'TEXT',
+    'cod_imovel': 'TEXT',
+    'mod_fiscal': 'FLOAT8',
+    'num_area': 'FLOAT8',
+    'ind_status': 'TEXT',
+    'ind_tipo': 'TEXT',
+    'des_condic': 'TEXT',
+    'municipio': 'TEXT',
+    'cod_estado': 'TEXT',
+    'dat_criaca': 'DATE',
+    'dat_atuali': 'DATE',
+}
+
+# Tipo PostgreSQL pelo dtype (NumPy) do pyogrio, para colunas fora do mapeamento por nome.
+# Datas não entram aqui: a unidade do datetime64 varia (Date do shapefile vem como
+# datetime64[D], datetime64[ms] ou [ns]), então são reconhecidas por
+# is_datetime64_any_dtype em map_column_name_to_postgres_type
+DTYPE_TYPE_MAPPING = {
+    'int32': 'INTEGER',
+    'int64': 'BIGINT',
+    'float32': 'FLOAT4',
+    'float64': 'FLOAT8',
+}
+
+# Colunas de data convertidas antes do COPY (derivadas uma vez do mapeamento)
+DATE_COLUMNS = tuple(
+    column for column, pg_type in COLUMN_TYPE_MAPPING.items() if pg_type == 'DATE'
+)
+
+
+@lru_cache(maxsize=None)
+def map_column_name_to_postgres_type(column_name, dtype=None):
     """
     Mapeia o nome da coluna para o tipo PostgreSQL.
-    Retorna o tipo baseado no nome da coluna.
-    """
-    # Mapeamento por nome da coluna
-    column_type_mapping = {
-        'cod_tema': 'TEXT',
-        'nom_tema': 'TEXT',
-        'cod_imovel': 'TEXT',
-        'mod_fiscal': 'FLOAT8',
-        'num_area': 'FLOAT8',
-        'ind_status': 'TEXT',
-        'ind_tipo': 'TEXT',
-        'des_condic': 'TEXT',
-        'municipio': 'TEXT',
-        'cod_estado': 'TEXT',
-        'dat_criaca': 'DATE',
-        'dat_atuali': 'DATE',
-    }
-    
-    # Retorna o tipo mapeado ou TEXT como padrão
-    return column_type_mapping.get(column_name.lower(), 'TEXT')
-
-
-def extract_schema_from_fiona_src(src):
-    """
-    Extrai o schema (campos e tipos) diretamente do objeto src do fiona.
+    Retorna o tipo baseado no nome da coluna; para colunas fora do mapeamento usa o
+    dtype informado pelo pyogrio (read_info), ou TEXT.
+    """
+    pg_type = COLUMN_TYPE_MAPPING.get(column_name.lower())
+    if pg_type is not None:
+        return pg_type
+    
+    # Colunas não mapeadas: DATE para qualquer datetime64, senão o tipo do dtype do
+    # shapefile (NumPy) ou TEXT como padrão
+    if dtype is not None and pd.api.types.is_datetime64_any_dtype(np.dtype(dtype)):
+        return 'DATE'
+    return DTYPE_TYPE_MAPPING.get(str(dtype), 'TEXT')
+
+
+def extract_schema_from_info(info):
+    """
+    Extrai o schema (campos e tipos) dos metadados do pyogrio (pyogrio.read_info).
     Retorna um dicionário simples com nome da coluna: tipo PostgreSQL.
-    Mapeia pelo nome da coluna.
+    Mapeia pelo nome da coluna e, para nomes desconhecidos, pelo dtype do campo.
     """
     schema = {}
     
-    # Pega o schema do shapefile
-    properties = src.schema.get('properties', {})
-    
-    for field_name, field_type in properties.items():
+    # Pega os campos do shapefile (com os dtypes lidos na mesma chamada ao GDAL)
+    for field_name, dtype in zip(info["fields"], info["dtypes"]):
         # Ignora campos de geometria (já são tratados separadamente)
         if field_name.lower() not in ['geometry', 'geom']:
-            # Mapeia pelo nome da coluna
-            pg_type = map_column_name_to_postgres_type(field_name)
+            # Mapeia pelo nome da coluna (ou pelo dtype, se o nome não for conhecido)
+            pg_type = map_column_name_to_postgres_type(field_name, dtype)
             schema[field_name] = pg_type
     
     return schema
@@ -160,20 +237,19 @@ def extract_schema_from_shapefile(shp_file):
     """
     Extrai o schema (campos e tipos) do shapefile.
     Retorna um dicionário com os campos e seus tipos PostgreSQL.
-    DEPRECATED: Use extract_schema_from_fiona_src() em vez disso para evitar abrir o arquivo duas vezes.
+    DEPRECATED: Use extract_schema_from_info() com o resultado de pyogrio.read_info(), já lido pela carga.
     """
-    schema = {}
-    
-    with fiona.open(shp_file) as src:
-        schema = extract_schema_from_fiona_src(src)
-    
-    return schema
+    return extract_schema_from_info(pyogrio.read_info(shp_file))
 
 
 def create_table_from_schema(engine, schema):
     """
     Cria a tabela fazendas com base no schema (dicionário nome: tipo).
     Inclui a coluna id como SERIAL PRIMARY KEY e a coluna geom.
+    
+    A tabela nasce UNLOGGED e sem autovacuum: a carga, o UPDATE de geog, o CLUSTER e os
+    índices não geram WAL nem disputam com o autovacuum. Ao final da carga,
+    finalize_table() a torna LOGGED (durável) e reativa o autovacuum.
     """
     with engine.begin() as conn:
         # Monta a lista de colunas do schema
@@ -185,213 +261,339 @@ def create_table_from_schema(engine, schema):
         
         # Cria a tabela com todas as colunas de uma vez
         create_table_sql = f"""
-            CREATE TABLE fazendas (
+            CREATE UNLOGGED TABLE fazendas (
                 {', '.join(columns_sql)}
-            )
+            ) WITH (autovacuum_enabled = false)
         """
         conn.execute(text(create_table_sql))
         
         print(f"✅ Tabela 'fazendas' criada com {len(schema)} colunas do shapefile + id + geom")
 
 
-def create_table(engine, gdf):
+def serialize_batch(gdf):
     """
-    Cria a tabela fazendas com coluna GEOMETRY genérica.
+    Serializa um lote para o COPY: retorna as colunas e o CSV (texto) com os dados.
+    Converte as colunas de data do formato DD/MM/YYYY para datetime64 antes de serializar.
+    A geometria vai como EWKB hexadecimal (com SRID 4326), gerado para o lote inteiro
+    de uma vez (shapely.to_wkb, um laço em C); valores nulos (NaN/NaT/None) viram campo
+    vazio, lido como NULL pelo COPY.
     """
-    gdf.head(0).to_postgis(
-        name="fazendas",
-        con=engine,
-        if_exists="fail",
-        index=False,
-        dtype={"geom": Geometry("GEOMETRY", srid=4326)},
-    )
+    # Converte colunas de data para o formato aceito pelo PostgreSQL
+    for col in DATE_COLUMNS:
+        if col in gdf.columns:
+            gdf[col] = convert_date_column(gdf[col])
+    
+    # Atributos + geometria em EWKB hex (o PostGIS converte o texto para geometry no COPY)
+    df = pd.DataFrame(gdf.drop(columns="geom"))
+    geoms = shapely.set_srid(gdf["geom"].to_numpy(), 4326)
+    df["geom"] = shapely.to_wkb(geoms, hex=True, include_srid=True)
+    
+    return list(df.columns), df.to_csv(index=False, header=False)
 
-    with engine.begin() as conn:
+
+def copy_batch(engine, columns, data):
+    """
+    Insere um lote já serializado (serialize_batch) com COPY FROM STDIN, em vez dos
+    INSERTs parametrizados do to_postgis/to_sql.
+    """
+    buffer = io.StringIO(data)
+    
+    # Conexão psycopg2 direta (o COPY não passa pela camada de execução do SQLAlchemy)
+    connection = engine.raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY fazendas ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def insert_batch(engine, gdf):
+    """
+    Insere um lote de dados no banco (serialize_batch + copy_batch).
+    """
+    copy_batch(engine, *serialize_batch(gdf))
+
+
+def create_indexes(engine, concurrently: bool = False):
+    """
+    Cria os índices de busca da tabela fazendas e atualiza as estatísticas.
+    Idempotente (IF NOT EXISTS): pode ser executado em um banco já carregado
+    (python load_data.py --indexes) sem recarregar os dados.
+    
+    Com concurrently=True usa CREATE/DROP INDEX CONCURRENTLY (fora de transação), sem
+    bloquear as leituras da API em um banco em uso; na carga inicial não é necessário.
+    Remove o índice GIST antigo em geom (idx_fazendas_geom, de versões anteriores da
+    carga) depois que o SP-GiST existe, para que os bancos já carregados migrem também.
+    
+    Escolha dos índices (PostgreSQL >= 11, PostGIS >= 3.2):
+    - geom: SP-GiST (menor e mais rápido que GIST para polígonos sobrepostos, como os
+      limites de imóveis rurais) + BRIN (varreduras amplas, tabela ordenada por geohash)
+    - geog: GIST (ST_DWithin em metros)
+    - cod_imovel: btree em (cod_imovel, id) (igualdade + ordem da paginação keyset, sem
+      sort); substitui o btree só em cod_imovel (idx_fazendas_cod_imovel), removido
+    
+    Não há índice em dat_criaca/dat_atuali: nenhuma busca filtra ou ordena por data (a
+    paginação keyset usa o id, já indexado pela PK), e um BRIN nessas colunas seria pouco
+    seletivo, pois a tabela é ordenada por geohash na carga, e não por data.
+    
+    Não há índices parciais por cod_estado (a carga é de um único estado e nenhuma busca
+    filtra por estado) nem colunas INCLUDE para index-only scan: a resposta usa 13
+    colunas, e copiá-las para o índice quase duplicaria a parte não espacial da tabela.
+    
+    Também não há coluna de célula (S2/Hilbert) do centroide: um prefiltro pela célula do
+    centroide descartaria polígonos que cruzam o raio com o centroide fora dele, e a
+    ordenação por geohash já dá ao BRIN e ao SP-GiST de geom a localidade espacial.
+    """
+    # CONCURRENTLY não pode ser executado dentro de uma transação: usa autocommit
+    if concurrently:
+        connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+    else:
+        connection = engine.begin()
+    modo = "CONCURRENTLY " if concurrently else ""
+    
+    with connection as conn:
+        # Memória para ordenar as entradas dos índices (sessão/transação só desta criação)
+        conn.execute(text(f"SET maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'"))
+        
+        # Índice em (cod_imovel, id) (para buscas por código do imóvel, já na ordem da paginação)
         conn.execute(
-            text("ALTER TABLE fazendas ADD COLUMN id SERIAL PRIMARY KEY")
+            text(
+                f"CREATE INDEX {modo}IF NOT EXISTS "
+                "idx_fazendas_cod_imovel_id "
+                "ON fazendas (cod_imovel, id)"
+            )
         )
+        print("   ✅ Índice idx_fazendas_cod_imovel_id criado (cod_imovel, id)")
+        
+        # Remove o índice antigo só em cod_imovel, coberto pelo índice composto acima
+        conn.execute(text(f"DROP INDEX {modo}IF EXISTS idx_fazendas_cod_imovel"))
+        print("   ✅ Índice antigo idx_fazendas_cod_imovel removido (se existia)")
+        
+        # Índice em geometry (para buscas ponto-em-polígono)
+        # SP-GiST é mais rápido e menor que GIST para polígonos sobrepostos (requer PostGIS >= 3)
+        conn.execute(
+            text(
+                f"CREATE INDEX {modo}IF NOT EXISTS "
+                "idx_fazendas_geom_spgist "
+                "ON fazendas USING SPGIST (geom)"
+            )
+        )
+        print("   ✅ Índice idx_fazendas_geom_spgist criado (geometry, SP-GiST)")
+        
+        # Remove o índice GIST antigo em geom, substituído pelo SP-GiST acima
+        conn.execute(text(f"DROP INDEX {modo}IF EXISTS idx_fazendas_geom"))
+        print("   ✅ Índice GIST antigo idx_fazendas_geom removido (se existia)")
+        
+        # Índice BRIN em geometry (poucos KB; útil para varreduras amplas graças à ordenação por geohash)
+        conn.execute(
+            text(
+                f"CREATE INDEX {modo}IF NOT EXISTS "
+                "idx_fazendas_geom_brin "
+                "ON fazendas USING BRIN (geom) WITH (pages_per_range = 64)"
+            )
+        )
+        print("   ✅ Índice idx_fazendas_geom_brin criado (geometry, BRIN)")
+        
+        # Índice em geography (otimizado para ST_DWithin e consultas por distância Em Metros)
+        conn.execute(
+            text(
+                f"CREATE INDEX {modo}IF NOT EXISTS "
+                "idx_fazendas_geog "
+                "ON fazendas USING GIST ((geog))"
+            )
+        )
+        print("   ✅ Índice idx_fazendas_geog criado (geography)")
+        
+        # Atualiza as estatísticas para o planner estimar a seletividade dos filtros espaciais
+        conn.execute(text("ANALYZE fazendas"))
+        print("   ✅ Estatísticas atualizadas (ANALYZE fazendas)")
 
 
-def insert_batch(engine, gdf):
+def finalize_table(engine):
     """
-    Insere um lote de dados no banco.
-    Converte as colunas de data do formato DD/MM/YYYY para YYYY-MM-DD antes de inserir.
+    Torna a tabela fazendas durável ao final da carga: SET LOGGED (grava a tabela e os
+    índices no WAL uma única vez, já prontos) e reativa o autovacuum, desligado durante
+    a carga (create_table_from_schema). As estatísticas já foram atualizadas pelo
+    ANALYZE de create_indexes.
     """
-    # Converte colunas de data para o formato aceito pelo PostgreSQL
-    date_columns = ['dat_criaca', 'dat_atuali']
-    for col in date_columns:
-        if col in gdf.columns:
-            gdf[col] = gdf[col].apply(convert_date_format)
-    
-    gdf.to_postgis(
-        name="fazendas",
-        con=engine,
-        if_exists="append",
-        index=False,
-        chunksize=None,  # Insere tudo de uma vez (mais rápido para lotes grandes)
-    )
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE fazendas SET LOGGED"))
+        conn.execute(text("ALTER TABLE fazendas RESET (autovacuum_enabled)"))
+        print("   ✅ Tabela fazendas LOGGED (durável) e autovacuum reativado")
 
 
 # ---------------------------------------------------------------------
 # Processo principal
 # ---------------------------------------------------------------------
 
-def load_data(path: str, name_file: str):
-    # Banco de dados
+def prefetch_shapefile(shp_file):
+    """
+    Pede ao kernel para trazer os arquivos do shapefile (.shp, .shx, .dbf) para o page
+    cache em segundo plano (posix_fadvise WILLNEED), antes da leitura pelos processos de
+    conversão: a leitura do disco se sobrepõe ao início da carga e cada página lida pelo
+    GDAL já tende a estar em memória. Disponível apenas em Linux/Unix; nos demais
+    sistemas não faz nada.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    
+    for suffix in (".shp", ".shx", ".dbf"):
+        file_path = Path(shp_file).with_suffix(suffix)
+        if not file_path.exists():
+            continue
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
+def init_worker(shp_file, src_crs):
+    """
+    Inicializa um processo de conversão (ProcessPoolExecutor): resolve o CRS e cria o
+    Transformer uma única vez por processo, reutilizados em todos os lotes dele.
+    """
+    _worker_state["shp_file"] = shp_file
+    _worker_state["crs"], _worker_state["transformer"] = resolve_source_crs(src_crs)
+
+
+def convert_batch(start, chunk_size):
+    """
+    Lê, normaliza e serializa (EWKB + CSV) uma página do shapefile em um processo de
+    conversão. Cada processo abre o arquivo por conta própria (pyogrio com
+    skip/max_features), então só o texto pronto para o COPY volta para o processo
+    principal. Retorna a quantidade de registros, as colunas e o CSV.
+    """
+    gdf = pyogrio.read_dataframe(
+        _worker_state["shp_file"], skip_features=start, max_features=chunk_size
+    )
+    gdf = normalize_gdf(gdf, _worker_state["crs"], _worker_state["transformer"])
+    return (len(gdf), *serialize_batch(gdf))
+
+
+def get_engine():
+    """
+    Cria o engine (síncrono) do banco de dados a partir das variáveis de ambiente.
+    """
     db_user = os.getenv("POSTGRES_USER", "meuat_user")
     db_password = os.getenv("POSTGRES_PASSWORD", "meuat_password")
     db_name = os.getenv("POSTGRES_DB", "meuat_geo_db")
     db_host = os.getenv("POSTGRES_HOST", "db")
     db_port = os.getenv("POSTGRES_PORT", "5432")
-
+    
     conn_str = (
         f"postgresql://{db_user}:{db_password}"
         f"@{db_host}:{db_port}/{db_name}"
     )
+    return create_engine(conn_str)
 
-    shp_file = Path(path) / name_file
 
+def load_data(path: str, name_file: str):
+    shp_file = Path(path) / name_file
+    
     if not shp_file.exists():
         print(f"❌ Shapefile não encontrado: {shp_file}")
         return False
-
-    engine = create_engine(conn_str)
-
+    
+    # Banco de dados
+    engine = get_engine()
+    
     # Dropa tabela
     with engine.begin() as conn:
         conn.execute(text("DROP TABLE IF EXISTS fazendas CASCADE"))
-
+    
     print("📂 Lendo Shapefile em lotes...")
     start_time = time.time()
-
+    
     chunk_size = 10_000
     total_loaded = 0
-    table_created = False
-    schema = None
-
+    
     try:
-        # fiona permite leitura iterativa (eficiente para arquivos grandes)
-        # GeoPandas não tem leitura em chunks nativa para Shapefiles
-        with fiona.open(shp_file) as src:
-            src_crs = src.crs
-            total_features = len(src)  # Conta total de features no Shapefile
-            
-            # Primeira leitura: extrai o schema do shapefile (aproveita a abertura do arquivo)
-            if not table_created:
-                print("🔍 Extraindo schema do shapefile...")
-                schema = extract_schema_from_fiona_src(src)
-                print(f"📋 Schema extraído: {len(schema)} campos encontrados")
-                for field_name, field_type in schema.items():
-                    print(f"   - {field_name}: {field_type}")
-                
-                # Cria a tabela com base no schema extraído (dicionário nome: tipo)
-                create_table_from_schema(engine, schema)
-                table_created = True
-            
-            print(f"📊 Total de registros no Shapefile: {total_features:,}")
-            print(f"📦 Processando em lotes de {chunk_size:,} registros...")
-
-            # Barra de progresso (configurada para atualização dinâmica e rápida)
-            pbar = tqdm(
-                total=total_features,
-                unit=" registros",
-                desc="💾 Carregando",
-                mininterval=0.1,  # Atualiza no mínimo a cada 0.1 segundos
-                maxinterval=1.0,   # Máximo de 1 segundo entre atualizações
-                smoothing=0.0,     # Sem suavização para resposta imediata
-                dynamic_ncols=True # Ajusta largura dinamicamente
+        # pyogrio lê os metadados (total de registros, campos e CRS) sem percorrer as features
+        info = pyogrio.read_info(shp_file)
+        total_features = info["features"]
+        
+        # Readahead dos arquivos do shapefile enquanto a tabela é criada
+        prefetch_shapefile(shp_file)
+        
+        # Extrai o schema do shapefile e cria a tabela
+        print("🔍 Extraindo schema do shapefile...")
+        schema = extract_schema_from_info(info)
+        print(f"📋 Schema extraído: {len(schema)} campos encontrados")
+        for field_name, field_type in schema.items():
+            print(f"   - {field_name}: {field_type}")
+        
+        # Cria a tabela com base no schema extraído (dicionário nome: tipo)
+        create_table_from_schema(engine, schema)
+        
+        print(f"📊 Total de registros no Shapefile: {total_features:,}")
+        print(f"📦 Processando em lotes de {chunk_size:,} registros...")
+        
+        # Barra de progresso (configurada para atualização dinâmica e rápida)
+        pbar = tqdm(
+            total=total_features,
+            unit=" registros",
+            desc="💾 Carregando",
+            mininterval=0.1,  # Atualiza no mínimo a cada 0.1 segundos
+            maxinterval=1.0,   # Máximo de 1 segundo entre atualizações
+            smoothing=0.0,     # Sem suavização para resposta imediata
+            dynamic_ncols=True # Ajusta largura dinamicamente
+        )
+        
+        # Lê o arquivo em páginas de chunk_size registros: o GDAL lê cada página direto
+        # para arrays NumPy (em C), sem um dict Python por feature nem from_features.
+        # A leitura, a reprojeção, a correção das geometrias e a serialização (EWKB + CSV)
+        # rodam em LOAD_WORKERS processos (o CRS é resolvido uma vez em cada um), enquanto
+        # o processo principal insere os lotes prontos, na ordem do arquivo, com uma
+        # janela limitada de lotes
+        starts = iter(range(0, total_features, chunk_size))
+        window = LOAD_WORKERS * BATCH_WINDOW_PER_WORKER
+        
+        with ProcessPoolExecutor(
+            max_workers=LOAD_WORKERS,
+            initializer=init_worker,
+            initargs=(str(shp_file), info["crs"]),
+        ) as executor:
+            pending = deque(
+                executor.submit(convert_batch, start, chunk_size)
+                for start in islice(starts, window)
             )
-
-            # Timer para atualizar o temporizador a cada segundo
-            def update_timer():
-                """Atualiza o temporizador do tqdm a cada segundo"""
-                while not pbar.disable and pbar.n < pbar.total:
-                    time.sleep(1.0)
-                    pbar.refresh()  # Força atualização do temporizador
-            
-            timer_thread = threading.Thread(target=update_timer, daemon=True)
-            timer_thread.start()
-
-            # Processa chunks iterando diretamente sobre o arquivo
-            batch = []
-            processed_count = 0  # Contador de registros realmente processados (inseridos no banco)
-            
-            for feature in src:
-                batch.append(feature)
-                
-                # Atualiza progresso a cada registro lido (mais dinâmico)
-                pbar.update(1)
-                
-                # Quando o batch atinge o tamanho desejado, processa
-                if len(batch) >= chunk_size:
-                    batch_size = len(batch)
+            try:
+                while pending:
+                    count, columns, data = pending.popleft().result()
                     
-                    # Converte features (fiona) para GeoDataFrame (GeoPandas)
-                    gdf = normalize_gdf(batch, src_crs)
-
-                    # Verifica se há duplicação de dados (gdf não deve ter mais linhas que o batch)
-                    if len(gdf) != batch_size:
-                        print(f"⚠️ Aviso: Batch tem {batch_size} features, mas GeoDataFrame tem {len(gdf)} linhas")
-                        # Usa o tamanho do batch original para evitar inserir dados duplicados
-                        gdf = gdf.head(batch_size)  # Limita ao tamanho original se houver discrepância
-
-                    # Insere no banco (aqui os dados são realmente processados)
-                    insert_batch(engine, gdf)
-                    processed_count += batch_size
-                    total_loaded += batch_size
+                    # Mantém a janela cheia: o próximo lote é convertido durante a inserção
+                    next_start = next(starts, None)
+                    if next_start is not None:
+                        pending.append(executor.submit(convert_batch, next_start, chunk_size))
                     
-                    # Força atualização imediata após processar (atualiza temporizador)
-                    pbar.refresh()
+                    # Insere no banco (aqui os dados são realmente processados)
+                    copy_batch(engine, columns, data)
+                    total_loaded += count
                     
-                    # Limpa o batch para o próximo lote
-                    batch = []
-            
-            # Processa o último lote (se houver)
-            if batch:
-                batch_size = len(batch)
-                
-                # Converte features (fiona) para GeoDataFrame (GeoPandas)
-                gdf = normalize_gdf(batch, src_crs)
-
-                if len(gdf) != batch_size:
-                    print(f"⚠️ Aviso: Batch tem {batch_size} features, mas GeoDataFrame tem {len(gdf)} linhas")
-                    gdf = gdf.head(batch_size)
-
-                # Insere no banco (aqui os dados são realmente processados)
-                insert_batch(engine, gdf)
-                processed_count += batch_size
-                total_loaded += batch_size
-                
-                # Força atualização final
-                pbar.refresh()
-
-            # Fecha a barra de progresso (o timer thread vai parar automaticamente)
-            pbar.close()
-
+                    # Atualiza o progresso a cada lote inserido
+                    pbar.update(count)
+            except BaseException:
+                # Em caso de erro, descarta os lotes ainda não iniciados
+                for future in pending:
+                    future.cancel()
+                raise
+        
+        # Fecha a barra de progresso
+        pbar.close()
+        
         # Índices
         print("📊 Criando índices...")
         with engine.begin() as conn:
-            # Índice em cod_imovel (para buscas por código do imóvel)
-            conn.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS "
-                    "idx_fazendas_cod_imovel "
-                    "ON fazendas (cod_imovel)"
-                )
-            )
-            print("   ✅ Índice idx_fazendas_cod_imovel criado (cod_imovel)")
+            # Memória para o CLUSTER e o índice de geohash (apenas nesta transação)
+            conn.execute(text(f"SET LOCAL maintenance_work_mem = '{MAINTENANCE_WORK_MEM}'"))
             
-            # Índice em geometry (para consultas espaciais gerais)
-            conn.execute(
-                text(
-                    "CREATE INDEX IF NOT EXISTS "
-                    "idx_fazendas_geom "
-                    "ON fazendas USING GIST (geom)"
-                )
-            )
-            print("   ✅ Índice idx_fazendas_geom criado (geometry)")
-            
-            # Atualiza coluna geog com o valor de geom convertido para geography    
+            # Atualiza coluna geog com o valor de geom convertido para geography
+            # (antes dos índices e da reordenação, para não gerar entradas mortas nos índices)
             conn.execute(
                 text(
                     "UPDATE fazendas SET geog = geom::geography"
@@ -399,25 +601,41 @@ def load_data(path: str, name_file: str):
             )
             print("   ✅ Coluna geog atualizada (geography)")
             
-            # Índice em geography (otimizado para ST_DWithin e consultas por distância Em Metros)
+            # Reordena fisicamente a tabela pelo geohash do centróide: fazendas próximas ficam
+            # nas mesmas páginas, reduzindo as páginas lidas por busca espacial e mantendo o BRIN compacto
             conn.execute(
                 text(
-                    "CREATE INDEX IF NOT EXISTS "
-                    "idx_fazendas_geog "
-                    "ON fazendas USING GIST ((geog))"
+                    "CREATE INDEX idx_fazendas_geohash "
+                    "ON fazendas (ST_GeoHash(ST_Centroid(geom), 10))"
                 )
             )
-            print("   ✅ Índice idx_fazendas_geog criado (geography)")
-            
-
+            conn.execute(text("CLUSTER fazendas USING idx_fazendas_geohash"))
+            conn.execute(text("DROP INDEX idx_fazendas_geohash"))
+            print("   ✅ Tabela reordenada por geohash (CLUSTER)")
+        
+        create_indexes(engine)
+        finalize_table(engine)
+        
         elapsed = time.time() - start_time
-
+        
         print(f"✅ {total_loaded:,} registros carregados")
         print(f"⏱️ Tempo total: {elapsed:.2f}s ({elapsed/60:.2f} min)")
         return True
-
+    
     except Exception as e:
         print(f"❌ Erro: {e}")
         import traceback
         traceback.print_exc()
-        return False
\ No newline at end of file
+        return False
+
+
+if __name__ == "__main__":
+    import sys
+    
+    # python load_data.py --indexes: cria/atualiza apenas os índices em um banco já carregado
+    # (CONCURRENTLY: não bloqueia a API durante a criação)
+    if "--indexes" in sys.argv[1:]:
+        print("📊 Criando índices...")
+        create_indexes(get_engine(), concurrently=True)
+    else:
+        print("Uso: python load_data.py --indexes (a carga completa é executada por main.py)")